@@ -504,6 +504,48 @@ pub unsafe extern "C" fn uvspeed_classify(line_ptr: *const u8, line_len: usize)
     sym.to_bits()
 }
 
+/// C-compatible whole-buffer classify
+/// Writes one 4-bit code (0-8, see `PrefixSymbol::to_bits`) per line of the
+/// source — split like `str::lines` — into `out_ptr`, stopping after
+/// `out_cap` codes. Returns the total line count, so a caller whose buffer
+/// was too small can retry; returns `usize::MAX` if the source is not UTF-8.
+///
+/// # Safety
+/// `src_ptr` must point to `src_len` readable bytes and `out_ptr` to
+/// `out_cap` writable bytes.
+#[no_mangle]
+pub unsafe extern "C" fn uvspeed_classify_buffer(
+    src_ptr: *const u8,
+    src_len: usize,
+    out_ptr: *mut u8,
+    out_cap: usize,
+) -> usize {
+    if src_len == 0 {
+        return 0;
+    }
+    if src_ptr.is_null() {
+        return usize::MAX;
+    }
+    let source = match std::str::from_utf8(std::slice::from_raw_parts(src_ptr, src_len)) {
+        Ok(s) => s,
+        Err(_) => return usize::MAX,
+    };
+    let out: &mut [u8] = if out_ptr.is_null() || out_cap == 0 {
+        &mut []
+    } else {
+        std::slice::from_raw_parts_mut(out_ptr, out_cap)
+    };
+    let classifier = PrefixClassifier::new();
+    let mut count = 0;
+    for line in source.lines() {
+        if count < out.len() {
+            out[count] = classifier.classify(line).0.to_bits();
+        }
+        count += 1;
+    }
+    count
+}
+
 // ─── Tests ───
 
 #[cfg(test)]
@@ -640,6 +682,28 @@ mod tests {
         }
     }
 
+    #[test]
+    fn test_classify_buffer_ffi() {
+        let source = "import os\r\n\ndef main():\n    return 1\n";
+        let mut out = [0xFFu8; 8];
+        let n = unsafe {
+            uvspeed_classify_buffer(source.as_ptr(), source.len(), out.as_mut_ptr(), out.len())
+        };
+        assert_eq!(n, 4);
+        assert_eq!(&out[..4], &[7, 4, 0, 6]);
+
+        // Short output buffer: fills what fits, still reports every line
+        let mut short = [0u8; 1];
+        let n = unsafe {
+            uvspeed_classify_buffer(source.as_ptr(), source.len(), short.as_mut_ptr(), 1)
+        };
+        assert_eq!((n, short[0]), (4, 7));
+
+        let bad = [0xFFu8, 0xFE];
+        let n = unsafe { uvspeed_classify_buffer(bad.as_ptr(), 2, out.as_mut_ptr(), out.len()) };
+        assert_eq!(n, usize::MAX);
+    }
+
     #[test]
     fn test_bits_roundtrip() {
         for i in 0..=8u8 {
@@ -19,6 +19,10 @@ Usage:
   # Or via uv
   uv run python src/01-core/mcp_server.py
 
+  # Run the stateless tools (prefix, diff, security scan, languages) on
+  # in-process engines; execute/sessions/etc. still use the bridge
+  python src/01-core/mcp_server.py --in-process     # or UVSPEED_MCP_INPROCESS=1
+
 Cursor config (.cursor/mcp.json):
   {
     "mcpServers": {
@@ -32,10 +36,14 @@ Cursor config (.cursor/mcp.json):
 """
 
 import asyncio
+import hashlib
 import json
 import sys
 import os
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional
 
 # ---------------------------------------------------------------------------
@@ -55,33 +63,203 @@ BRIDGE_HTTP = os.environ.get("UVSPEED_BRIDGE_HTTP", "http://localhost:8085")
 BRIDGE_WS = os.environ.get("UVSPEED_BRIDGE_WS", "ws://localhost:8086")
 
 
-async def bridge_call(method: str, path: str, data: Optional[Dict] = None) -> Dict:
-    """Call the bridge server HTTP API."""
-    try:
-        import aiohttp
-        url = f"{BRIDGE_HTTP}{path}"
-        async with aiohttp.ClientSession() as session:
-            if method == "GET":
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
-                    return await resp.json()
-            else:
-                async with session.post(url, json=data or {}, timeout=aiohttp.ClientTimeout(total=60)) as resp:
-                    return await resp.json()
-    except ImportError:
-        # Fallback to urllib if aiohttp not available
-        import urllib.request
-        url = f"{BRIDGE_HTTP}{path}"
-        req = urllib.request.Request(url, method=method)
-        if data:
-            req.data = json.dumps(data).encode()
-            req.add_header("Content-Type", "application/json")
+BRIDGE_POOL_SIZE = int(os.environ.get("UVSPEED_BRIDGE_POOL", "8"))
+BRIDGE_KEEPALIVE = 10.0  # idle seconds before a pooled connection is dropped (bridge waits 15)
+
+
+class BridgeClient:
+    """Pooled keep-alive HTTP client for the bridge — one per MCP process.
+
+    With aiohttp, one ClientSession (TCPConnector capped at ``pool_size``) is
+    created on first use and shared by every tool call. Without it, persistent
+    ``http.client`` connections are checked out of an idle pool and driven from
+    worker threads, at most ``pool_size`` at a time.
+    """
+
+    def __init__(self, base_url: str = BRIDGE_HTTP, pool_size: int = BRIDGE_POOL_SIZE,
+                 use_aiohttp: Optional[bool] = None):
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip("/")
+        self.host, self.port = parts.hostname, parts.port
+        self.https = parts.scheme == "https"
+        self.pool_size = max(1, pool_size)
+        if use_aiohttp is None:
+            import importlib.util
+            use_aiohttp = importlib.util.find_spec("aiohttp") is not None
+        self.use_aiohttp = use_aiohttp
+        self._session = None
+        self._session_loop = None
+        self._idle: List[Any] = []
+        self._idle_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self.requests = 0
+        self.connections_opened = 0
+
+    async def call(self, method: str, path: str, data: Optional[Dict] = None) -> Dict:
+        """Call the bridge HTTP API; failures come back as ``{"error": ...}``."""
+        timeout = 30 if method == "GET" else 60
+        self.requests += 1
         try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                return json.loads(resp.read())
+            if self.use_aiohttp:
+                return await self._aiohttp_call(method, path, data, timeout)
+            return await asyncio.to_thread(self._blocking_call, method, path, data, timeout)
         except Exception as e:
-            return {"error": str(e)}
-    except Exception as e:
-        return {"error": f"Bridge connection failed: {e}"}
+            return {"error": f"Bridge connection failed: {e}"}
+
+    async def _aiohttp_call(self, method: str, path: str, data: Optional[Dict], timeout: float) -> Dict:
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            await self._close_session()
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=BRIDGE_KEEPALIVE)
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._count_connection)
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+            self._session_loop = loop
+        kwargs: Dict[str, Any] = {"timeout": aiohttp.ClientTimeout(total=timeout)}
+        if method != "GET":
+            kwargs["json"] = data or {}
+        async with self._session.request(method, f"{self.base_url}{path}", **kwargs) as resp:
+            return await resp.json()
+
+    async def _count_connection(self, session, context, params):
+        self.connections_opened += 1
+
+    async def _close_session(self):
+        """Close the aiohttp session, including one left over from another event loop."""
+        session, self._session = self._session, None
+        if session is None or session.closed:
+            return
+        if self._session_loop is asyncio.get_running_loop() or self._session_loop.is_closed():
+            # On a closed loop the transports are already gone; this just marks the session closed
+            await session.close()
+        else:
+            asyncio.run_coroutine_threadsafe(session.close(), self._session_loop)
+
+    def _connect(self, timeout: float):
+        import http.client
+
+        conn_cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        with self._idle_lock:
+            self.connections_opened += 1
+        return conn_cls(self.host, self.port, timeout=timeout)
+
+    def _blocking_call(self, method: str, path: str, data: Optional[Dict], timeout: float) -> Dict:
+        import http.client
+
+        body = json.dumps(data or {}).encode() if method != "GET" else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        with self._slots:
+            with self._idle_lock:
+                conn = self._idle.pop() if self._idle else None
+            reused = conn is not None
+            if conn is None:
+                conn = self._connect(timeout)
+            conn.timeout = timeout
+            while True:
+                try:
+                    conn.request(method, path, body=body, headers=headers)
+                    resp = conn.getresponse()
+                    payload = resp.read()
+                    break
+                except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                    conn.close()
+                    if not reused:
+                        raise
+                    # The bridge dropped an idle pooled connection; retry once on a fresh one
+                    conn, reused = self._connect(timeout), False
+                except Exception:
+                    conn.close()
+                    raise
+            if resp.will_close:
+                conn.close()
+            else:
+                with self._idle_lock:
+                    self._idle.append(conn)
+        return json.loads(payload)
+
+    async def close(self):
+        """Close the pooled session and any idle fallback connections."""
+        await self._close_session()
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+bridge = BridgeClient()
+
+
+async def bridge_call(method: str, path: str, data: Optional[Dict] = None) -> Dict:
+    """Call the bridge server HTTP API over the shared pooled client."""
+    return await bridge.call(method, path, data)
+
+
+# ---------------------------------------------------------------------------
+# In-process engines — stateless tools skip the HTTP hop when enabled
+# ---------------------------------------------------------------------------
+MCP_IN_PROCESS = os.environ.get("UVSPEED_MCP_INPROCESS", "").lower() in ("1", "true", "yes")
+
+
+class InProcessEngines:
+    """Bridge engines loaded into the MCP process for the stateless tools.
+
+    The bridge module is imported on first use, and the MCP process gets its
+    own prefix, diff and security engines. uvspeed_prefix, uvspeed_diff,
+    uvspeed_security_scan and uvspeed_languages then skip the bridge's
+    HTTP hop and its second JSON encode. Tools that read or change bridge
+    state (execute, sessions, navigate, status, ai) still go over HTTP. If the
+    bridge module cannot be imported, every tool falls back to HTTP.
+    """
+
+    TOOLS = frozenset(("uvspeed_prefix", "uvspeed_diff", "uvspeed_security_scan", "uvspeed_languages"))
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.error: Optional[str] = None
+        self.prefix = self.diff = self.scanner = None
+
+    def load(self) -> bool:
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                try:
+                    # The bridge imports uvspeed_cli from the repo root anyway; reuse its loader
+                    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+                    if repo_root not in sys.path:
+                        sys.path.append(repo_root)
+                    from uvspeed_cli import _load_module
+
+                    mod = _load_module("quantum_bridge_server", "quantum_bridge_server.py")
+                    self.prefix = mod.QuantumPrefixEngine()
+                    self.diff = mod.QuantumDiffEngine(self.prefix)
+                    self.scanner = mod.SecurityScanner(self.prefix, mod.ParallelFileEngine(self.prefix))
+                except Exception as e:
+                    self.error = f"{type(e).__name__}: {e}"
+                    log.warning(f"In-process engines unavailable, using the bridge: {self.error}")
+            return self.error is None
+
+    def call(self, name: str, arguments: Dict[str, Any]) -> Optional[Dict]:
+        """Result for a stateless tool, shaped like the bridge route's; None if the bridge must handle it."""
+        if name not in self.TOOLS or not self.load():
+            return None
+        language = arguments.get("language", "python")
+        if name == "uvspeed_prefix":
+            return {"prefixed": self.prefix.prefix_code(arguments["code"], language), "language": language}
+        if name == "uvspeed_diff":
+            return self.diff.diff_code(arguments["original"], arguments["modified"], language)
+        if name == "uvspeed_security_scan":
+            if not arguments["code"]:
+                return {"error": "Provide code, path, or directory to scan"}
+            return self.scanner.scan_code(arguments["code"], language)
+        return {"languages": self.prefix.supported_languages()}
+
+
+engines = InProcessEngines()
 
 
 # ---------------------------------------------------------------------------
@@ -230,6 +408,16 @@ TOOLS = [
             "required": ["code", "language"],
         },
     },
+    {
+        "name": "uvspeed_cache_stats",
+        "description": "Show hit/miss/eviction counts of the MCP server's per-tool result cache, optionally clearing it.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "clear": {"type": "boolean", "description": "Drop all cached results after reporting", "default": False},
+            },
+        },
+    },
 ]
 
 
@@ -363,12 +551,143 @@ def _analyze_prefix_gaps(code: str, language: str, threshold: float) -> Dict:
     }
 
 
+# ---------------------------------------------------------------------------
+# Tool result cache — TTL for status-like tools, content-hash LRU for pure ones
+# ---------------------------------------------------------------------------
+# tool -> ("ttl", seconds) | ("lru", max entries)
+TOOL_CACHE_POLICY: Dict[str, tuple] = {
+    "uvspeed_status": ("ttl", 2.0),
+    "uvspeed_ai_models": ("ttl", 30.0),
+    "uvspeed_languages": ("ttl", 300.0),
+    "uvspeed_prefix": ("lru", 512),
+    "uvspeed_security_scan": ("lru", 512),
+    "uvspeed_prefix_gaps": ("lru", 256),
+}
+MCP_CACHE_ENABLED = os.environ.get("UVSPEED_MCP_CACHE", "1").lower() not in ("0", "false", "no")
+
+
+class ToolCache:
+    """Per-tool cache of handle_tool's JSON text.
+
+    TTL tools keep one entry per argument set until it expires. LRU tools are
+    keyed by a sha256 of their canonical arguments (code, language, ...) and
+    evict the least recently used entry past their size. Error results are
+    never stored. Stats are kept per tool for uvspeed_cache_stats.
+    """
+
+    def __init__(self, policy: Dict[str, tuple], enabled: bool = True):
+        self.policy = dict(policy)
+        self.enabled = enabled
+        self._entries: Dict[str, "OrderedDict[str, tuple]"] = {name: OrderedDict() for name in self.policy}
+        self._stats = {name: dict.fromkeys(("hits", "misses", "bypassed", "evictions", "expired"), 0)
+                       for name in self.policy}
+
+    def key(self, name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Cache key for a call, or None when the tool is not cached."""
+        if not self.enabled or name not in self.policy:
+            return None
+        canonical = json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def get(self, name: str, key: str) -> Optional[str]:
+        entries, stats = self._entries[name], self._stats[name]
+        entry = entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del entries[key]
+            stats["expired"] += 1
+            entry = None
+        if entry is None:
+            stats["misses"] += 1
+            return None
+        entries.move_to_end(key)
+        stats["hits"] += 1
+        return entry[0]
+
+    def put(self, name: str, key: str, text: str):
+        kind, limit = self.policy[name]
+        entries = self._entries[name]
+        entries[key] = (text, time.monotonic() + limit if kind == "ttl" else None)
+        entries.move_to_end(key)
+        if kind == "lru":
+            while len(entries) > limit:
+                entries.popitem(last=False)
+                self._stats[name]["evictions"] += 1
+
+    def bypass(self, name: str):
+        self._stats[name]["bypassed"] += 1
+
+    def clear(self):
+        for entries in self._entries.values():
+            entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        tools = {}
+        for name, (kind, limit) in self.policy.items():
+            s = self._stats[name]
+            lookups = s["hits"] + s["misses"]
+            tools[name] = {"policy": kind, ("ttl_seconds" if kind == "ttl" else "max_entries"): limit,
+                           "entries": len(self._entries[name]), **s,
+                           "hit_rate": round(s["hits"] / lookups, 4) if lookups else 0.0}
+        return {"enabled": self.enabled, "tools": tools}
+
+
+tool_cache = ToolCache(TOOL_CACHE_POLICY, MCP_CACHE_ENABLED)
+
+# Cached tools accept no_cache=true to skip the lookup (the fresh result still refreshes the cache)
+for _tool in TOOLS:
+    if _tool["name"] in TOOL_CACHE_POLICY:
+        _tool["inputSchema"]["properties"]["no_cache"] = {
+            "type": "boolean",
+            "description": "Bypass the MCP result cache for this call",
+            "default": False,
+        }
+
+
 # ---------------------------------------------------------------------------
 # MCP Tool Handlers
 # ---------------------------------------------------------------------------
 
-async def handle_tool(name: str, arguments: Dict[str, Any]) -> str:
-    """Dispatch MCP tool call to bridge server."""
+def _tool_json_default(obj: Any) -> Any:
+    # Columnar engine results (in-process mode) expand to their JSON shape
+    to_json = getattr(obj, "to_json", None)
+    return to_json() if callable(to_json) else str(obj)
+
+
+async def handle_tool(name: str, arguments: Dict[str, Any], in_process: Optional[bool] = None) -> str:
+    """Dispatch MCP tool call to the result cache, the in-process engines or the bridge server."""
+    arguments = dict(arguments)
+    no_cache = bool(arguments.pop("no_cache", False))
+
+    if name == "uvspeed_cache_stats":
+        stats = tool_cache.stats()
+        if arguments.get("clear"):
+            tool_cache.clear()
+            stats["cleared"] = True
+        return json.dumps(stats, indent=2)
+
+    key = tool_cache.key(name, arguments)
+    if key is not None:
+        if no_cache:
+            tool_cache.bypass(name)
+        else:
+            cached = tool_cache.get(name, key)
+            if cached is not None:
+                return cached
+
+    result = None
+    if (MCP_IN_PROCESS if in_process is None else in_process) and name in engines.TOOLS:
+        # Worker thread: engine calls (and the first-use bridge import) would otherwise stall the stdio loop
+        result = await asyncio.to_thread(engines.call, name, arguments)
+    if result is None:
+        result = await bridge_tool(name, arguments)
+    text = json.dumps(result, indent=2, default=_tool_json_default)
+    if key is not None and not (isinstance(result, dict) and result.get("error")):
+        tool_cache.put(name, key, text)
+    return text
+
+
+async def bridge_tool(name: str, arguments: Dict[str, Any]) -> Dict:
+    """Run an MCP tool through the bridge server's HTTP API."""
 
     if name == "uvspeed_status":
         result = await bridge_call("GET", "/api/status")
@@ -441,7 +760,7 @@ async def handle_tool(name: str, arguments: Dict[str, Any]) -> str:
     else:
         result = {"error": f"Unknown tool: {name}"}
 
-    return json.dumps(result, indent=2, default=str)
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -519,6 +838,141 @@ async def handle_request(req: Dict) -> Dict:
         }
 
 
+MCP_MAX_MESSAGE_BYTES = int(os.environ.get("UVSPEED_MCP_MAX_MESSAGE", str(64 * 1024 * 1024)))
+STDIN_CHUNK = 65536
+
+
+class OversizedMessage:
+    """Placeholder the framer emits instead of a message longer than its limit."""
+
+    __slots__ = ("size",)
+
+    def __init__(self, size: int):
+        self.size = size
+
+
+class LineFramer:
+    """Split a byte stream into newline-delimited JSON-RPC messages in linear time.
+
+    Chunks are appended to one bytearray and only the bytes that arrived since
+    the last call are searched for newlines, so a message split over many
+    reads costs O(size) rather than O(size^2) in copies and scans. A message
+    longer than ``max_size`` is dropped as it streams in (never buffered whole)
+    and reported once as an OversizedMessage.
+    """
+
+    def __init__(self, max_size: int = MCP_MAX_MESSAGE_BYTES):
+        self.max_size = max_size
+        self._buf = bytearray()
+        self._scanned = 0      # bytes of _buf already known to hold no newline
+        self._discarded = 0    # > 0 while skipping the rest of an oversized message
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Add a chunk; return the complete messages (bytes or OversizedMessage) it finished."""
+        out: List[Any] = []
+        buf = self._buf
+        buf += chunk
+        start = 0
+        while True:
+            nl = buf.find(b"\n", self._scanned)
+            if nl < 0:
+                break
+            if self._discarded:
+                out.append(OversizedMessage(self._discarded + nl - start))
+                self._discarded = 0
+            elif nl - start > self.max_size:
+                out.append(OversizedMessage(nl - start))
+            else:
+                out.append(bytes(buf[start:nl]))
+            start = self._scanned = nl + 1
+        if start:
+            del buf[:start]   # bytearray drops a prefix without moving the whole tail each time
+        self._scanned = len(buf)
+        if self._discarded or len(buf) > self.max_size:
+            self._discarded += len(buf)
+            buf.clear()
+            self._scanned = 0
+        return out
+
+    @property
+    def pending(self) -> int:
+        """Bytes held for an incomplete message."""
+        return len(self._buf)
+
+
+MCP_MAX_CONCURRENCY = int(os.environ.get("UVSPEED_MCP_CONCURRENCY", "8"))
+
+
+class RequestDispatcher:
+    """Run ``tools/call`` requests as concurrent tasks; answer everything else inline.
+
+    At most ``max_concurrency`` tool calls run at once; the rest wait for a
+    slot. Responses go out by id in completion order through one serialized
+    writer, so a slow ``uvspeed_ai`` call no longer holds up other tools.
+    ``notifications/cancelled`` cancels the matching in-flight call, which then
+    sends no response (as the MCP spec asks).
+    """
+
+    def __init__(self, write=None, max_concurrency: int = MCP_MAX_CONCURRENCY):
+        self._write = write or self._write_stdout
+        self._write_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+        self.in_flight: Dict[Any, asyncio.Task] = {}
+
+    @staticmethod
+    def _write_stdout(line: str):
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+    async def send(self, response: Dict):
+        """Write one JSON-RPC message as a single line; writers never interleave."""
+        line = json.dumps(response) + "\n"
+        async with self._write_lock:
+            self._write(line)
+
+    async def dispatch(self, req: Dict):
+        method = req.get("method", "")
+        if method == "notifications/cancelled":
+            self.cancel((req.get("params") or {}).get("requestId"))
+        elif method == "tools/call" and req.get("id") is not None:
+            req_id = req["id"]
+            if req_id in self.in_flight:
+                log.warning(f"Duplicate in-flight request id: {req_id!r}")
+            task = asyncio.create_task(self._run(req))
+            self.in_flight[req_id] = task
+            task.add_done_callback(lambda t: self._forget(req_id, t))
+        else:
+            response = await handle_request(req)
+            if response is not None:
+                await self.send(response)
+
+    async def _run(self, req: Dict):
+        try:
+            async with self._slots:
+                response = await handle_request(req)
+        except asyncio.CancelledError:
+            log.info(f"Cancelled request {req.get('id')!r}")
+            return
+        if response is not None:
+            await self.send(response)
+
+    def _forget(self, req_id: Any, task: asyncio.Task):
+        if self.in_flight.get(req_id) is task:
+            del self.in_flight[req_id]
+
+    def cancel(self, req_id: Any) -> bool:
+        task = self.in_flight.get(req_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def drain(self):
+        """Wait for every in-flight call (used at EOF so no response is lost)."""
+        while self.in_flight:
+            await asyncio.gather(*list(self.in_flight.values()), return_exceptions=True)
+
+
 async def stdio_loop():
     """Main stdio transport loop — reads JSON-RPC from stdin, writes to stdout."""
     log.info("uvspeed MCP server starting (stdio transport)")
@@ -528,18 +982,28 @@ async def stdio_loop():
     reader = asyncio.StreamReader()
     protocol = asyncio.StreamReaderProtocol(reader)
     await asyncio.get_event_loop().connect_read_pipe(lambda: protocol, sys.stdin)
+    dispatcher = RequestDispatcher()
+    framer = LineFramer()
 
-    buffer = b""
     while True:
         try:
-            chunk = await reader.read(65536)
+            chunk = await reader.read(STDIN_CHUNK)
             if not chunk:
                 break  # EOF
-            buffer += chunk
 
             # Process complete JSON-RPC messages (newline-delimited)
-            while b"\n" in buffer:
-                line, buffer = buffer.split(b"\n", 1)
+            for line in framer.feed(chunk):
+                if isinstance(line, OversizedMessage):
+                    log.error(f"Dropped {line.size}-byte message (limit {framer.max_size})")
+                    await dispatcher.send({
+                        "jsonrpc": "2.0",
+                        "id": None,
+                        "error": {
+                            "code": -32600,
+                            "message": f"Message too large: {line.size} bytes (limit {framer.max_size})",
+                        },
+                    })
+                    continue
                 line = line.strip()
                 if not line:
                     continue
@@ -550,11 +1014,7 @@ async def stdio_loop():
                     log.error(f"Invalid JSON: {line[:100]}")
                     continue
 
-                response = await handle_request(req)
-                if response is not None:
-                    out = json.dumps(response) + "\n"
-                    sys.stdout.write(out)
-                    sys.stdout.flush()
+                await dispatcher.dispatch(req)
 
         except asyncio.CancelledError:
             break
@@ -562,6 +1022,8 @@ async def stdio_loop():
             log.error(f"stdio loop error: {e}")
             break
 
+    await dispatcher.drain()
+    await bridge.close()
     log.info("uvspeed MCP server stopped")
 
 
@@ -570,6 +1032,9 @@ async def stdio_loop():
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
+    if "--in-process" in sys.argv[1:]:
+        MCP_IN_PROCESS = True
+    log.info(f"Tool mode: {'in-process engines + bridge' if MCP_IN_PROCESS else 'bridge'}")
     try:
         asyncio.run(stdio_loop())
     except KeyboardInterrupt:
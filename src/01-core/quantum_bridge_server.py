@@ -26,22 +26,41 @@ Companion files:
 import asyncio
 import json
 import logging
+import mmap
 import os
 import re
 import subprocess
 import sys
+import threading
 import time
 import traceback
 import uuid
 import hashlib
 import difflib
+import importlib
+import importlib.util
+from array import array
 from pathlib import Path
-from typing import Dict, List, Any, Optional, AsyncGenerator
+from typing import Dict, List, Any, Optional, AsyncGenerator, Iterable, Iterator, TextIO
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
 from io import StringIO
-from collections import defaultdict
+from collections import Counter, defaultdict, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+# DispatchClassifier reads pattern structure from the stdlib regex parser, which
+# is private (re._parser on 3.11+, sre_parse before). Without it, or if its
+# internals change, each rule keeps its compiled regex instead.
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    try:
+        import sre_parse
+    except ImportError:
+        sre_parse = None
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -53,62 +72,142 @@ logging.basicConfig(
 logger = logging.getLogger("quantum-bridge")
 
 # ---------------------------------------------------------------------------
-# Tinygrad / numpy detection
+# Shared stdlib-only helpers (top-level uvspeed_cli module)
 # ---------------------------------------------------------------------------
-TINYGRAD_AVAILABLE = False
-NUMPY_AVAILABLE = False
-try:
-    sys.path.insert(0, '/Users/tref/torch-env-311/lib/python3.11/site-packages/')
-    from tinygrad.tensor import Tensor as TinyTensor
-    import tinygrad
-    TINYGRAD_AVAILABLE = True
-    logger.info("tinygrad loaded successfully")
-except Exception:
-    logger.info("tinygrad not available — using numpy fallback")
-
-try:
-    import numpy as np
-    NUMPY_AVAILABLE = True
-except ImportError:
-    pass
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+from uvspeed_cli import (
+    RESULT_CACHE, VERSION, ClassificationResult, TreeWatcher, classify_buffer, code_fingerprint,
+    native_engine_path, rules_fingerprint,
+)
 
 # ---------------------------------------------------------------------------
-# SymPy / SciPy / Matplotlib / Qiskit detection (Free Tier math stack)
+# Optional capabilities (numpy, tinygrad, SymPy, SciPy, Matplotlib, Qiskit)
 # ---------------------------------------------------------------------------
-SYMPY_AVAILABLE = False
-SCIPY_AVAILABLE = False
-MATPLOTLIB_AVAILABLE = False
-QISKIT_AVAILABLE = False
+# Nothing optional is imported at start-up. Each stack is probed with
+# importlib.util.find_spec (a path lookup, no import) and imported on first
+# use through CAPABILITIES[name].load(), so the ports bind without paying for
+# sympy/matplotlib/qiskit/tinygrad initialisation.
+TINYGRAD_PATH = os.environ.get('UVSPEED_TINYGRAD_PATH', '/Users/tref/torch-env-311/lib/python3.11/site-packages/')
 
-try:
-    import sympy
-    SYMPY_AVAILABLE = True
-    logger.info("sympy loaded — symbolic math available")
-except ImportError:
-    logger.info("sympy not available — install: pip install sympy")
 
-try:
-    import scipy
-    SCIPY_AVAILABLE = True
-    logger.info("scipy loaded — scientific computing available")
-except ImportError:
-    logger.info("scipy not available — install: pip install scipy")
+class Capability:
+    """One optional dependency stack, imported lazily and at most once.
 
-try:
-    import matplotlib
-    matplotlib.use('Agg')  # Non-interactive backend for server-side rendering
-    import matplotlib.pyplot as plt
-    MATPLOTLIB_AVAILABLE = True
-    logger.info("matplotlib loaded — plot rendering available")
-except ImportError:
-    logger.info("matplotlib not available — install: pip install matplotlib")
+    state: 'missing' (not installed), 'available' (installed, not loaded yet),
+    'loaded', or 'failed' (installed but the import raised).
+    """
 
-try:
-    import qiskit
-    QISKIT_AVAILABLE = True
-    logger.info("qiskit loaded — quantum circuit simulation available")
-except ImportError:
-    logger.info("qiskit not available — install: pip install qiskit")
+    def __init__(self, name: str, module: str, install: str = '', prepare=None, extra_path: str = ''):
+        self.name = name
+        self.module = module
+        self.install = install or f'pip install {name}'
+        self._prepare = prepare
+        self._extra_path = extra_path
+        self._lock = threading.Lock()
+        self._available: Optional[bool] = None
+        self._loaded = None
+        self.error: Optional[str] = None
+        self.load_ms: Optional[float] = None
+
+    def available(self) -> bool:
+        """Installed and importable as far as the finder can tell; does not import."""
+        if self._available is None:
+            if self._extra_path and os.path.isdir(self._extra_path) and self._extra_path not in sys.path:
+                sys.path.append(self._extra_path)
+            try:
+                self._available = importlib.util.find_spec(self.module.split('.')[0]) is not None
+            except (ImportError, ValueError):
+                self._available = False
+        return self._available
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded is not None
+
+    @property
+    def state(self) -> str:
+        if self._loaded is not None:
+            return 'loaded'
+        if self.error is not None:
+            return 'failed'
+        return 'available' if self.available() else 'missing'
+
+    def load(self):
+        """Import on first call and return the module, or None when missing or broken."""
+        if self._loaded is not None or self.error is not None or not self.available():
+            return self._loaded
+        with self._lock:
+            if self._loaded is None and self.error is None:
+                t0 = time.perf_counter()
+                try:
+                    if self._prepare is not None:
+                        self._prepare()
+                    module = importlib.import_module(self.module)
+                except Exception as e:
+                    self.error = f'{type(e).__name__}: {e}'
+                    logger.info(f"{self.name} failed to load — {self.error}")
+                else:
+                    self.load_ms = round((time.perf_counter() - t0) * 1000, 1)
+                    self._loaded = module
+                    logger.info(f"{self.name} loaded in {self.load_ms}ms")
+        return self._loaded
+
+    @property
+    def package(self):
+        """Top-level package of a loaded capability (tinygrad for tinygrad.tensor)."""
+        return sys.modules.get(self.module.split('.')[0]) if self._loaded is not None else None
+
+    def version(self) -> Optional[str]:
+        """Installed version from package metadata, so reporting it never imports the stack."""
+        package = self.package
+        if package is not None and getattr(package, '__version__', None):
+            return str(package.__version__)
+        if not self.available():
+            return None
+        import importlib.metadata  # ~15ms to import, only paid by status requests
+        try:
+            return importlib.metadata.version(self.name)
+        except importlib.metadata.PackageNotFoundError:
+            return None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'version': self.version(),
+            'load_ms': self.load_ms,
+            'error': self.error,
+            'install': self.install if self.state == 'missing' else None,
+        }
+
+
+def _use_agg_backend():
+    # Non-interactive backend for server-side rendering; must precede pyplot
+    importlib.import_module('matplotlib').use('Agg')
+
+
+CAPABILITIES: Dict[str, Capability] = {
+    'numpy': Capability('numpy', 'numpy'),
+    'tinygrad': Capability('tinygrad', 'tinygrad.tensor', extra_path=TINYGRAD_PATH),
+    'sympy': Capability('sympy', 'sympy'),
+    'scipy': Capability('scipy', 'scipy'),
+    'matplotlib': Capability('matplotlib', 'matplotlib.pyplot', prepare=_use_agg_backend),
+    'qiskit': Capability('qiskit', 'qiskit'),
+}
+
+
+def capability_status() -> Dict[str, Dict[str, Any]]:
+    return {name: cap.status() for name, cap in CAPABILITIES.items()}
+
+
+# Installed (not necessarily loaded) — for status output and feature gating
+TINYGRAD_AVAILABLE = CAPABILITIES['tinygrad'].available()
+NUMPY_AVAILABLE = CAPABILITIES['numpy'].available()
+SYMPY_AVAILABLE = CAPABILITIES['sympy'].available()
+SCIPY_AVAILABLE = CAPABILITIES['scipy'].available()
+MATPLOTLIB_AVAILABLE = CAPABILITIES['matplotlib'].available()
+QISKIT_AVAILABLE = CAPABILITIES['qiskit'].available()
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -117,12 +216,230 @@ HTTP_PORT = 8085
 WS_PORT = 8086
 STORAGE_DIR = Path(__file__).parent / ".quantum_sessions"
 STORAGE_DIR.mkdir(exist_ok=True)
+# Line classifier: 'regex' (one compiled alternation per language) or 'dispatch'
+PREFIX_ENGINE = os.environ.get('UVSPEED_PREFIX_ENGINE', 'regex')
+# Line-classification memo shared by prefix, scan, diff and roadmap (0 disables)
+PREFIX_CACHE_SIZE = int(os.environ.get('UVSPEED_PREFIX_CACHE_SIZE', '65536'))
 
 
 # ╔═══════════════════════════════════════════════════════════════════════════╗
 # ║  SECTION 1 — QUANTUM PREFIX SYSTEM (18 languages)                      ║
 # ╚═══════════════════════════════════════════════════════════════════════════╝
 
+# 4-bit symbol codes, indexed by PrefixSymbol::to_bits in crates/prefix-engine
+BIT_SYMBOLS = ('+1', '1', '-1', '+0', '0', '-0', '+n', 'n', '-n')
+
+
+@dataclass
+class PackedClassification:
+    """
+    Bulk per-line classification: two 4-bit codes per byte (high nibble
+    first, same packing as PrefixClassifier::classify_binary) plus the byte
+    offset where each line starts.
+    """
+    path: str
+    language: str
+    line_count: int
+    packed: bytes
+    offsets: array
+    backend: str = 'patterns'
+
+    def code(self, index: int) -> int:
+        byte = self.packed[index >> 1]
+        return byte >> 4 if index % 2 == 0 else byte & 0x0F
+
+    def codes(self) -> Iterator[int]:
+        for i, byte in enumerate(self.packed):
+            yield byte >> 4
+            if 2 * i + 1 < self.line_count:
+                yield byte & 0x0F
+
+    def histogram(self) -> Dict[str, int]:
+        counts = [0] * 16
+        for c in self.codes():
+            counts[c] += 1
+        return {BIT_SYMBOLS[i]: n for i, n in enumerate(counts[:len(BIT_SYMBOLS)]) if n}
+
+
+def _pack_nibbles(codes: bytes) -> bytes:
+    """Pack one-code-per-byte values (0-15) into two codes per byte."""
+    if not codes:
+        return b''
+    hi = bytes(codes[0::2]).translate(_NIBBLE_SHIFT)
+    lo = bytes(codes[1::2]).ljust(len(hi), b'\0')
+    return (int.from_bytes(hi, 'big') | int.from_bytes(lo, 'big')).to_bytes(len(hi), 'big')
+
+
+_NIBBLE_SHIFT = bytes(((b << 4) & 0xFF) for b in range(256))
+
+
+def _decode_text(data: bytes) -> str:
+    """The text open(path, 'r', encoding='utf-8', errors='replace') would return."""
+    return data.decode('utf-8', 'replace').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class DispatchClassifier:
+    """
+    Regex-free line classifier in the style of simd.rs first_byte_table:
+    the first non-space character selects the candidate categories, each
+    holding only the keywords that start with that character, and the
+    keyword is confirmed with str.startswith plus a one-character tail
+    check. Patterns that are not a plain keyword alternation ending in
+    \\s, \\b or nothing keep their compiled regex as the last resort.
+
+    Built from PATTERNS with sre_parse, so results are identical to the
+    compiled alternation for every language. sre_parse is a private stdlib
+    module; if it is missing or a rule cannot be analysed with it, that rule
+    falls back to its compiled regex and results stay identical.
+    """
+
+    TAIL_NONE, TAIL_SPACE, TAIL_BOUNDARY = 0, 1, 2
+
+    def __init__(self, patterns: Dict[str, Dict[str, str]]):
+        self._tables = {language: self._build(rules) for language, rules in patterns.items()}
+
+    @classmethod
+    def _literals(cls, tokens) -> Optional[set]:
+        """Every string the token sequence can match, or None if it is not a finite literal set."""
+        found = {''}
+        for op, av in tokens:
+            if op is sre_parse.LITERAL:
+                found = {f + chr(av) for f in found}
+            elif op is sre_parse.IN and all(o is sre_parse.LITERAL for o, _ in av):
+                found = {f + chr(c) for f in found for _, c in av}
+            elif op is sre_parse.SUBPATTERN and not av[1] and not av[2]:
+                inner = cls._literals(av[3])
+                if inner is None:
+                    return None
+                found = {f + i for f in found for i in inner}
+            elif op is sre_parse.BRANCH:
+                alternatives = set()
+                for branch in av[1]:
+                    inner = cls._literals(branch)
+                    if inner is None:
+                        return None
+                    alternatives |= inner
+                found = {f + a for f in found for a in alternatives}
+            else:
+                return None
+            if len(found) > 64:
+                return None
+        return found
+
+    @classmethod
+    def _first_chars(cls, tokens) -> Optional[set]:
+        """Characters a match can start with, or None when any character (or none) may."""
+        chars = set()
+        for op, av in tokens:
+            if op is sre_parse.LITERAL:
+                return chars | {chr(av)}
+            if op is sre_parse.IN and all(o is sre_parse.LITERAL for o, _ in av):
+                return chars | {chr(c) for _, c in av}
+            if op is sre_parse.SUBPATTERN and not av[1] and not av[2]:
+                inner = cls._first_chars(av[3])
+            elif op is sre_parse.BRANCH:
+                inner = set()
+                for branch in av[1]:
+                    sub = cls._first_chars(branch)
+                    if sub is None:
+                        return None
+                    inner |= sub
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+                inner = cls._first_chars(av[2])
+                if inner is not None and av[0] == 0:
+                    # Optional item: it or whatever follows can come first
+                    chars |= inner
+                    continue
+            else:
+                return None
+            return None if inner is None else chars | inner
+        return None
+
+    @classmethod
+    def _rule(cls, category: str, pattern: str) -> tuple:
+        """(category, col0, first chars, keywords, tail, fallback regex) for one PATTERNS entry."""
+        if sre_parse is not None:
+            try:
+                return cls._parse_rule(category, pattern)
+            except (AttributeError, TypeError, ValueError, IndexError):
+                pass  # sre_parse internals changed
+        return category, False, None, None, cls.TAIL_NONE, re.compile(pattern)
+
+    @classmethod
+    def _parse_rule(cls, category: str, pattern: str) -> tuple:
+        parsed = sre_parse.parse(pattern)
+        tokens = list(parsed)
+        if parsed.state.flags & (re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE):
+            return category, False, None, None, cls.TAIL_NONE, re.compile(pattern)
+        space = (sre_parse.IN, [(sre_parse.CATEGORY, sre_parse.CATEGORY_SPACE)])
+        if not tokens or tokens[0] != (sre_parse.AT, sre_parse.AT_BEGINNING):
+            return category, False, None, None, cls.TAIL_NONE, re.compile(pattern)
+        body = tokens[1:]
+        col0 = True
+        if body and body[0][0] is sre_parse.MAX_REPEAT and body[0][1][:2] == (0, sre_parse.MAXREPEAT) \
+                and list(body[0][1][2]) == [space]:
+            col0, body = False, body[1:]
+        first = cls._first_chars(body)
+        if first is None or any(c.isspace() for c in first):
+            return category, col0, None, None, cls.TAIL_NONE, re.compile(pattern)
+        tail = cls.TAIL_NONE
+        if body and body[-1] == space:
+            tail, body = cls.TAIL_SPACE, body[:-1]
+        elif body and body[-1] == (sre_parse.AT, sre_parse.AT_BOUNDARY):
+            tail, body = cls.TAIL_BOUNDARY, body[:-1]
+        keywords = cls._literals(body)
+        if not keywords or '' in keywords:
+            return category, col0, first, None, cls.TAIL_NONE, re.compile(pattern)
+        return category, col0, {k[0] for k in keywords}, tuple(sorted(keywords)), tail, None
+
+    @classmethod
+    def _build(cls, patterns: Dict[str, str]) -> tuple:
+        """Per-character rule lists (in PATTERNS order) plus the list for other characters."""
+        rules = [cls._rule(category, pattern) for category, pattern in patterns.items()]
+        chars = set().union(*(r[2] for r in rules if r[2] is not None))
+        table = {}
+        for ch in chars:
+            table[ch] = tuple(
+                (category, col0, tuple(k for k in keywords if k[0] == ch) if keywords else None, tail, regex)
+                for category, col0, first, keywords, tail, regex in rules
+                if first is None or ch in first
+            )
+        other = tuple(
+            (category, col0, None, tail, regex)
+            for category, col0, first, keywords, tail, regex in rules
+            if first is None
+        )
+        return table, other
+
+    def classify(self, line: str, language: str) -> Optional[str]:
+        """Category name of the first matching pattern, or None."""
+        table, other = self._tables.get(language) or self._tables['python']
+        rest = line.lstrip()
+        indented = len(rest) != len(line)
+        for category, col0, keywords, tail, regex in table.get(rest[:1], other):
+            if col0 and indented:
+                continue
+            if regex is not None:
+                if regex.match(line):
+                    return category
+                continue
+            for kw in keywords:
+                if rest.startswith(kw):
+                    if tail == self.TAIL_NONE:
+                        return category
+                    nxt = rest[len(kw):len(kw) + 1]
+                    if tail == self.TAIL_SPACE:
+                        if nxt.isspace():
+                            return category
+                    elif _is_word(kw[-1]) != (nxt != '' and _is_word(nxt)):
+                        return category
+        return None
+
+
 class QuantumPrefixEngine:
     """
     Universal quantum prefix parser — 11-symbol system across 18 languages.
@@ -352,6 +669,24 @@ class QuantumPrefixEngine:
         },
     }
 
+    # Category → PrefixSymbol::to_bits code used by the packed bulk API.
+    # 'default' splits into 4 (Zero) for blank lines and 8 (MinusN) otherwise.
+    SYMBOL_BITS = {
+        'shebang':   5,   # MinusZero — the Rust classifier treats #! as a comment
+        'comment':   5,   # MinusZero
+        'import':    7,   # N
+        'class':     0,   # PlusOne (declaration)
+        'function':  0,   # PlusOne (declaration)
+        'error':     1,   # One (try/catch control flow)
+        'condition': 1,   # One (logic)
+        'loop':      1,   # One (logic)
+        'return':    6,   # PlusN (modifier)
+        'output':    2,   # MinusOne (i/o)
+        'variable':  3,   # PlusZero (assignment)
+        'decorator': 6,   # PlusN (modifier)
+        'blank':     4,   # Zero (neutral)
+    }
+
     LANG_MAP = {
         '.py': 'python', '.pyw': 'python',
         '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript',
@@ -375,6 +710,48 @@ class QuantumPrefixEngine:
         '.asm': 'assembly', '.s': 'assembly',
     }
 
+    # Lines longer than this bypass the memo (minified bundles, data blobs)
+    CACHE_MAX_LINE = 240
+    # prefix_file results kept per path, validated by (mtime_ns, size)
+    FILE_CACHE_ENTRIES = 256
+    FILE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, cache_size: int = PREFIX_CACHE_SIZE, engine: str = PREFIX_ENGINE):
+        # 'regex' matches one compiled alternation per line; 'dispatch' uses the
+        # first-character keyword tables (DispatchClassifier). Same results.
+        if engine not in ('regex', 'dispatch'):
+            raise ValueError(f"Unknown prefix engine: {engine!r} (expected 'regex' or 'dispatch')")
+        self.engine = engine
+        self._dispatch = DispatchClassifier(self.PATTERNS) if engine == 'dispatch' else None
+        # Both engines give identical results, so they share on-disk cache entries.
+        # The classifier code and package version are in it too, so a logic change
+        # invalidates entries as well as a pattern change.
+        self.rules_version = rules_fingerprint(
+            VERSION, self.PATTERNS, self.PREFIXES, code_fingerprint(QuantumPrefixEngine, DispatchClassifier))
+        # One precompiled alternation per language, built once per engine.
+        # Named groups keep the PATTERNS order, so the first alternative that
+        # matches is the same category the old pattern-by-pattern loop found.
+        self._compiled: Dict[str, re.Pattern] = {
+            language: self._compile_language(language) for language in self.PATTERNS
+        }
+        # Bounded LRU keyed by (line, language). functools.lru_cache is
+        # thread-safe, so concurrent prefix and scan requests can share it.
+        self._classify_cached = lru_cache(maxsize=max(cache_size, 0))(self._classify_uncached)
+        # bytes twins of _compiled for the mmap bulk path, built on first use
+        self._compiled_bytes: Dict[str, re.Pattern] = {}
+        self._file_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._file_cache_lock = threading.Lock()
+        self._file_hits = 0
+        self._file_misses = 0
+
+    @classmethod
+    def _compile_language(cls, language: str) -> re.Pattern:
+        alternation = '|'.join(
+            f'(?P<{category}>{pattern})'
+            for category, pattern in cls.PATTERNS[language].items()
+        )
+        return re.compile(alternation)
+
     def detect_language(self, filename: str) -> str:
         name_lower = Path(filename).name.lower()
         if name_lower == 'dockerfile':
@@ -383,11 +760,41 @@ class QuantumPrefixEngine:
         return self.LANG_MAP.get(ext, 'python')
 
     def classify_line(self, line: str, language: str) -> str:
-        patterns = self.PATTERNS.get(language, self.PATTERNS['python'])
-        for category, pattern in patterns.items():
-            if re.match(pattern, line):
-                return self.PREFIXES.get(category, self.PREFIXES['default'])
-        return self.PREFIXES['default']
+        if len(line) > self.CACHE_MAX_LINE:
+            return self._classify_uncached(line, language)
+        return self._classify_cached(line, language)
+
+    def _classify_uncached(self, line: str, language: str) -> str:
+        if self._dispatch is not None:
+            return self.PREFIXES.get(self._dispatch.classify(line, language), self.PREFIXES['default'])
+        compiled = self._compiled.get(language) or self._compiled['python']
+        m = compiled.match(line)
+        if m is None:
+            return self.PREFIXES['default']
+        return self.PREFIXES.get(m.lastgroup, self.PREFIXES['default'])
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the line-classification memo."""
+        info = self._classify_cached.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize,
+            'hit_rate': round(info.hits / lookups, 3) if lookups else 0.0,
+            'files': {
+                'hits': self._file_hits,
+                'misses': self._file_misses,
+                'size': len(self._file_cache),
+                'maxsize': self.FILE_CACHE_ENTRIES,
+            },
+        }
+
+    def cache_clear(self):
+        self._classify_cached.cache_clear()
+        with self._file_cache_lock:
+            self._file_cache.clear()
 
     def prefix_code(self, content: str, language: str = 'python') -> str:
         """Add quantum prefixes to every line of code."""
@@ -398,30 +805,403 @@ class QuantumPrefixEngine:
             out.append(f"{pfx:>4s}{i:>3d}  {line}")
         return '\n'.join(out)
 
-    def prefix_file(self, filepath: str) -> Dict[str, Any]:
-        """Prefix an entire file, return metadata."""
-        lang = self.detect_language(filepath)
-        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-            content = f.read()
-        prefixed = self.prefix_code(content, lang)
-        line_count = content.count('\n') + 1
+    def iter_prefix_lines(self, fileobj: TextIO, language: str = 'python') -> Iterator[str]:
+        """Yield prefixed lines one at a time, holding a single line in memory.
+
+        Produces exactly prefix_code(fileobj.read(), language).split('\\n'),
+        including the empty last line that follows a trailing newline.
+        """
+        i = 0
+        ended_with_newline = True
+        for raw in fileobj:
+            i += 1
+            ended_with_newline = raw.endswith('\n')
+            line = raw[:-1] if ended_with_newline else raw
+            yield f"{self.classify_line(line, language):>4s}{i:>3d}  {line}"
+        if ended_with_newline:
+            yield f"{self.classify_line('', language):>4s}{i + 1:>3d}  "
+
+    def analyze_code(self, content: str, language: str = 'python') -> Dict[str, Any]:
+        """Prefixed text, per-line symbols and distribution from a single pass."""
+        out = []
+        symbols = []
         prefix_counts = defaultdict(int)
-        for line in content.split('\n'):
-            cat = self.classify_line(line, lang)
-            prefix_counts[cat] += 1
-        coverage = round((1 - prefix_counts.get('   ', 0) / max(line_count, 1)) * 100, 1)
+        for i, line in enumerate(content.split('\n'), 1):
+            pfx = self.classify_line(line, language)
+            symbols.append(pfx)
+            prefix_counts[pfx] += 1
+            out.append(f"{pfx:>4s}{i:>3d}  {line}")
+        line_count = len(symbols)
+        coverage = round((1 - prefix_counts.get(self.PREFIXES['default'], 0) / max(line_count, 1)) * 100, 1)
         return {
-            'language': lang,
+            'language': language,
             'lines': line_count,
             'coverage': coverage,
-            'prefixed': prefixed,
+            'prefixed': '\n'.join(out),
+            'symbols': symbols,
             'prefix_distribution': dict(prefix_counts),
         }
 
+    # Upper bound on items per /api/prefix/batch request
+    BATCH_MAX_ITEMS = 2000
+
+    def prefix_batch(self, items: List[Dict[str, Any]], symbols_only: bool = False) -> List[Dict[str, Any]]:
+        """Prefix many small snippets in one call; results keep the input order.
+
+        Items are grouped by language so each group resolves its compiled
+        table once and classifies each distinct line once, which is where
+        editor traffic (many snippets sharing '}', '', 'return x') repeats.
+        With symbols_only the per-line symbols are returned instead of the
+        prefixed text, which is all a gutter needs.
+        """
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for index, item in enumerate(items):
+            groups[item.get('language') or 'python'].append(index)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        for language, indexes in groups.items():
+            seen: Dict[str, str] = {}
+            classify = self.classify_line
+            for index in indexes:
+                item = items[index]
+                lines = str(item.get('code', '')).split('\n')
+                symbols = []
+                for line in lines:
+                    pfx = seen.get(line)
+                    if pfx is None:
+                        pfx = seen[line] = classify(line, language)
+                    symbols.append(pfx)
+                result = {'id': item.get('id', index), 'language': language}
+                if symbols_only:
+                    result['symbols'] = symbols
+                else:
+                    result['prefixed'] = '\n'.join(
+                        f"{pfx:>4s}{i:>3d}  {line}" for i, (pfx, line) in enumerate(zip(symbols, lines), 1)
+                    )
+                results[index] = result
+        return results
+
+    def prefix_file(self, filepath: str) -> Dict[str, Any]:
+        """Prefix an entire file, return metadata.
+
+        Results are cached per path and reused while the file's mtime_ns and
+        size are unchanged, so repeat calls on an untouched file cost a stat.
+        Across processes and restarts, the per-line symbols are kept in
+        RESULT_CACHE keyed by content, so only the gutter text is rebuilt.
+        """
+        st = os.stat(filepath)
+        key = os.path.abspath(filepath)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._file_cache_lock:
+            entry = self._file_cache.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._file_cache.move_to_end(key)
+                self._file_hits += 1
+                return dict(entry[1])
+            self._file_misses += 1
+
+        lang = self.detect_language(filepath)
+        # The stat index skips hashing an unchanged file; the text is still needed for the gutter
+        disk_key, data = RESULT_CACHE.file_key(filepath, lang, f'prefix:{self.rules_version}')
+        if data is None:
+            with open(filepath, 'rb') as f:
+                data = f.read()
+        content = _decode_text(data)
+        cached = RESULT_CACHE.get('prefix', disk_key)
+        if cached is not None:
+            prefixed = '\n'.join(
+                f"{pfx:>4s}{i:>3d}  {line}"
+                for i, (pfx, line) in enumerate(zip(cached['symbols'], content.split('\n')), 1)
+            )
+            result = {
+                'language': lang,
+                'lines': cached['lines'],
+                'coverage': cached['coverage'],
+                'prefixed': prefixed,
+                'prefix_distribution': cached['prefix_distribution'],
+            }
+        else:
+            analysis = self.analyze_code(content, lang)
+            result = {
+                'language': lang,
+                'lines': analysis['lines'],
+                'coverage': analysis['coverage'],
+                'prefixed': analysis['prefixed'],
+                'prefix_distribution': analysis['prefix_distribution'],
+            }
+            # Per-line symbols of huge files would dwarf the rest of the cache; same bound as in memory
+            if st.st_size <= self.FILE_CACHE_MAX_BYTES:
+                RESULT_CACHE.put('prefix', disk_key, {
+                    'lines': analysis['lines'],
+                    'coverage': analysis['coverage'],
+                    'prefix_distribution': analysis['prefix_distribution'],
+                    'symbols': analysis['symbols'],
+                })
+
+        if st.st_size <= self.FILE_CACHE_MAX_BYTES and self.FILE_CACHE_ENTRIES > 0:
+            with self._file_cache_lock:
+                self._file_cache[key] = (stamp, result)
+                self._file_cache.move_to_end(key)
+                while len(self._file_cache) > self.FILE_CACHE_ENTRIES:
+                    self._file_cache.popitem(last=False)
+        return dict(result)
+
+    def prefix_counts(self, filepath: str) -> Dict[str, Any]:
+        """Line count and prefix distribution of a file, without the prefixed text.
+
+        Served from prefix_file's in-memory or RESULT_CACHE entry when one is
+        current; otherwise the lines are classified and only counted.
+        """
+        st = os.stat(filepath)
+        with self._file_cache_lock:
+            entry = self._file_cache.get(os.path.abspath(filepath))
+        if entry is not None and entry[0] == (st.st_mtime_ns, st.st_size):
+            return {'lines': entry[1]['lines'], 'prefix_distribution': dict(entry[1]['prefix_distribution'])}
+        lang = self.detect_language(filepath)
+        disk_key, data = RESULT_CACHE.file_key(filepath, lang, f'prefix:{self.rules_version}')
+        cached = RESULT_CACHE.get('prefix', disk_key)
+        if cached is not None:
+            return {'lines': cached['lines'], 'prefix_distribution': cached['prefix_distribution']}
+        if data is None:
+            with open(filepath, 'rb') as f:
+                data = f.read()
+        classify = self.classify_line
+        counts = Counter(classify(line, lang) for line in _decode_text(data).split('\n'))
+        return {'lines': sum(counts.values()), 'prefix_distribution': dict(counts)}
+
+    def _bytes_pattern(self, language: str) -> re.Pattern:
+        compiled = self._compiled_bytes.get(language)
+        if compiled is None:
+            patterns = self.PATTERNS.get(language, self.PATTERNS['python'])
+            alternation = '|'.join(f'(?P<{category}>{pattern})' for category, pattern in patterns.items())
+            # MULTILINE so ^ anchors at every line start inside the mapped buffer;
+            # the trailing group tags whitespace-only lines for the Zero code.
+            compiled = re.compile(f'{alternation}|(?P<blank>\\s*$)'.encode(), re.MULTILINE)
+            self._compiled_bytes[language] = compiled
+        return compiled
+
+    def classify_file_packed(self, filepath: str, language: Optional[str] = None,
+                             backend: str = 'patterns') -> PackedClassification:
+        """
+        Classify every line of a file without decoding it to str.
+
+        The file is memory-mapped and each line is matched in place with a
+        bytes regex, so memory stays at ~half a byte of codes plus one offset
+        per line. Lines split on LF; a trailing CR is ignored. Bytes patterns
+        treat \\s and \\w as ASCII-only, unlike the str classifier.
+
+        backend='native' applies the language-independent prefix-engine
+        crate rules instead, in one call into the cdylib when it is built
+        (pure-Python port otherwise).
+        """
+        lang = language or self.detect_language(filepath)
+        if backend == 'native':
+            return self._classify_file_native(filepath, lang)
+        if backend != 'patterns':
+            raise ValueError(f"Unknown backend: {backend!r} (expected 'patterns' or 'native')")
+        match = self._bytes_pattern(lang).match
+        bits = self.SYMBOL_BITS
+        codes = bytearray()
+        offsets = array('Q')
+        with open(filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+            try:
+                find = buf.find
+                pos = 0
+                while True:
+                    nl = find(b'\n', pos)
+                    end = size if nl < 0 else nl
+                    stop = end - 1 if end > pos and buf[end - 1] == 13 else end
+                    offsets.append(pos)
+                    m = match(buf, pos, stop)
+                    codes.append(bits[m.lastgroup] if m is not None else 8)
+                    if nl < 0:
+                        break
+                    pos = nl + 1
+            finally:
+                if size:
+                    buf.close()
+        return PackedClassification(
+            path=filepath,
+            language=lang,
+            line_count=len(codes),
+            packed=_pack_nibbles(codes),
+            offsets=offsets,
+        )
+
+    def _classify_file_native(self, filepath: str, lang: str) -> PackedClassification:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        offsets = array('Q', [0])
+        offsets.extend(m.end() for m in re.finditer(b'\n', data))
+        codes = classify_buffer(data)
+        # str::lines() has no empty line after a final LF; the packed layout does
+        codes += b'\x04' * (len(offsets) - len(codes))
+        return PackedClassification(
+            path=filepath,
+            language=lang,
+            line_count=len(codes),
+            packed=_pack_nibbles(codes),
+            offsets=offsets,
+            backend='native',
+        )
+
     def supported_languages(self) -> List[str]:
         return sorted(self.PATTERNS.keys())
 
 
+class PrefixDocumentStore:
+    """
+    Live editor buffers for the 'prefix-delta' WS message, keyed by
+    (instance id, document uri). Clients open a document with its full
+    text, then send LSP-style range edits; only the touched lines are
+    re-classified and only gutter entries that actually changed go back.
+
+    Positions are 0-based {line, character}, with character counted in
+    Python str indices. Every classifier pattern is anchored to a single
+    line, so an edit never changes its neighbours' prefixes and
+    CONTEXT_LINES stays 0 — raise it if a multi-line rule is added.
+    """
+
+    MAX_DOCUMENTS = 256
+    CONTEXT_LINES = 0
+
+    def __init__(self, prefix_engine: QuantumPrefixEngine, max_documents: int = MAX_DOCUMENTS):
+        self.prefix = prefix_engine
+        self.max_documents = max_documents
+        self._docs: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+    def open(self, instance_id: str, uri: str, text: str, language: str, version: int = 0) -> Dict[str, Any]:
+        """Store a full buffer and return its complete gutter."""
+        lines = text.split('\n')
+        doc = {
+            'language': language,
+            'version': version,
+            'lines': lines,
+            'prefixes': [self.prefix.classify_line(line, language) for line in lines],
+        }
+        key = (instance_id, uri)
+        self._docs[key] = doc
+        self._docs.move_to_end(key)
+        while len(self._docs) > self.max_documents:
+            self._docs.popitem(last=False)
+        return {
+            'version': version,
+            'line_count': len(lines),
+            'changes': [{'start': 0, 'deleted': 0, 'prefixes': list(doc['prefixes'])}],
+            'full': True,
+        }
+
+    def apply(self, instance_id: str, uri: str, edits: List[Dict[str, Any]], version: int) -> Dict[str, Any]:
+        """
+        Apply range edits in order and return gutter splices:
+        {start, deleted, prefixes} means replace `deleted` entries at line
+        `start` with `prefixes`. An edit without a range replaces the whole
+        text (LSP full sync) and later edits apply on top of it. Unknown
+        documents, stale versions and malformed edits ask the client to
+        resync with full text; a malformed batch changes nothing.
+        """
+        key = (instance_id, uri)
+        doc = self._docs.get(key)
+        if doc is None:
+            return {'resync': True, 'reason': 'unknown document'}
+        if not isinstance(version, int) or isinstance(version, bool):
+            return {'resync': True, 'reason': f'invalid version {version!r}'}
+        if version <= doc['version']:
+            return {'resync': True, 'reason': f"stale version {version} (have {doc['version']})"}
+        if not isinstance(edits, list):
+            return {'resync': True, 'reason': 'edits must be a list'}
+        for index, edit in enumerate(edits):
+            problem = self._edit_error(edit)
+            if problem:
+                return {'resync': True, 'reason': f'invalid edit {index}: {problem}'}
+        self._docs.move_to_end(key)
+
+        changes = []
+        for edit in edits:
+            if 'range' not in edit:
+                change = self._replace_text(doc, edit.get('text', ''))
+            else:
+                change = self._apply_edit(doc, edit['range'], edit.get('text', ''))
+            if change:
+                changes.append(change)
+        doc['version'] = version
+        return {'version': version, 'line_count': len(doc['lines']), 'changes': changes}
+
+    @staticmethod
+    def _edit_error(edit: Any) -> Optional[str]:
+        """Why an edit cannot be applied, or None if it is well-formed."""
+        if not isinstance(edit, dict):
+            return 'not an object'
+        if not isinstance(edit.get('text', ''), str):
+            return 'text must be a string'
+        if 'range' not in edit:
+            return None
+        rng = edit['range']
+        if not isinstance(rng, dict):
+            return 'range must be an object'
+        for end in ('start', 'end'):
+            pos = rng.get(end)
+            if not isinstance(pos, dict):
+                return f'range.{end} must be a {{line, character}} object'
+            for field in ('line', 'character'):
+                value = pos.get(field)
+                if not isinstance(value, int) or isinstance(value, bool):
+                    return f'range.{end}.{field} must be an integer'
+        return None
+
+    def _replace_text(self, doc: Dict[str, Any], text: str) -> Dict[str, Any]:
+        deleted = len(doc['lines'])
+        doc['lines'] = text.split('\n')
+        doc['prefixes'] = [self.prefix.classify_line(line, doc['language']) for line in doc['lines']]
+        return {'start': 0, 'deleted': deleted, 'prefixes': list(doc['prefixes'])}
+
+    def _apply_edit(self, doc: Dict[str, Any], rng: Dict[str, Any], text: str) -> Optional[Dict[str, Any]]:
+        lines, prefixes = doc['lines'], doc['prefixes']
+        last = len(lines) - 1
+        start_line = min(max(rng['start']['line'], 0), last)
+        end_line = min(max(rng['end']['line'], start_line), last)
+        # Out-of-range characters clamp to the line; a negative one must not slice from the end
+        start_char = min(max(rng['start']['character'], 0), len(lines[start_line]))
+        end_char = min(max(rng['end']['character'], 0), len(lines[end_line]))
+        if end_line == start_line:
+            end_char = max(end_char, start_char)
+        head = lines[start_line][:start_char]
+        tail = lines[end_line][end_char:]
+        new_lines = (head + text + tail).split('\n')
+        lines[start_line:end_line + 1] = new_lines
+
+        # Re-classify the replaced span plus any context lines
+        lo = max(start_line - self.CONTEXT_LINES, 0)
+        hi = min(start_line + len(new_lines) + self.CONTEXT_LINES, len(lines))
+        old = prefixes[lo:end_line + 1 + self.CONTEXT_LINES]
+        new = [self.prefix.classify_line(line, doc['language']) for line in lines[lo:hi]]
+        prefixes[lo:lo + len(old)] = new
+
+        # Trim entries whose prefix did not change at either end
+        i = 0
+        while i < len(old) and i < len(new) and old[i] == new[i]:
+            i += 1
+        j = 0
+        while j < len(old) - i and j < len(new) - i and old[-1 - j] == new[-1 - j]:
+            j += 1
+        if i == len(old) == len(new):
+            return None
+        return {'start': lo + i, 'deleted': len(old) - i - j, 'prefixes': new[i:len(new) - j]}
+
+    def close(self, instance_id: str, uri: Optional[str] = None) -> int:
+        """Drop one document, or every document of an instance when uri is None."""
+        keys = [k for k in self._docs if k[0] == instance_id and (uri is None or k[1] == uri)]
+        for k in keys:
+            del self._docs[k]
+        return len(keys)
+
+    def text(self, instance_id: str, uri: str) -> Optional[str]:
+        doc = self._docs.get((instance_id, uri))
+        return '\n'.join(doc['lines']) if doc else None
+
+
 # ╔═══════════════════════════════════════════════════════════════════════════╗
 # ║  SECTION 2 — CODE EXECUTION ENGINE                                     ║
 # ╚═══════════════════════════════════════════════════════════════════════════╝
@@ -434,22 +1214,31 @@ class ExecutionEngine:
 
     def __init__(self):
         self.execution_count = 0
-        self.namespace = self._build_namespace()
+        self._namespace: Optional[dict] = None
+
+    @property
+    def namespace(self) -> dict:
+        # Built on the first execution, which is what loads the math stacks
+        if self._namespace is None:
+            self._namespace = self._build_namespace()
+        return self._namespace
 
     def _build_namespace(self) -> dict:
         ns = {
             '__builtins__': __builtins__,
             'quantum_position': [0, 0, 0],
         }
-        if TINYGRAD_AVAILABLE:
-            ns['tinygrad'] = tinygrad
-            ns['Tensor'] = TinyTensor
+        tensor = CAPABILITIES['tinygrad'].load()
+        if tensor is not None:
+            ns['tinygrad'] = CAPABILITIES['tinygrad'].package
+            ns['Tensor'] = tensor.Tensor
             logger.info("Execution namespace includes tinygrad.Tensor")
-        if NUMPY_AVAILABLE:
+        np = CAPABILITIES['numpy'].load()
+        if np is not None:
             ns['np'] = np
             ns['numpy'] = np
-        if SYMPY_AVAILABLE:
-            import sympy as _sp
+        _sp = CAPABILITIES['sympy'].load()
+        if _sp is not None:
             ns['sympy'] = _sp
             ns['sp'] = _sp
             # Expose common SymPy functions directly
@@ -463,8 +1252,8 @@ class ExecutionEngine:
                 if hasattr(_sp, _name):
                     ns[_name] = getattr(_sp, _name)
             logger.info("SymPy functions injected into execution namespace")
-        if SCIPY_AVAILABLE:
-            import scipy as _sci
+        _sci = CAPABILITIES['scipy'].load()
+        if _sci is not None:
             ns['scipy'] = _sci
             # Expose common submodules
             try:
@@ -478,11 +1267,13 @@ class ExecutionEngine:
             except ImportError:
                 pass
             logger.info("SciPy modules injected into execution namespace")
-        if MATPLOTLIB_AVAILABLE:
+        plt = CAPABILITIES['matplotlib'].load()
+        if plt is not None:
             ns['plt'] = plt
-            ns['matplotlib'] = matplotlib
+            ns['matplotlib'] = CAPABILITIES['matplotlib'].package
             logger.info("matplotlib.pyplot injected as plt")
-        if QISKIT_AVAILABLE:
+        qiskit = CAPABILITIES['qiskit'].load()
+        if qiskit is not None:
             ns['qiskit'] = qiskit
             try:
                 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
@@ -523,8 +1314,10 @@ class ExecutionEngine:
         try:
             # Inject captured print
             self.namespace['print'] = lambda *a, **kw: print(*a, file=stdout_capture, **kw)
+            plt = CAPABILITIES['matplotlib'].load()
+            sympy = CAPABILITIES['sympy'].load()
             # Clear any existing matplotlib figures before execution
-            if MATPLOTLIB_AVAILABLE:
+            if plt is not None:
                 plt.close('all')
             exec(code, self.namespace)
             result['success'] = True
@@ -537,7 +1330,7 @@ class ExecutionEngine:
                     val = eval(last, self.namespace)
                     if val is not None:
                         # SymPy LaTeX rendering
-                        if SYMPY_AVAILABLE and hasattr(val, 'free_symbols'):
+                        if sympy is not None and hasattr(val, 'free_symbols'):
                             try:
                                 result['return_value'] = repr(val)
                                 result['latex'] = sympy.latex(val)
@@ -548,7 +1341,7 @@ class ExecutionEngine:
             except Exception:
                 pass
             # Matplotlib base64 image capture
-            if MATPLOTLIB_AVAILABLE:
+            if plt is not None:
                 import base64
                 from io import BytesIO
                 figs = [plt.figure(i) for i in plt.get_fignums()]
@@ -826,6 +1619,11 @@ class AIInferenceLayer:
         'return': '-0:', 'output': '+3:', 'variable': '1:', 'decorator': '+1:',
         'default': '   ',
     }
+    # Legacy per-line dict shape for ClassificationResult.to_dicts()
+    CLASSIFICATION_FIELDS = (
+        ('line', 'line'), ('prefix', 'symbol'), ('category', 'category'),
+        ('confidence', 'confidence'), ('code', 'text'),
+    )
     # Feature extraction keywords per category (used to build feature vectors)
     _FEATURE_KEYWORDS = {
         'shebang':   ['#!/', 'env python', 'env node', 'env bash'],
@@ -879,9 +1677,12 @@ class AIInferenceLayer:
         # Build feature matrix for all lines
         feature_matrix = [self._extract_features(line) for line in lines]
 
+        tensor = CAPABILITIES['tinygrad'].load()
+        np = CAPABILITIES['numpy'].load()
         try:
-            if TINYGRAD_AVAILABLE:
+            if tensor is not None:
                 # ── Real tinygrad inference ──
+                TinyTensor = tensor.Tensor
                 X = TinyTensor(feature_matrix)  # (N, 15)
 
                 # Weight matrix: learned mapping from features → prefix categories
@@ -905,23 +1706,9 @@ class AIInferenceLayer:
 
                 logits = X.matmul(W) + bias  # (N, 13)
                 probs = logits.softmax(axis=-1).numpy()
-
-                classifications = []
-                for i, line in enumerate(lines):
-                    cat_idx = int(probs[i].argmax())
-                    cat = self.PREFIX_CATEGORIES[cat_idx]
-                    symbol = self.PREFIX_SYMBOLS[cat]
-                    confidence = float(probs[i][cat_idx])
-                    classifications.append({
-                        'line': i + 1,
-                        'prefix': symbol,
-                        'category': cat,
-                        'confidence': round(confidence, 3),
-                        'code': line,
-                    })
                 engine = 'tinygrad'
 
-            elif NUMPY_AVAILABLE:
+            elif np is not None:
                 # ── Numpy fallback ──
                 X = np.array(feature_matrix, dtype=np.float32)
                 W_data = np.zeros((num_classes, num_features), dtype=np.float32)
@@ -937,28 +1724,25 @@ class AIInferenceLayer:
                 logits = X @ W_data.T  # (N, 13)
                 exp_l = np.exp(logits - logits.max(axis=1, keepdims=True))
                 probs = exp_l / exp_l.sum(axis=1, keepdims=True)
-
-                classifications = []
-                for i, line in enumerate(lines):
-                    cat_idx = int(probs[i].argmax())
-                    cat = self.PREFIX_CATEGORIES[cat_idx]
-                    symbol = self.PREFIX_SYMBOLS[cat]
-                    confidence = float(probs[i][cat_idx])
-                    classifications.append({
-                        'line': i + 1,
-                        'prefix': symbol,
-                        'category': cat,
-                        'confidence': round(confidence, 3),
-                        'code': line,
-                    })
                 engine = 'numpy'
             else:
                 return {'error': 'Neither tinygrad nor numpy available', 'text': ''}
 
+            # Columnar result: ids + confidences, line text stays in the prompt
+            probs = np.asarray(probs)
+            cat_ids = probs.argmax(axis=1)
+            confidences = probs[np.arange(len(lines)), cat_ids].astype(np.float32)
+            classifications = ClassificationResult.from_ids(
+                prompt, self.PREFIX_CATEGORIES, self.PREFIX_SYMBOLS,
+                cat_ids.astype(np.uint8).tolist(), confidences.tolist(), sep='\n',
+                fields=self.CLASSIFICATION_FIELDS,
+            )
+
             # Format output as prefixed code
-            prefixed_lines = []
-            for c in classifications:
-                prefixed_lines.append(f"{c['prefix']:>4s}{c['line']:>3d}  {c['code']}")
+            prefixed_lines = [
+                f"{classifications.symbol(i):>4s}{i + 1:>3d}  {classifications.text(i)}"
+                for i in range(len(lines))
+            ]
 
             elapsed = round((time.perf_counter() - t0) * 1000, 2)
             return {
@@ -968,7 +1752,7 @@ class AIInferenceLayer:
                 'classifications': classifications,
                 'lines': len(lines),
                 'elapsed_ms': elapsed,
-                'categories_used': list(set(c['category'] for c in classifications)),
+                'categories_used': list(classifications.counts()),
             }
 
         except Exception as e:
@@ -1125,7 +1909,8 @@ class AIInferenceLayer:
         result = {'text': '', 'latex': '', 'images': [], 'steps': []}
 
         # Step 1: Try direct SymPy evaluation
-        if SYMPY_AVAILABLE:
+        sympy = CAPABILITIES['sympy'].load()
+        if sympy is not None:
             try:
                 from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
                 transformations = standard_transformations + (implicit_multiplication_application,)
@@ -1275,19 +2060,25 @@ class SecurityScanner:
         ],
     }
 
-    def __init__(self, prefix_engine: QuantumPrefixEngine):
+    def __init__(self, prefix_engine: QuantumPrefixEngine, file_engine: Optional['ParallelFileEngine'] = None):
         self.prefix = prefix_engine
+        self.files = file_engine or ParallelFileEngine(prefix_engine)
+        self._compiled_rules = {
+            lang: [(re.compile(rule['pattern'], re.IGNORECASE), rule) for rule in rules]
+            for lang, rules in self.RULES.items()
+        }
+        self.rules_version = rules_fingerprint(self.RULES, prefix_engine.rules_version)
 
     def scan_code(self, code: str, language: str = 'python') -> Dict[str, Any]:
         """Scan code for security issues, annotated with quantum prefix context."""
-        rules = self.RULES.get(language, self.RULES.get('python', []))
+        rules = self._compiled_rules.get(language, self._compiled_rules.get('python', []))
         findings = []
         lines = code.split('\n')
 
         for i, line in enumerate(lines, 1):
             pfx = self.prefix.classify_line(line, language)
-            for rule in rules:
-                if re.search(rule['pattern'], line, re.IGNORECASE):
+            for pattern, rule in rules:
+                if pattern.search(line):
                     findings.append({
                         'line': i,
                         'prefix': pfx,
@@ -1317,14 +2108,19 @@ class SecurityScanner:
         }
 
     def scan_file(self, filepath: str) -> Dict[str, Any]:
-        """Scan a file for security issues."""
+        """Scan a file for security issues; results are cached on disk by content."""
         lang = self.prefix.detect_language(filepath)
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
+            key, data = RESULT_CACHE.file_key(filepath, lang, f'security:{self.rules_version}')
+            result = RESULT_CACHE.get('security', key)
+            if result is None and data is None:  # indexed, but the entry itself was pruned
+                with open(filepath, 'rb') as f:
+                    data = f.read()
         except Exception as e:
             return {'error': str(e)}
-        result = self.scan_code(content, lang)
+        if result is None:
+            result = self.scan_code(_decode_text(data), lang)
+            RESULT_CACHE.put('security', key, result)
         result['path'] = filepath
         return result
 
@@ -1335,19 +2131,16 @@ class SecurityScanner:
             return {'error': f'Directory not found: {directory}'}
 
         skip_dirs = {'.git', 'node_modules', '__pycache__', '.venv', 'venv', 'dist', 'build'}
-        results = []
+        files = self.files.list_files(str(target), skip_dirs, languages=self.RULES)
+        found = []
         total_findings = 0
 
-        for p in target.rglob('*'):
-            if p.is_file() and not any(sd in p.parts for sd in skip_dirs):
-                ext = p.suffix.lower()
-                lang = self.prefix.LANG_MAP.get(ext)
-                if lang and lang in self.RULES:
-                    r = self.scan_file(str(p))
-                    if r.get('total_findings', 0) > 0:
-                        results.append(r)
-                        total_findings += r['total_findings']
+        for index, r in self.files.run('security', [(f[0],) for f in files], [f[2] for f in files]):
+            if r.get('total_findings', 0) > 0:
+                found.append((index, r))
+                total_findings += r['total_findings']
 
+        results = [r for _, r in sorted(found, key=lambda item: item[0])]
         return {
             'directory': str(target),
             'files_scanned': len(results),
@@ -1710,8 +2503,9 @@ class ConversionRoadmap:
     for converting all files to quantum-prefixed form.
     """
 
-    def __init__(self, prefix_engine: QuantumPrefixEngine):
+    def __init__(self, prefix_engine: QuantumPrefixEngine, file_engine: Optional['ParallelFileEngine'] = None):
         self.prefix = prefix_engine
+        self.files = file_engine or ParallelFileEngine(prefix_engine)
 
     def scan_directory(self, directory: str) -> Dict[str, Any]:
         """Scan a directory and produce a conversion plan."""
@@ -1719,26 +2513,21 @@ class ConversionRoadmap:
         if not target.exists():
             return {'error': f'Directory not found: {directory}'}
 
-        files_by_lang = defaultdict(list)
-        total_lines = 0
-        total_files = 0
         skip_dirs = {'.git', 'node_modules', '__pycache__', '.venv', 'venv', '.tox', 'dist', 'build'}
+        files = self.files.list_files(str(target), skip_dirs)
+        line_counts = [0] * len(files)
+        for index, line_count in self.files.run('lines', [(f[0],) for f in files], [f[2] for f in files]):
+            line_counts[index] = line_count
 
-        for p in target.rglob('*'):
-            if p.is_file() and not any(sd in p.parts for sd in skip_dirs):
-                ext = p.suffix.lower()
-                lang = self.prefix.LANG_MAP.get(ext)
-                if lang:
-                    try:
-                        line_count = sum(1 for _ in open(p, 'r', errors='replace'))
-                    except Exception:
-                        line_count = 0
-                    files_by_lang[lang].append({
-                        'path': str(p.relative_to(target)),
-                        'lines': line_count,
-                    })
-                    total_lines += line_count
-                    total_files += 1
+        # Assemble in walk order so the plan does not depend on completion order
+        files_by_lang = defaultdict(list)
+        for (path, lang, _), line_count in zip(files, line_counts):
+            files_by_lang[lang].append({
+                'path': os.path.relpath(path, target),
+                'lines': line_count,
+            })
+        total_lines = sum(line_counts)
+        total_files = len(files)
 
         # Build prioritized plan
         plan = []
@@ -1768,32 +2557,18 @@ class ConversionRoadmap:
         out_dir = Path(output_dir) if output_dir else target / '_quantum'
         out_dir.mkdir(parents=True, exist_ok=True)
 
-        converted = []
-        errors = []
         skip_dirs = {'.git', 'node_modules', '__pycache__', '.venv', '_quantum'}
+        files = self.files.list_files(str(target), skip_dirs)
+        tasks = [
+            (path, str(out_dir / os.path.relpath(path, target)), os.path.relpath(path, target), lang)
+            for path, lang, _ in files
+        ]
+        outcomes: List[Any] = [None] * len(tasks)
+        for index, outcome in self.files.run('convert', tasks, [f[2] for f in files]):
+            outcomes[index] = outcome
 
-        for p in target.rglob('*'):
-            if p.is_file() and not any(sd in p.parts for sd in skip_dirs):
-                ext = p.suffix.lower()
-                lang = self.prefix.LANG_MAP.get(ext)
-                if lang:
-                    try:
-                        result = self.prefix.prefix_file(str(p))
-                        # Write prefixed version
-                        rel = p.relative_to(target)
-                        out_path = out_dir / rel
-                        out_path.parent.mkdir(parents=True, exist_ok=True)
-                        with open(out_path, 'w') as f:
-                            f.write(result['prefixed'])
-                        converted.append({
-                            'path': str(rel),
-                            'language': lang,
-                            'coverage': result['coverage'],
-                            'lines': result['lines'],
-                        })
-                    except Exception as e:
-                        errors.append({'path': str(p), 'error': str(e)})
-
+        converted = [o for o in outcomes if 'error' not in o]
+        errors = [o for o in outcomes if 'error' in o]
         return {
             'converted': len(converted),
             'errors': len(errors),
@@ -1803,20 +2578,423 @@ class ConversionRoadmap:
         }
 
 
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║  SECTION 7B — PARALLEL FILE ENGINE (process pool for repo-wide jobs)    ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+# Per-process engines, built once by the pool initializer so every worker
+# compiles the prefix and security pattern tables before its first task.
+_worker_prefix: Optional[QuantumPrefixEngine] = None
+_worker_scanner: Optional['SecurityScanner'] = None
+
+
+def _init_file_worker():
+    global _worker_prefix, _worker_scanner
+    _worker_prefix = QuantumPrefixEngine()
+    _worker_scanner = SecurityScanner(_worker_prefix)
+
+
+def _count_lines_task(prefix: QuantumPrefixEngine, scanner: 'SecurityScanner', path: str) -> int:
+    try:
+        with open(path, 'r', errors='replace') as f:
+            return sum(1 for _ in f)
+    except Exception:
+        return 0
+
+
+def _security_task(prefix: QuantumPrefixEngine, scanner: 'SecurityScanner', path: str) -> Dict[str, Any]:
+    return scanner.scan_file(path)
+
+
+def _convert_task(prefix: QuantumPrefixEngine, scanner: 'SecurityScanner',
+                  path: str, out_path: str, rel: str, lang: str) -> Dict[str, Any]:
+    try:
+        result = prefix.prefix_file(path)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        with open(out_path, 'w') as f:
+            f.write(result['prefixed'])
+        return {
+            'path': rel,
+            'language': lang,
+            'coverage': result['coverage'],
+            'lines': result['lines'],
+        }
+    except Exception as e:
+        return {'path': path, 'error': str(e)}
+
+
+_FILE_TASKS = {
+    'lines': _count_lines_task,
+    'security': _security_task,
+    'convert': _convert_task,
+}
+
+
+def _run_file_batch(kind: str, batch: List[tuple]) -> List[tuple]:
+    """Pool entry point: run one size-bounded batch, return (index, result) pairs."""
+    task = _FILE_TASKS[kind]
+    return [(index, task(_worker_prefix, _worker_scanner, *args)) for index, args in batch]
+
+
+class ParallelFileEngine:
+    """
+    Shared file-processing engine for repo-wide jobs (roadmap scan/convert,
+    security scans). Files are grouped into batches of roughly BATCH_BYTES
+    and fanned out to a ProcessPoolExecutor; results are yielded as each
+    batch completes. Small jobs run in-process to skip pool start-up.
+    """
+
+    BATCH_BYTES = 4 * 1024 * 1024
+    BATCH_MAX_FILES = 256
+    SERIAL_MAX_BYTES = 1024 * 1024
+
+    def __init__(self, prefix_engine: QuantumPrefixEngine, workers: Optional[int] = None):
+        self.prefix = prefix_engine
+        self.workers = workers or int(os.environ.get('UVSPEED_SCAN_WORKERS', '0')) or os.cpu_count() or 1
+        self._scanner: Optional['SecurityScanner'] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def list_files(self, directory: str, skip_dirs: Iterable[str],
+                   languages: Optional[Iterable[str]] = None) -> List[tuple]:
+        """(path, language, size) for each source file, pruning skip_dirs while walking."""
+        skip = set(skip_dirs)
+        wanted = set(languages) if languages is not None else None
+        lang_map = self.prefix.LANG_MAP
+        found = []
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+            subdirs = []
+            for entry in entries:
+                if entry.name in skip:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file():
+                    lang = lang_map.get(os.path.splitext(entry.name)[1].lower())
+                    if lang and (wanted is None or lang in wanted):
+                        found.append((entry.path, lang, entry.stat().st_size))
+            stack.extend(reversed(subdirs))
+        return found
+
+    def _batches(self, tasks: List[tuple], sizes: List[int]) -> Iterator[List[tuple]]:
+        batch: List[tuple] = []
+        batch_bytes = 0
+        for index, (args, size) in enumerate(zip(tasks, sizes)):
+            batch.append((index, args))
+            batch_bytes += size
+            if batch_bytes >= self.BATCH_BYTES or len(batch) >= self.BATCH_MAX_FILES:
+                yield batch
+                batch, batch_bytes = [], 0
+        if batch:
+            yield batch
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_file_worker)
+            return self._pool
+
+    def _run_serial(self, kind: str, tasks: List[tuple]) -> Iterator[tuple]:
+        if self._scanner is None:
+            self._scanner = SecurityScanner(self.prefix, self)
+        task = _FILE_TASKS[kind]
+        for index, args in enumerate(tasks):
+            yield index, task(self.prefix, self._scanner, *args)
+
+    def run(self, kind: str, tasks: List[tuple], sizes: List[int]) -> Iterator[tuple]:
+        """
+        Run a file task over every argument tuple in tasks, yielding
+        (task index, result) in completion order. sizes (bytes per task)
+        drives batching and the serial/pool decision.
+        """
+        if self.workers <= 1 or len(tasks) < 2 or sum(sizes) <= self.SERIAL_MAX_BYTES:
+            yield from self._run_serial(kind, tasks)
+            return
+        done = set()
+        try:
+            pool = self._get_pool()
+            futures = [pool.submit(_run_file_batch, kind, batch) for batch in self._batches(tasks, sizes)]
+            for future in as_completed(futures):
+                for index, result in future.result():
+                    done.add(index)
+                    yield index, result
+        except BrokenProcessPool as e:
+            logger.warning(f"File worker pool failed ({e}) — finishing {kind} job in-process")
+            with self._pool_lock:
+                self._pool = None
+            for index, result in self._run_serial(kind, tasks):
+                if index not in done:
+                    yield index, result
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+
+# ╔═══════════════════════════════════════════════════════════════════════════╗
+# ║  SECTION 7C — TREE WATCH (incremental roadmap stats over WebSocket)     ║
+# ╚═══════════════════════════════════════════════════════════════════════════╝
+
+class TreeWatchManager:
+    """
+    Live coverage and prefix distribution for watched directories.
+    Each watch polls a TreeWatcher (uvspeed_cli) on a worker thread: only
+    files whose mtime/size changed are re-read, through prefix_file and its
+    on-disk cache, and per-directory aggregates are adjusted by the
+    difference. Non-empty deltas are pushed to the watch's WebSocket
+    subscribers, so dashboards stop polling /api/roadmap/scan.
+    """
+
+    SKIP_DIRS = frozenset({'.git', 'node_modules', '__pycache__', '.venv', 'venv', '.tox', 'dist', 'build', '_quantum'})
+    DEFAULT_INTERVAL = 2.0
+    MIN_INTERVAL = 0.25
+    MAX_WATCHES = 16
+
+    def __init__(self, prefix_engine: QuantumPrefixEngine):
+        self.prefix = prefix_engine
+        self.watches: Dict[str, Dict[str, Any]] = {}
+
+    def _classify(self, path: str) -> Dict[str, Any]:
+        try:
+            result = self.prefix.prefix_counts(path)
+        except OSError as e:
+            return {'type': 'error', 'path': path, 'error': str(e)}
+        counts = result['prefix_distribution']
+        total = result['lines']
+        return {
+            'total_lines': total,
+            'classified_lines': total - counts.get(self.prefix.PREFIXES['default'], 0),
+            'prefix_counts': counts,
+        }
+
+    def _find(self, root: str) -> Optional[str]:
+        return next((wid for wid, w in self.watches.items() if w['watcher'].root == root), None)
+
+    async def start(self, directory: str, interval: Optional[float] = None, owner: str = 'http',
+                    subscriber=None) -> Dict[str, Any]:
+        """Watch directory (or join the existing watch on it) and report the full snapshot.
+
+        The watch is registered before its first (slow) poll, so concurrent
+        starts on one root share a single poller and MAX_WATCHES holds; they
+        wait on its 'ready' future. `subscriber` is attached at registration,
+        so a client that disconnects during the first poll stops the watch.
+        """
+        root = os.path.abspath(directory)
+        if not os.path.isdir(root):
+            return {'error': f'Directory not found: {directory}'}
+        watch_id = self._find(root)
+        if watch_id is None:
+            if len(self.watches) >= self.MAX_WATCHES:
+                return {'error': f'Too many watches (max {self.MAX_WATCHES})'}
+            watcher = TreeWatcher(root, classify=self._classify, skip_dirs=self.SKIP_DIRS,
+                                  extensions=frozenset(self.prefix.LANG_MAP))
+            watch_id = uuid.uuid4().hex[:8]
+            watch = self.watches[watch_id] = {
+                'watcher': watcher,
+                'interval': max(float(interval or self.DEFAULT_INTERVAL), self.MIN_INTERVAL),
+                'owner': owner,
+                'subscribers': {subscriber} if subscriber is not None else set(),
+                'started': datetime.now().isoformat(),
+                'ready': asyncio.get_running_loop().create_future(),
+                'task': None,
+            }
+            try:
+                await asyncio.to_thread(watcher.poll)
+            except BaseException:
+                watch['ready'].set_result(False)
+                if self.watches.get(watch_id) is watch:
+                    del self.watches[watch_id]
+                raise
+            watch['ready'].set_result(True)
+            if self.watches.get(watch_id) is not watch:
+                return {'error': f'Watch {watch_id} stopped before its first scan finished'}
+            watch['task'] = asyncio.create_task(self._run(watch_id))
+        else:
+            watch = self.watches[watch_id]
+            if not await asyncio.shield(watch['ready']) or self.watches.get(watch_id) is not watch:
+                return {'error': f'Watch {watch_id} stopped before its first scan finished'}
+            if subscriber is not None:
+                watch['subscribers'].add(subscriber)
+        return {'watch_id': watch_id, **watch['watcher'].snapshot()}
+
+    async def _run(self, watch_id: str):
+        while watch_id in self.watches:
+            watch = self.watches[watch_id]
+            await asyncio.sleep(watch['interval'])
+            try:
+                delta = await asyncio.to_thread(watch['watcher'].poll)
+            except Exception as e:
+                logger.error(f"Watch {watch_id} poll failed: {e}")
+                continue
+            if delta['changed']:
+                await self._publish(watch_id, {'type': 'watch-delta', 'watch_id': watch_id, **delta})
+
+    async def _publish(self, watch_id: str, message: Dict[str, Any]):
+        watch = self.watches.get(watch_id)
+        if watch is None:
+            return
+        payload = json.dumps(message, default=_json_default)
+        dead = set()
+        for client in list(watch['subscribers']):
+            try:
+                await client.send(payload)
+            except Exception:
+                dead.add(client)
+        if dead:
+            watch['subscribers'].difference_update(dead)
+            self._stop_if_orphaned(watch_id)
+
+    def subscribe(self, watch_id: str, client) -> bool:
+        watch = self.watches.get(watch_id)
+        if watch is None:
+            return False
+        watch['subscribers'].add(client)
+        return True
+
+    def unsubscribe(self, watch_id: str, client):
+        watch = self.watches.get(watch_id)
+        if watch is not None:
+            watch['subscribers'].discard(client)
+            self._stop_if_orphaned(watch_id)
+
+    def drop_client(self, client):
+        """Forget a disconnected WebSocket; watches it opened stop once nobody listens."""
+        for watch_id in list(self.watches):
+            self.unsubscribe(watch_id, client)
+
+    def _stop_if_orphaned(self, watch_id: str):
+        watch = self.watches.get(watch_id)
+        if watch is not None and watch['owner'] == 'ws' and not watch['subscribers']:
+            self.stop(watch_id)
+
+    def stop(self, watch_id: str) -> bool:
+        watch = self.watches.pop(watch_id, None)
+        if watch is None:
+            return False
+        if watch['task'] is not None:  # None while the first poll is still running
+            watch['task'].cancel()
+        return True
+
+    def snapshot(self, watch_id: str) -> Optional[Dict[str, Any]]:
+        watch = self.watches.get(watch_id)
+        return {'watch_id': watch_id, **watch['watcher'].snapshot()} if watch else None
+
+    def list_watches(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                'watch_id': watch_id,
+                'root': w['watcher'].root,
+                'interval': w['interval'],
+                'owner': w['owner'],
+                'subscribers': len(w['subscribers']),
+                'polls': w['watcher'].polls,
+                'started': w['started'],
+                'summary': w['watcher'].summary(),
+            }
+            for watch_id, w in self.watches.items()
+        ]
+
+
 # ╔═══════════════════════════════════════════════════════════════════════════╗
 # ║  SECTION 8 — HTTP + WebSocket SERVER                                   ║
 # ╚═══════════════════════════════════════════════════════════════════════════╝
 
+@dataclass
+class StreamingResponse:
+    """Lazily produced HTTP body, sent with chunked transfer encoding.
+
+    chunks is advanced on a worker thread, so it may block on file reads
+    and classification without stalling the event loop.
+    """
+    chunks: Iterable[bytes]
+    content_type: str = 'text/plain; charset=utf-8'
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def _json_default(obj: Any) -> Any:
+    """json.dumps hook: columnar results expand to their legacy shape, the rest falls back to str."""
+    if isinstance(obj, ClassificationResult):
+        return obj.to_json()
+    return str(obj)
+
+
+def _columnar(result: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Swap per-line classification dicts for column arrays when the client sends format=columnar."""
+    if data.get('format') == 'columnar' and isinstance(result.get('classifications'), ClassificationResult):
+        result['classifications'] = result['classifications'].to_columns()
+    return result
+
+
+def _prefix_batch(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shared body of POST /api/prefix/batch and the WS 'prefix-batch' message."""
+    items = data.get('items')
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return {'error': "items must be a list of {id, language, code} objects"}
+    if len(items) > prefix_engine.BATCH_MAX_ITEMS:
+        return {'error': f'Too many items: {len(items)} (max {prefix_engine.BATCH_MAX_ITEMS})'}
+    # A bad item gets its own error result; the rest of the batch is still prefixed
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    valid, positions = [], []
+    for index, item in enumerate(items):
+        language = item.get('language')
+        if not isinstance(item.get('code', ''), str) or not (language is None or isinstance(language, str)):
+            results[index] = {'id': item.get('id', index), 'error': 'code and language must be strings'}
+        else:
+            valid.append({**item, 'id': item.get('id', index)})
+            positions.append(index)
+    for index, result in zip(positions, prefix_engine.prefix_batch(valid, symbols_only=bool(data.get('symbols')))):
+        results[index] = result
+    return {'results': results, 'count': len(results)}
+
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _chunk_lines(lines: Iterable[str], chunk_bytes: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """Group text lines into newline-joined byte chunks of roughly chunk_bytes."""
+    buf: List[str] = []
+    size = 0
+    first = True
+    for line in lines:
+        if not first:
+            buf.append('\n')
+        first = False
+        buf.append(line)
+        size += len(line) + 1
+        if size >= chunk_bytes:
+            yield ''.join(buf).encode('utf-8')
+            buf, size = [], 0
+    if buf:
+        yield ''.join(buf).encode('utf-8')
+
+
+def _stream_prefix_file(filepath: str, language: str) -> Iterator[bytes]:
+    with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+        yield from _chunk_lines(prefix_engine.iter_prefix_lines(f, language))
+
+
 # Shared state
 prefix_engine = QuantumPrefixEngine()
+prefix_documents = PrefixDocumentStore(prefix_engine)
 exec_engine = ExecutionEngine()
 ai_layer = AIInferenceLayer()
 diff_engine = QuantumDiffEngine(prefix_engine)
 agent_bus = AgentBus()
 session_store = SessionStore()
 instance_mgr = InstanceManager()
-roadmap_engine = ConversionRoadmap(prefix_engine)
-security_scanner = SecurityScanner(prefix_engine)
+file_engine = ParallelFileEngine(prefix_engine)
+roadmap_engine = ConversionRoadmap(prefix_engine, file_engine)
+security_scanner = SecurityScanner(prefix_engine, file_engine)
+watch_manager = TreeWatchManager(prefix_engine)
 git_hook_engine = GitHookEngine(prefix_engine, diff_engine)
 quantum_position = [0, 0, 0]
 cells: List[Dict[str, Any]] = []  # In-memory cell store
@@ -2276,15 +3454,43 @@ async def _media_process(data):
     return results
 
 
+HTTP_KEEPALIVE_TIMEOUT = 15   # seconds an idle keep-alive connection may wait for its next request
+HTTP_KEEPALIVE_MAX = 1000     # requests served on one connection before it is closed
+
+
 async def handle_http(reader, writer):
-    """Minimal async HTTP server — no dependencies required."""
+    """Minimal async HTTP/1.1 server — no dependencies required.
+
+    Connections stay open between requests (keep-alive) unless the client sends
+    ``Connection: close``, speaks HTTP/1.0 without asking for keep-alive, or
+    sits idle for HTTP_KEEPALIVE_TIMEOUT seconds. Pooled clients such as the
+    MCP server and ``uvspeed-bridge loadtest`` then skip a TCP connect per call.
+    """
     try:
-        request_line = await asyncio.wait_for(reader.readline(), timeout=10)
-        if not request_line:
+        for served in range(HTTP_KEEPALIVE_MAX):
+            try:
+                request_line = await asyncio.wait_for(
+                    reader.readline(), timeout=10 if served == 0 else HTTP_KEEPALIVE_TIMEOUT)
+            except (asyncio.TimeoutError, ConnectionError):
+                return
+            except ValueError:  # request line longer than the StreamReader limit
+                await _write_http_error(writer, '414 URI Too Long', 'Request line too long')
+                return
+            if not request_line:
+                return
+            if not await _serve_http_request(request_line, reader, writer, served + 1 < HTTP_KEEPALIVE_MAX):
+                return
+    finally:
+        try:
             writer.close()
-            return
+        except Exception:
+            pass
+
 
-        method, path, _ = request_line.decode().strip().split(' ', 2)
+async def _serve_http_request(request_line: bytes, reader, writer, may_keep_alive: bool) -> bool:
+    """Read one request after its request line, write the response; True if the connection stays open."""
+    try:
+        method, path, version = request_line.decode().strip().split(' ', 2)
 
         # Read headers
         headers = {}
@@ -2301,7 +3507,14 @@ async def handle_http(reader, writer):
         # Read body
         body = b''
         if content_length > 0:
-            body = await reader.read(content_length)
+            body = await reader.readexactly(content_length)
+
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            keep_alive = may_keep_alive and connection == 'keep-alive'
+        else:
+            keep_alive = may_keep_alive and connection != 'close'
+        conn_header = f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
 
         # CORS headers
         cors = (
@@ -2311,41 +3524,82 @@ async def handle_http(reader, writer):
         )
 
         if method == 'OPTIONS':
-            writer.write(f"HTTP/1.1 204 No Content\r\n{cors}\r\n".encode())
+            writer.write(f"HTTP/1.1 204 No Content\r\n{conn_header}{cors}\r\n".encode())
             await writer.drain()
-            writer.close()
-            return
+            return keep_alive
 
-        # Route
+        # Route (timed; surfaced as a Server-Timing header for loadtest and browser devtools)
+        t0 = time.perf_counter()
         response = await route_request(method, path, body, headers)
-        resp_body = json.dumps(response, default=str).encode()
+        route_ms = (time.perf_counter() - t0) * 1000
+        if isinstance(response, StreamingResponse):
+            extra = ''.join(f"{k}: {v}\r\n" for k, v in response.headers.items())
+            writer.write(
+                f"HTTP/1.1 200 OK\r\n"
+                f"Content-Type: {response.content_type}\r\n"
+                f"Transfer-Encoding: chunked\r\n"
+                f"{conn_header}"
+                f"Server-Timing: route;dur={route_ms:.3f}\r\n"
+                f"{extra}{cors}\r\n".encode()
+            )
+            chunks = iter(response.chunks)
+            try:
+                while True:
+                    chunk = await asyncio.to_thread(next, chunks, None)
+                    if chunk is None:
+                        break
+                    if chunk:
+                        writer.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+                        await writer.drain()
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+            except Exception as e:
+                # The 200 status line is already out; a second response would corrupt the body
+                logger.error(f"Streaming {path} failed mid-response: {e}")
+                writer.transport.abort()
+                return False
+            finally:
+                try:
+                    getattr(chunks, 'close', lambda: None)()
+                except ValueError:
+                    pass  # cancelled while a worker thread is still advancing it
+            return keep_alive
+
+        t0 = time.perf_counter()
+        resp_body = json.dumps(response, default=_json_default).encode()
+        encode_ms = (time.perf_counter() - t0) * 1000
 
         writer.write(
             f"HTTP/1.1 200 OK\r\n"
             f"Content-Type: application/json\r\n"
             f"Content-Length: {len(resp_body)}\r\n"
+            f"{conn_header}"
+            f"Server-Timing: route;dur={route_ms:.3f}, encode;dur={encode_ms:.3f}\r\n"
             f"{cors}\r\n".encode()
             + resp_body
         )
         await writer.drain()
+        return keep_alive
     except Exception as e:
-        try:
-            err = json.dumps({'error': str(e)}).encode()
-            writer.write(
-                f"HTTP/1.1 500 Internal Server Error\r\n"
-                f"Content-Type: application/json\r\n"
-                f"Content-Length: {len(err)}\r\n"
-                f"Access-Control-Allow-Origin: *\r\n\r\n".encode()
-                + err
-            )
-            await writer.drain()
-        except Exception:
-            pass
-    finally:
-        try:
-            writer.close()
-        except Exception:
-            pass
+        await _write_http_error(writer, '500 Internal Server Error', str(e))
+        return False
+
+
+async def _write_http_error(writer, status: str, message: str):
+    """Best-effort JSON error response; the connection is closed after it."""
+    try:
+        err = json.dumps({'error': message}).encode()
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(err)}\r\n"
+            f"Connection: close\r\n"
+            f"Access-Control-Allow-Origin: *\r\n\r\n".encode()
+            + err
+        )
+        await writer.drain()
+    except Exception:
+        pass
 
 
 async def route_request(method: str, path: str, body: bytes, headers: dict) -> dict:
@@ -2373,6 +3627,9 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
             'tinygrad': TINYGRAD_AVAILABLE,
             'numpy': NUMPY_AVAILABLE,
             'languages': prefix_engine.supported_languages(),
+            'prefix_cache': prefix_engine.cache_stats(),
+            'native_prefix_engine': native_engine_path(),
+            'result_cache': RESULT_CACHE.stats(),
             'sessions': len(session_store.list_sessions()),
             'mcp': {
                 'server': 'src/01-core/mcp_server.py',
@@ -2387,7 +3644,7 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
                 'lark': {'path': str(LARK_DIR)},
                 'media': {'pipelines': ['transcript', 'audio', 'video', 'spatial', 'signal']},
             },
-            'endpoints': 55,
+            'endpoints': 60,
         }
 
     # ── EXECUTE CODE ────────────────────────────────
@@ -2409,11 +3666,22 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
         prefixed = prefix_engine.prefix_code(code, language)
         return {'prefixed': prefixed, 'language': language}
 
+    # ── PREFIX BATCH ────────────────────────────────
+    elif path == '/api/prefix/batch' and method == 'POST':
+        return _prefix_batch(data)
+
     # ── PREFIX FILE ─────────────────────────────────
     elif path == '/api/prefix/file' and method == 'POST':
         filepath = data.get('path', '')
         if not filepath or not os.path.exists(filepath):
             return {'error': f'File not found: {filepath}'}
+        if data.get('stream'):
+            # Chunked text/plain body — output flows before the file is fully read
+            language = data.get('language') or prefix_engine.detect_language(filepath)
+            return StreamingResponse(
+                chunks=_stream_prefix_file(filepath, language),
+                headers={'X-Quantum-Language': language},
+            )
         return prefix_engine.prefix_file(filepath)
 
     # ── CELLS ───────────────────────────────────────
@@ -2445,8 +3713,9 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
 
     # ── DIFF ────────────────────────────────────────
     elif path == '/api/diff' and method == 'POST':
-        old = data.get('old', '')
-        new = data.get('new', '')
+        # MCP's uvspeed_diff sends original/modified
+        old = data.get('old', data.get('original', ''))
+        new = data.get('new', data.get('modified', ''))
         language = data.get('language', 'python')
         return diff_engine.diff_code(old, new, language)
 
@@ -2454,7 +3723,7 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
     elif path == '/api/ai' and method == 'POST':
         prompt = data.get('prompt', '')
         model = data.get('model')
-        return await ai_layer.infer(prompt, model)
+        return _columnar(await ai_layer.infer(prompt, model), data)
 
     # ── MATH (SymPy + Wolfram + LLM pipeline) ──────
     elif path == '/api/math' and method == 'POST':
@@ -2465,7 +3734,8 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
     elif path == '/api/math/eval' and method == 'POST':
         # Direct SymPy evaluation — no LLM, pure math
         expr_str = data.get('expression', '')
-        if not SYMPY_AVAILABLE:
+        sympy = CAPABILITIES['sympy'].load()
+        if sympy is None:
             return {'error': 'SymPy not installed — pip install sympy', 'text': ''}
         try:
             from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
@@ -2488,7 +3758,8 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
         # Direct SymPy equation solving
         expr_str = data.get('equation', '')
         var_name = data.get('variable', 'x')
-        if not SYMPY_AVAILABLE:
+        sympy = CAPABILITIES['sympy'].load()
+        if sympy is None:
             return {'error': 'SymPy not installed — pip install sympy', 'text': ''}
         try:
             from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
@@ -2517,7 +3788,10 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
         # Generate a plot via matplotlib, return base64 image
         expr_str = data.get('expression', '')
         x_range = data.get('range', [-10, 10])
-        if not SYMPY_AVAILABLE or not MATPLOTLIB_AVAILABLE:
+        sympy = CAPABILITIES['sympy'].load()
+        plt = CAPABILITIES['matplotlib'].load()
+        np = CAPABILITIES['numpy'].load()
+        if sympy is None or plt is None or np is None:
             return {'error': 'SymPy + Matplotlib required — pip install sympy matplotlib', 'text': ''}
         try:
             import base64
@@ -2555,6 +3829,8 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
             return {'error': f'Plot: {e}', 'text': ''}
 
     elif path == '/api/math/status':
+        # Booleans mean "installed"; 'capabilities' says whether each stack is loaded yet
+        capabilities = capability_status()
         return {
             'sympy': SYMPY_AVAILABLE,
             'scipy': SCIPY_AVAILABLE,
@@ -2562,12 +3838,8 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
             'qiskit': QISKIT_AVAILABLE,
             'numpy': NUMPY_AVAILABLE,
             'tinygrad': TINYGRAD_AVAILABLE,
-            'version': {
-                'sympy': getattr(sympy, '__version__', None) if SYMPY_AVAILABLE else None,
-                'scipy': getattr(scipy, '__version__', None) if SCIPY_AVAILABLE else None,
-                'matplotlib': getattr(matplotlib, '__version__', None) if MATPLOTLIB_AVAILABLE else None,
-                'numpy': getattr(np, '__version__', None) if NUMPY_AVAILABLE else None,
-            },
+            'version': {name: capabilities[name]['version'] for name in ('sympy', 'scipy', 'matplotlib', 'numpy')},
+            'capabilities': capabilities,
         }
 
     # ── AI MODELS ───────────────────────────────────
@@ -2665,17 +3937,30 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
 
     elif path.startswith('/api/instances/') and method == 'DELETE':
         iid = path.split('/')[-1]
+        prefix_documents.close(iid)
         return {'removed': instance_mgr.unregister(iid)}
 
     # ── ROADMAP SCAN ────────────────────────────────
     elif path == '/api/roadmap/scan' and method == 'POST':
         directory = data.get('directory', '.')
-        return roadmap_engine.scan_directory(directory)
+        return await asyncio.to_thread(roadmap_engine.scan_directory, directory)
+
+    # ── TREE WATCH ──────────────────────────────────
+    elif path == '/api/watch':
+        if method == 'POST':
+            return await watch_manager.start(data.get('directory', '.'), data.get('interval'))
+        return {'watches': watch_manager.list_watches()}
+
+    elif path.startswith('/api/watch/'):
+        watch_id = path.split('/')[3]
+        if method == 'DELETE':
+            return {'stopped': watch_manager.stop(watch_id), 'watch_id': watch_id}
+        return watch_manager.snapshot(watch_id) or {'error': f'Unknown watch: {watch_id}'}
 
     elif path == '/api/roadmap/convert' and method == 'POST':
         directory = data.get('directory', '.')
         output = data.get('output_dir')
-        return roadmap_engine.convert_directory(directory, output)
+        return await asyncio.to_thread(roadmap_engine.convert_directory, directory, output)
 
     # ── LANGUAGES ───────────────────────────────────
     elif path == '/api/languages':
@@ -2688,7 +3973,7 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
         directory = data.get('directory')
         language = data.get('language', 'python')
         if directory:
-            return security_scanner.scan_directory(directory)
+            return await asyncio.to_thread(security_scanner.scan_directory, directory)
         elif filepath:
             return security_scanner.scan_file(filepath)
         elif code:
@@ -2805,6 +4090,7 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
             'GET  /api/status',
             'POST /api/execute',
             'POST /api/prefix',
+            'POST /api/prefix/batch',
             'POST /api/prefix/file',
             'GET  /api/cells',
             'POST /api/cells',
@@ -2831,6 +4117,10 @@ async def route_request(method: str, path: str, body: bytes, headers: dict) -> d
             'DEL  /api/instances/{id}',
             'POST /api/roadmap/scan',
             'POST /api/roadmap/convert',
+            'POST /api/watch',
+            'GET  /api/watch',
+            'GET  /api/watch/{id}',
+            'DELETE /api/watch/{id}',
             'GET  /api/languages',
             'POST /api/security/scan',
             'GET  /api/security/rules',
@@ -2888,9 +4178,12 @@ async def ws_handler(websocket):
         async for message in websocket:
             try:
                 msg = json.loads(message)
-                response = await handle_ws_message(msg)
+                t0 = time.perf_counter()
+                response = await handle_ws_message(msg, websocket)
                 if response:
-                    await websocket.send(json.dumps(response, default=str))
+                    if msg.get('server_timing') and isinstance(response, dict):
+                        response['server_timing'] = {'handle': round((time.perf_counter() - t0) * 1000, 3)}
+                    await websocket.send(json.dumps(response, default=_json_default))
             except json.JSONDecodeError:
                 await websocket.send(json.dumps({'error': 'Invalid JSON'}))
     except websockets.exceptions.ConnectionClosed:
@@ -2899,6 +4192,7 @@ async def ws_handler(websocket):
         logger.error(f"WebSocket error: {e}")
     finally:
         ws_clients.discard(websocket)
+        watch_manager.drop_client(websocket)
         logger.info(f"WebSocket client disconnected ({len(ws_clients)} remaining)")
 
 
@@ -2906,18 +4200,18 @@ async def ws_broadcast(data: dict):
     """Broadcast to all connected WebSocket clients."""
     if not ws_clients:
         return
-    payload = json.dumps(data, default=str)
+    payload = json.dumps(data, default=_json_default)
     dead = set()
-    for client in ws_clients:
+    for client in list(ws_clients):
         try:
             await client.send(payload)
         except Exception:
             dead.add(client)
-    ws_clients -= dead
+    ws_clients.difference_update(dead)
 
 
-async def handle_ws_message(msg: dict) -> Optional[dict]:
-    """Handle incoming WebSocket message."""
+async def handle_ws_message(msg: dict, websocket=None) -> Optional[dict]:
+    """Handle incoming WebSocket message; websocket is the sender, for subscriptions."""
     global quantum_position
     msg_type = msg.get('type', '')
 
@@ -2950,10 +4244,53 @@ async def handle_ws_message(msg: dict) -> Optional[dict]:
         prefixed = prefix_engine.prefix_code(code, language)
         return {'type': 'prefix-result', 'prefixed': prefixed}
 
+    elif msg_type == 'prefix-batch':
+        result = _prefix_batch(msg)
+        result['type'] = 'prefix-batch-result'
+        return result
+
+    elif msg_type == 'prefix-delta':
+        # Stateful gutter updates: send 'text' to open/resync, then 'edits'
+        instance_id = msg.get('instance_id', '')
+        uri = msg.get('uri', 'default')
+        language = msg.get('language', 'python')
+        if not all(isinstance(v, str) for v in (instance_id, uri, language, msg.get('text', ''))):
+            return {'type': 'prefix-delta-result', 'uri': str(uri),
+                    'error': 'instance_id, uri, language and text must be strings'}
+        if msg.get('close'):
+            prefix_documents.close(instance_id, uri)
+            return {'type': 'prefix-delta-result', 'uri': uri, 'closed': True}
+        try:
+            version = int(msg.get('version', 0))
+        except (TypeError, ValueError):
+            return {'type': 'prefix-delta-result', 'uri': uri, 'resync': True,
+                    'reason': f"invalid version {msg.get('version')!r}"}
+        if 'text' in msg:
+            result = prefix_documents.open(instance_id, uri, msg['text'], language, version)
+        else:
+            result = prefix_documents.apply(instance_id, uri, msg.get('edits', []), version)
+        return {'type': 'prefix-delta-result', 'uri': uri, **result}
+
+    elif msg_type == 'watch-subscribe':
+        # Subscribe to a watch by id, or start/join the watch on 'directory'
+        watch_id = msg.get('watch_id')
+        if watch_id:
+            snapshot = watch_manager.snapshot(watch_id) or {'error': f'Unknown watch: {watch_id}'}
+            if 'error' not in snapshot and websocket is not None:
+                watch_manager.subscribe(watch_id, websocket)
+        else:
+            snapshot = await watch_manager.start(msg.get('directory', '.'), msg.get('interval'), owner='ws',
+                                                 subscriber=websocket)
+        return {'type': 'watch-snapshot', **snapshot}
+
+    elif msg_type == 'watch-unsubscribe':
+        watch_manager.unsubscribe(msg.get('watch_id', ''), websocket)
+        return {'type': 'watch-unsubscribed', 'watch_id': msg.get('watch_id', '')}
+
     elif msg_type == 'ai':
         prompt = msg.get('prompt', '')
         model = msg.get('model')
-        result = await ai_layer.infer(prompt, model)
+        result = _columnar(await ai_layer.infer(prompt, model), msg)
         result['type'] = 'ai-result'
         return result
 
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+"""
+Cross-engine classifier benchmark suite.
+
+Generates deterministic synthetic corpora per language and measures every
+Python line classifier in the tree:
+
+  bridge-regex     QuantumPrefixEngine, compiled alternation (memo off)
+  bridge-dispatch  QuantumPrefixEngine, first-character dispatch (memo off)
+  cli-scan         uvspeed_cli.classify_line, keyword scan
+  cli-dispatch     uvspeed_cli.classify_line, first-character dispatch
+  cli-buffer       uvspeed_cli.classify_buffer (cdylib when built, else Python port)
+  mcp              mcp_server._classify_line
+  tinygrad         AIInferenceLayer._infer_tinygrad (numpy fallback)
+
+For each (language, size, engine) it reports lines/sec, p99 per-call
+latency and peak traced memory, and writes JSON whose entries follow
+criterion's benchmark.json + estimates.json (group_id, function_id,
+throughput, mean/median/std_dev estimates in ns per iteration).
+
+    python src/03-tools/bench_classifiers.py                       # 1k + 100k lines
+    python src/03-tools/bench_classifiers.py --sizes 1m --languages python,rust
+    python src/03-tools/bench_classifiers.py -o new.json --baseline old.json --max-regression 10
+
+With --baseline, exits 1 when any benchmark's lines/sec dropped by more
+than --max-regression percent. Peak memory is what tracemalloc sees, so
+allocations inside the cdylib are not counted.
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+import uvspeed_cli as cli
+from uvspeed_cli import _load_module
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+LATENCY_SAMPLE = 20_000   # per-call timings taken for p99
+BATCH_CALL_LINES = 1_000  # lines per call when timing buffer engines
+SEED = 20240611
+
+# ── Synthetic corpora ──────────────────────────────────────────────────────
+# (weight, template) per language; {a}/{b} are identifiers, {C} a type name,
+# {n} a number. Weights roughly follow real code: mostly assignments/calls.
+TEMPLATES = {
+    'python': [
+        (2, 'import {a}'), (2, 'from {a} import {C}'), (2, 'class {C}({C}):'), (5, 'def {a}(self, {b}):'),
+        (3, '@{a}'), (3, '# {a} {b} {n}'), (6, 'if {a} > {n}:'), (2, 'elif {a}:'), (2, 'else:'),
+        (4, 'for {a} in {b}:'), (1, 'while {a}:'), (4, 'return {a}'), (2, 'try:'), (2, 'except {C}:'),
+        (3, 'print({a})'), (18, '{a} = {b}({n})'), (10, 'self.{a}.{b}({a}, {n})'), (8, ''),
+    ],
+    'javascript': [
+        (3, "import {{ {C} }} from '{a}';"), (1, "const {a} = require('{a}');"), (2, 'class {C} {{'),
+        (4, 'function {a}({b}) {{'), (3, 'const {a} = async ({b}) => {{'), (4, '// {a} {b}'),
+        (6, 'if ({a} > {n}) {{'), (2, '}} else {{'), (4, 'for (const {a} of {b}) {{'), (4, 'return {a};'),
+        (2, 'try {{'), (2, '}} catch ({a}) {{'), (3, 'console.log({a});'), (16, 'let {a} = {b}.{a}({n});'),
+        (10, '{a}.{b}({n});'), (8, '}}'), (8, ''),
+    ],
+    'rust': [
+        (3, 'use std::{a}::{C};'), (1, 'mod {a};'), (3, 'pub struct {C} {{'), (2, 'impl {C} {{'),
+        (5, 'pub fn {a}(&self, {b}: u32) -> u32 {{'), (2, '#[derive(Debug, Clone)]'), (4, '// {a} {b}'),
+        (5, 'if {a} > {n} {{'), (2, 'match {a} {{'), (3, 'for {a} in {b}.iter() {{'), (3, 'return {a};'),
+        (2, 'println!("{{}}", {a});'), (16, 'let {a} = {b}.{a}({n});'), (10, '{a}.{b}({n})?;'),
+        (8, '}}'), (8, ''),
+    ],
+    'go': [
+        (2, 'package {a}'), (2, 'import "{a}"'), (2, 'type {C} struct {{'), (5, 'func {a}({b} int) int {{'),
+        (4, '// {a} {b}'), (4, 'if err != nil {{'), (4, 'if {a} > {n} {{'), (3, 'for {a} := range {b} {{'),
+        (4, 'return {a}'), (3, 'fmt.Println({a})'), (16, '{a} := {b}({n})'), (10, '{a}.{b}({n})'),
+        (8, '}}'), (8, ''),
+    ],
+    'c': [
+        (3, '#include <{a}.h>'), (1, '#define {C} {n}'), (2, 'struct {a} {{'), (5, 'static int {a}(int {b}) {{'),
+        (4, '/* {a} {b} */'), (5, 'if ({a} > {n}) {{'), (3, 'for (int i = 0; i < {n}; i++) {{'),
+        (4, 'return {a};'), (3, 'printf("%d\\n", {a});'), (16, 'int {a} = {b}({n});'), (10, '{a}({b}, {n});'),
+        (8, '}}'), (8, ''),
+    ],
+    'shell': [
+        (2, '#!/bin/bash'), (2, 'source {a}.sh'), (3, '{a}() {{'), (5, '# {a} {b}'), (5, 'if [ -f {a} ]; then'),
+        (3, 'fi'), (3, 'for {a} in {b}; do'), (3, 'done'), (6, 'echo "{a} {n}"'), (1, 'set -e'),
+        (16, '{a}="{b}"'), (10, '{a} --{b} {n}'), (8, ''),
+    ],
+}
+WORDS = ['data', 'item', 'value', 'result', 'config', 'path', 'user', 'cache', 'node', 'index', 'buffer', 'state']
+
+
+def generate_corpus(language: str, lines: int, seed: int = SEED) -> list:
+    """Deterministic synthetic source: same language, size and seed -> same lines."""
+    rng = random.Random(f'{seed}:{language}:{lines}')
+    weights, templates = zip(*TEMPLATES[language])
+    picks = rng.choices(templates, weights=weights, k=lines)
+    out = []
+    for template in picks:
+        a, b = rng.choice(WORDS), rng.choice(WORDS)
+        line = template.format(a=a, b=b, C=a.capitalize() + b.capitalize(), n=rng.randrange(1000))
+        out.append(' ' * (4 * rng.randrange(4)) + line if line else line)
+    return out
+
+
+# ── Engines ────────────────────────────────────────────────────────────────
+
+def build_engines(selected=None) -> dict:
+    """name -> (kind, fn). 'line' fns take (line, language); 'batch' fns take (lines, language)."""
+
+    engines = {}
+    wanted = set(selected) if selected else None
+
+    def want(name):
+        return wanted is None or name in wanted
+
+    if want('bridge-regex') or want('bridge-dispatch') or want('tinygrad'):
+        bridge = _load_module('quantum_bridge_server', 'quantum_bridge_server.py')
+        for mode in ('regex', 'dispatch'):
+            if want(f'bridge-{mode}'):
+                engine = bridge.QuantumPrefixEngine(cache_size=0, engine=mode)
+                engines[f'bridge-{mode}'] = ('line', engine.classify_line)
+        if want('tinygrad') and (bridge.TINYGRAD_AVAILABLE or bridge.NUMPY_AVAILABLE):
+            layer = bridge.AIInferenceLayer()
+            engines['tinygrad'] = ('batch', lambda lines, lang: layer._infer_tinygrad('\n'.join(lines)))
+    for mode in ('scan', 'dispatch'):
+        if want(f'cli-{mode}'):
+            engines[f'cli-{mode}'] = ('line', lambda line, lang, mode=mode: cli.classify_line(line, engine=mode))
+    if want('cli-buffer'):
+        engines['cli-buffer'] = ('batch', lambda lines, lang: cli.classify_buffer('\n'.join(lines)))
+    if want('mcp'):
+        mcp = _load_module('mcp_server', 'mcp_server.py')
+        engines['mcp'] = ('line', lambda line, lang: mcp._classify_line(line))
+    return engines
+
+
+# ── Measurement ────────────────────────────────────────────────────────────
+
+def _run_once(kind, fn, lines, language):
+    if kind == 'line':
+        for line in lines:
+            fn(line, language)
+    else:
+        fn(lines, language)
+
+
+def _p99(values):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(0.99 * len(ordered)) - 1)]
+
+
+def measure(kind, fn, lines, language, samples: int) -> dict:
+    """Timing samples, p99 per-call latency and peak traced memory for one engine on one corpus."""
+    _run_once(kind, fn, lines[:100], language)  # warm caches and lazy tables
+    times = []
+    for _ in range(samples):
+        t0 = time.perf_counter_ns()
+        _run_once(kind, fn, lines, language)
+        times.append(time.perf_counter_ns() - t0)
+
+    clock = time.perf_counter_ns
+    calls = []
+    if kind == 'line':
+        for line in lines[:LATENCY_SAMPLE]:
+            t0 = clock()
+            fn(line, language)
+            calls.append(clock() - t0)
+    else:
+        for start in range(0, min(len(lines), LATENCY_SAMPLE), BATCH_CALL_LINES):
+            chunk = lines[start:start + BATCH_CALL_LINES]
+            t0 = clock()
+            fn(chunk, language)
+            calls.append(clock() - t0)
+
+    tracemalloc.start()
+    try:
+        _run_once(kind, fn, lines, language)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mean = statistics.fmean(times)
+    std_dev = statistics.stdev(times) if len(times) > 1 else 0.0
+    stderr = std_dev / math.sqrt(len(times))
+    median = statistics.median(times)
+    return {
+        'estimates': {
+            'mean': {
+                'point_estimate': mean,
+                'standard_error': stderr,
+                'confidence_interval': {
+                    'confidence_level': 0.95,
+                    'lower_bound': mean - 1.96 * stderr,
+                    'upper_bound': mean + 1.96 * stderr,
+                },
+            },
+            'median': {'point_estimate': median},
+            'std_dev': {'point_estimate': std_dev},
+        },
+        'lines_per_sec': len(lines) / (median / 1e9) if median else float('inf'),
+        'p99_call_ns': _p99(calls) if calls else None,
+        'call_lines': 1 if kind == 'line' else BATCH_CALL_LINES,
+        'peak_bytes': peak,
+    }
+
+
+def run_suite(languages, sizes, engines, samples: int, progress=None) -> dict:
+    benchmarks = []
+    for language in languages:
+        for size_name, size in sizes:
+            lines = generate_corpus(language, size)
+            group = f'classify/{language}/{size_name}'
+            for name, (kind, fn) in engines.items():
+                if progress:
+                    progress(f'{group}/{name}')
+                result = measure(kind, fn, lines, language, samples)
+                benchmarks.append({
+                    'group_id': group,
+                    'function_id': name,
+                    'value_str': None,
+                    'full_id': f'{group}/{name}',
+                    'directory_name': f'{group}/{name}'.replace('/', '_'),
+                    'throughput': {'Elements': size},
+                    **result,
+                })
+    return {
+        'tool': 'uvspeed-bench',
+        'format': 1,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'native_library': cli.native_engine_path(),
+        'samples': samples,
+        'seed': SEED,
+        'benchmarks': benchmarks,
+    }
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> list:
+    """Per-benchmark throughput change vs baseline; 'regressed' is set past max_regression percent."""
+    before = {b['full_id']: b['lines_per_sec'] for b in baseline.get('benchmarks', [])}
+    rows = []
+    for bench in current['benchmarks']:
+        old = before.get(bench['full_id'])
+        if not old:
+            continue
+        change = (bench['lines_per_sec'] - old) / old * 100
+        rows.append({
+            'full_id': bench['full_id'],
+            'baseline': old,
+            'current': bench['lines_per_sec'],
+            'change_pct': round(change, 2),
+            'regressed': change < -max_regression,
+        })
+    return rows
+
+
+def _parse_sizes(spec: str) -> list:
+    sizes = []
+    for part in spec.split(','):
+        part = part.strip().lower()
+        if part in SIZES:
+            sizes.append((part, SIZES[part]))
+        elif part:
+            sizes.append((part, int(part)))
+    return sizes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='uvspeed cross-engine classifier benchmarks')
+    parser.add_argument('--sizes', default='1k,100k', help='comma list of 1k, 100k, 1m or line counts')
+    parser.add_argument('--languages', default=','.join(TEMPLATES), help='comma list of corpus languages')
+    parser.add_argument('--engines', default='', help='comma list of engines (default: all available)')
+    parser.add_argument('--samples', type=int, default=5, help='timed runs per benchmark')
+    parser.add_argument('-o', '--output', help='write results JSON here')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--max-regression', type=float, default=10.0,
+                        help='fail when lines/sec drops more than this percent vs --baseline')
+    parser.add_argument('--json', action='store_true', help='print results JSON to stdout')
+    args = parser.parse_args(argv)
+
+    languages = [lang for lang in args.languages.split(',') if lang]
+    unknown = [lang for lang in languages if lang not in TEMPLATES]
+    if unknown:
+        parser.error(f"no corpus template for: {', '.join(unknown)}")
+    engines = build_engines([e for e in args.engines.split(',') if e] or None)
+    quiet = args.json
+    results = run_suite(languages, _parse_sizes(args.sizes), engines, max(args.samples, 1),
+                        progress=None if quiet else lambda name: print(f'  … {name}', file=sys.stderr))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"⚛ Classifier benchmarks — best-effort, {results['samples']} samples, "
+              f"native library: {results['native_library'] or 'not built'}")
+        print(f"  {'benchmark':<40} {'lines/s':>12} {'p99/call':>12} {'peak':>10}")
+        for b in results['benchmarks']:
+            p99 = f"{b['p99_call_ns'] / 1000:.1f}µs" if b['p99_call_ns'] is not None else '-'
+            print(f"  {b['full_id']:<40} {b['lines_per_sec']:>12,.0f} {p99:>12} {b['peak_bytes'] / 1024:>8.0f}KB")
+
+    if args.baseline:
+        rows = compare(results, json.loads(Path(args.baseline).read_text()), args.max_regression)
+        regressed = [r for r in rows if r['regressed']]
+        out = sys.stderr if quiet else sys.stdout
+        print(f"\n  vs baseline ({args.max_regression:g}% threshold):", file=out)
+        for r in rows:
+            flag = '  REGRESSED' if r['regressed'] else ''
+            print(f"  {r['full_id']:<40} {r['change_pct']:>+8.1f}%{flag}", file=out)
+        if regressed:
+            print(f"\n  {len(regressed)} benchmark(s) regressed past {args.max_regression:g}%", file=out)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+"""
+MCP stdio framing: legacy `buffer += chunk; split` loop vs LineFramer.
+
+Feeds one newline-terminated JSON-RPC message of each size to both readers
+in 64 KiB chunks (what stdio_loop reads per call) and keeps the best of N
+runs. The legacy loop re-copies and re-scans the whole buffer on every
+chunk, so its time grows with size squared; LineFramer only touches new
+bytes.
+
+    python src/03-tools/bench_mcp_framing.py
+    python src/03-tools/bench_mcp_framing.py --sizes 1,10,50 --repeat 3 --json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+from uvspeed_cli import _load_module
+
+
+def make_message(size_mb: float) -> bytes:
+    """A tools/call for uvspeed_prefix whose code argument makes the line ~size_mb MB."""
+    code_line = 'total = total + len(key)  # accumulate\\n'
+    code = code_line * max(1, int(size_mb * 1024 * 1024 / len(code_line)))
+    req = {'jsonrpc': '2.0', 'id': 1, 'method': 'tools/call',
+           'params': {'name': 'uvspeed_prefix', 'arguments': {'language': 'python', 'code': ''}}}
+    head, tail = json.dumps(req).encode().split(b'"code": ""')
+    return head + b'"code": "' + code.encode() + b'"' + tail + b'\n'
+
+
+def legacy_frames(chunks) -> list:
+    """The pre-LineFramer stdio_loop reader."""
+    out = []
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            out.append(line)
+    return out
+
+
+def framer_frames(chunks, mcp) -> list:
+    framer = mcp.LineFramer(max_size=1 << 30)
+    out = []
+    for chunk in chunks:
+        out.extend(framer.feed(chunk))
+    return out
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(max(repeat, 1)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='uvspeed MCP stdio framing benchmark')
+    parser.add_argument('--sizes', default='1,10,50', help='comma-separated message sizes in MB')
+    parser.add_argument('--chunk', type=int, default=65536, help='bytes per read')
+    parser.add_argument('--repeat', type=int, default=3, help='keep the best of N runs')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    mcp = _load_module('mcp_server', 'mcp_server.py')
+    results = []
+    for size_mb in (float(s) for s in args.sizes.split(',')):
+        message = make_message(size_mb)
+        chunks = [message[i:i + args.chunk] for i in range(0, len(message), args.chunk)]
+        assert legacy_frames(chunks) == framer_frames(chunks, mcp) == [message[:-1]]
+        legacy_s = best_of(lambda: legacy_frames(chunks), args.repeat)
+        framer_s = best_of(lambda: framer_frames(chunks, mcp), args.repeat)
+        results.append({
+            'size_mb': size_mb,
+            'bytes': len(message),
+            'chunks': len(chunks),
+            'legacy_seconds': round(legacy_s, 6),
+            'framer_seconds': round(framer_s, 6),
+            'framer_mb_per_sec': round(len(message) / framer_s / 1e6, 1),
+            'speedup': round(legacy_s / framer_s, 1),
+        })
+
+    if args.json:
+        print(json.dumps({'chunk': args.chunk, 'results': results}, indent=2))
+        return 0
+    print(f"⚛ MCP stdio framing — one message per size, {args.chunk:,}-byte reads")
+    print(f"  {'size':>7} {'legacy':>11} {'LineFramer':>11} {'MB/s':>8} {'speedup':>8}")
+    for r in results:
+        print(f"  {r['size_mb']:>5g}MB {r['legacy_seconds'] * 1000:>9.1f}ms {r['framer_seconds'] * 1000:>9.1f}ms "
+              f"{r['framer_mb_per_sec']:>8,.1f} {r['speedup']:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
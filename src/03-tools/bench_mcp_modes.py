@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+"""
+MCP tool latency: bridge mode vs in-process mode.
+
+Times mcp_server.handle_tool() for the stateless tools both ways:
+
+  bridge      MCP -> pooled HTTP -> route_request -> engine (two JSON encodes)
+  in-process  MCP -> engine, loaded into the MCP process
+
+Without --url a bridge HTTP server is started on an ephemeral port in a
+background thread of this process, so the numbers include a real socket
+hop but no network.
+
+    python src/03-tools/bench_mcp_modes.py
+    python src/03-tools/bench_mcp_modes.py --url http://localhost:8085 --calls 500 --json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+from uvspeed_cli import _load_module
+
+CODE = '\n'.join([
+    'import os',
+    'from pathlib import Path',
+    '',
+    'class Engine(Base):',
+    '    def run(self, item):',
+    '        # walk the queue',
+    '        if item is None:',
+    '            return self.value',
+    '        for key in item.keys():',
+    '            total = total + len(key)',
+    "        print(f'{total} keys')",
+    "        token = 'abc123'",
+    '        return eval(item)',
+])
+
+CALLS = {
+    'uvspeed_prefix': {'code': CODE, 'language': 'python'},
+    'uvspeed_diff': {'original': CODE, 'modified': CODE.replace('eval', 'int'), 'language': 'python'},
+    'uvspeed_security_scan': {'code': CODE, 'language': 'python'},
+    'uvspeed_languages': {},
+}
+
+
+def start_bridge() -> str:
+    """Serve the bridge's HTTP API on 127.0.0.1:<ephemeral> from a daemon thread."""
+    bridge = _load_module('quantum_bridge_server', 'quantum_bridge_server.py')
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    server = asyncio.run_coroutine_threadsafe(
+        asyncio.start_server(bridge.handle_http, '127.0.0.1', 0), loop).result(timeout=10)
+    return f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+async def time_tool(mcp, name: str, arguments: dict, in_process: bool, calls: int) -> dict:
+    await mcp.handle_tool(name, arguments, in_process=in_process)  # warm: engines, pool, caches
+    samples = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        await mcp.handle_tool(name, arguments, in_process=in_process)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    return {'p50_us': round(percentile(samples, 50), 1), 'p99_us': round(percentile(samples, 99), 1),
+            'mean_us': round(sum(samples) / len(samples), 1)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='uvspeed MCP bridge vs in-process latency')
+    parser.add_argument('--calls', type=int, default=300, help='timed calls per tool and mode')
+    parser.add_argument('--url', help='running bridge base URL (default: start one in-process)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    url = args.url or start_bridge()
+    mcp = _load_module('mcp_server', 'mcp_server.py')
+    mcp.bridge = mcp.BridgeClient(url)
+
+    async def run():
+        results = []
+        for name, arguments in CALLS.items():
+            bridge = await time_tool(mcp, name, arguments, False, args.calls)
+            local = await time_tool(mcp, name, arguments, True, args.calls)
+            results.append({'tool': name, 'bridge': bridge, 'in_process': local,
+                            'speedup_p50': round(bridge['p50_us'] / local['p50_us'], 1)})
+        await mcp.bridge.close()
+        return results
+
+    results = asyncio.run(run())
+    if mcp.engines.error:
+        print(f"In-process engines failed to load: {mcp.engines.error}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps({'url': url, 'calls': args.calls, 'results': results}, indent=2))
+        return 0
+    print(f"⚛ MCP tool latency — {args.calls} calls per tool, bridge at {url}")
+    print(f"  {'tool':<22} {'bridge p50':>11} {'p99':>9} {'in-proc p50':>12} {'p99':>9} {'speedup':>8}")
+    for r in results:
+        b, p = r['bridge'], r['in_process']
+        print(f"  {r['tool']:<22} {b['p50_us']:>9.0f}µs {b['p99_us']:>7.0f}µs {p['p50_us']:>10.0f}µs "
+              f"{p['p99_us']:>7.0f}µs {r['speedup_p50']:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
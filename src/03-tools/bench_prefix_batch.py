@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+"""
+/api/prefix/batch vs N single /api/prefix calls.
+
+Builds N small editor-sized snippets (mixed languages, from the synthetic
+corpora in bench_classifiers.py) and times both ways of prefixing them:
+
+  in-process (default)  route_request() with JSON encode/decode, no sockets —
+                        isolates handler dispatch + parse cost
+  --url URL             real HTTP against a running bridge, one new
+                        connection per single call, as editors do today
+
+    python src/03-tools/bench_prefix_batch.py --snippets 500
+    python src/03-tools/bench_prefix_batch.py --url http://localhost:8085 --snippets 200
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+from uvspeed_cli import _load_module
+
+
+def make_snippets(count: int, lines_per_snippet: int = 6) -> list:
+    bench = _load_module('bench_classifiers', 'bench_classifiers.py', TOOLS_DIR)
+    languages = list(bench.TEMPLATES)
+    corpora = {lang: bench.generate_corpus(lang, count * lines_per_snippet) for lang in languages}
+    items = []
+    for i in range(count):
+        lang = languages[i % len(languages)]
+        start = i * lines_per_snippet
+        items.append({'id': i, 'language': lang, 'code': '\n'.join(corpora[lang][start:start + lines_per_snippet])})
+    return items
+
+
+def run_in_process(items: list, repeat: int) -> tuple:
+    bridge = _load_module('quantum_bridge_server', 'quantum_bridge_server.py')
+
+    async def singles():
+        for item in items:
+            body = json.dumps({'code': item['code'], 'language': item['language']}).encode()
+            json.dumps(await bridge.route_request('POST', '/api/prefix', body, {}))
+
+    async def batch():
+        body = json.dumps({'items': items}).encode()
+        json.dumps(await bridge.route_request('POST', '/api/prefix/batch', body, {}))
+
+    return _best(lambda: asyncio.run(singles()), repeat), _best(lambda: asyncio.run(batch()), repeat)
+
+
+def run_http(items: list, url: str, repeat: int) -> tuple:
+    def post(path, payload):
+        req = urllib.request.Request(url.rstrip('/') + path, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return json.loads(resp.read())
+
+    def singles():
+        for item in items:
+            post('/api/prefix', {'code': item['code'], 'language': item['language']})
+
+    return _best(singles, repeat), _best(lambda: post('/api/prefix/batch', {'items': items}), repeat)
+
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(max(repeat, 1)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='uvspeed prefix batch vs single-call benchmark')
+    parser.add_argument('--snippets', type=int, default=500, help='number of snippets (max 2000 per batch)')
+    parser.add_argument('--lines', type=int, default=6, help='lines per snippet')
+    parser.add_argument('--repeat', type=int, default=3, help='keep the best of N runs')
+    parser.add_argument('--url', help='bridge base URL (default: in-process route_request)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    items = make_snippets(args.snippets, args.lines)
+    if args.url:
+        single_s, batch_s = run_http(items, args.url, args.repeat)
+    else:
+        single_s, batch_s = run_in_process(items, args.repeat)
+
+    result = {
+        'mode': 'http' if args.url else 'in-process',
+        'snippets': len(items),
+        'single_seconds': round(single_s, 6),
+        'batch_seconds': round(batch_s, 6),
+        'single_snippets_per_sec': round(len(items) / single_s),
+        'batch_snippets_per_sec': round(len(items) / batch_s),
+        'speedup': round(single_s / batch_s, 2),
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"⚛ Prefix batch — {result['snippets']} snippets, {result['mode']}")
+        print(f"  {'N single calls':<16} {result['single_seconds'] * 1000:>9.1f}ms "
+              f"{result['single_snippets_per_sec']:>10,} snippets/s")
+        print(f"  {'one batch':<16} {result['batch_seconds'] * 1000:>9.1f}ms "
+              f"{result['batch_snippets_per_sec']:>10,} snippets/s")
+        print(f"  speedup          {result['speedup']}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+# Shared pytest fixtures — load the core modules from src/01-core by path
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# uvspeed_cli lives at the repo root
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def result_cache_dir(tmp_path_factory):
+    """Keep the on-disk result cache out of the user's ~/.cache during test runs.
+
+    uvspeed_cli builds RESULT_CACHE at import (collection) time, and the
+    bridge shares that object, so it is re-rooted in place; the env var
+    covers subprocesses and spawned workers.
+    """
+    import uvspeed_cli
+
+    root = tmp_path_factory.mktemp("uvspeed-cache")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("UVSPEED_CACHE_DIR", str(root))
+        mp.setattr(uvspeed_cli.RESULT_CACHE, "root", os.path.join(str(root), f"v{uvspeed_cli.ResultCache.FORMAT}"))
+        mp.setattr(uvspeed_cli.RESULT_CACHE, "_index", None)
+        yield root
+
+
+@pytest.fixture(scope="session")
+def bridge():
+    from uvspeed_cli import _load_module
+
+    pytest.importorskip("websockets")
+    return _load_module("quantum_bridge_server", "quantum_bridge_server.py")
+
+
+@pytest.fixture(scope="session")
+def mcp():
+    from uvspeed_cli import _load_module
+
+    return _load_module("mcp_server", "mcp_server.py")
+
+
+@pytest.fixture
+def bridge_server(bridge):
+    """Bridge HTTP and WS servers on ephemeral ports, run on a background event loop.
+
+    Yields ``{"http": port, "ws": port}``.
+    """
+    import asyncio
+    import threading
+
+    import websockets
+
+    loop = asyncio.new_event_loop()
+
+    async def serve():
+        http_server = await asyncio.start_server(bridge.handle_http, "127.0.0.1", 0)
+        ws_server = await websockets.serve(bridge.ws_handler, "127.0.0.1", 0)
+        return http_server, ws_server
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    servers = asyncio.run_coroutine_threadsafe(serve(), loop).result(timeout=10)
+    try:
+        yield {"http": servers[0].sockets[0].getsockname()[1], "ws": next(iter(servers[1].sockets)).getsockname()[1]}
+    finally:
+
+        async def shutdown():
+            for server in servers:
+                server.close()
+            await servers[1].wait_closed()
+            # Keep-alive connections outlive the listening sockets; end their handlers too
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+@pytest.fixture(scope="session")
+def corpus_lines():
+    """Real-world lines from this repo across many languages, plus edge cases."""
+    sources = [
+        "src/01-core/quantum_bridge_server.py",
+        "src/01-core/mcp_server.py",
+        "uvspeed_cli.py",
+        "crates/prefix-engine/src/lib.rs",
+        "src/bridge/main.go",
+        "web/quantum-prefixes.js",
+        "web/wasm-loader.ts",
+        "web/quantum-theme.css",
+        "scripts/build-wasm.sh",
+        "scripts/build.nu",
+        "src/shaders/prefix-classify.wgsl",
+        ".github/workflows/ci.yml",
+        "pyproject.toml",
+    ]
+    lines = [
+        "",
+        "   ",
+        "\t",
+        "#!/usr/bin/env python3",
+        "#!/bin/bash",
+        "#!/usr/bin/env node",
+        "#include <stdio.h>",
+        "  # define MAX 3",
+        "SELECT * FROM users WHERE id = 1",
+        "CREATE TABLE t (id INT);",
+        "FROM python:3.12-slim",
+        "ENV PATH=/usr/bin",
+        "section .text",
+        "_start:",
+        "    mov eax, 1",
+        "    int 0x80",
+        "@import('std');",
+        "pub const Foo = struct {",
+        "    std.debug.print(\"hi\", .{});",
+        "let mut x = 5;",
+        "export def main [] {",
+        "    tryhard = 1",
+        "elsewhere()",
+        "ünïcode = 'ß'",
+        "\u3000return x",
+    ]
+    for rel in sources:
+        path = os.path.join(ROOT, rel)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8", errors="replace") as fh:
+                lines.extend(fh.read().split("\n"))
+    return lines
@@ -0,0 +1,55 @@
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+# src/03-tools/bench_classifiers.py — corpus determinism, result shape, regression gate
+import json
+from pathlib import Path
+
+import pytest
+
+TOOL = Path(__file__).resolve().parents[1] / "03-tools" / "bench_classifiers.py"
+
+
+@pytest.fixture(scope="module")
+def bench():
+    from uvspeed_cli import _load_module
+
+    return _load_module("bench_classifiers", TOOL.name, TOOL.parent)
+
+
+def test_corpus_is_deterministic(bench):
+    for language in bench.TEMPLATES:
+        first = bench.generate_corpus(language, 500)
+        assert first == bench.generate_corpus(language, 500)
+        assert len(first) == 500
+    assert bench.generate_corpus("python", 500) != bench.generate_corpus("rust", 500)
+
+
+def test_results_follow_criterion_shape(bench, tmp_path):
+    out = tmp_path / "bench.json"
+    assert bench.main(["--sizes", "50", "--languages", "python", "--engines", "cli-scan,cli-buffer",
+                       "--samples", "2", "-o", str(out), "--json"]) == 0
+    results = json.loads(out.read_text())
+    ids = {b["full_id"] for b in results["benchmarks"]}
+    assert ids == {"classify/python/50/cli-scan", "classify/python/50/cli-buffer"}
+    for b in results["benchmarks"]:
+        assert b["throughput"] == {"Elements": 50}
+        mean = b["estimates"]["mean"]
+        assert mean["confidence_interval"]["confidence_level"] == 0.95
+        assert mean["point_estimate"] > 0
+        assert b["lines_per_sec"] > 0
+        assert b["p99_call_ns"] is not None
+        assert b["peak_bytes"] >= 0
+
+
+def test_regression_gate(bench, tmp_path):
+    out = tmp_path / "bench.json"
+    bench.main(["--sizes", "50", "--languages", "go", "--engines", "cli-scan", "--samples", "1", "-o", str(out),
+                "--json"])
+    baseline = json.loads(out.read_text())
+    for b in baseline["benchmarks"]:
+        b["lines_per_sec"] *= 1000
+    slow = tmp_path / "baseline.json"
+    slow.write_text(json.dumps(baseline))
+    rows = bench.compare(json.loads(out.read_text()), baseline, 10)
+    assert rows and all(r["regressed"] for r in rows)
+    assert bench.main(["--sizes", "50", "--languages", "go", "--engines", "cli-scan", "--samples", "1",
+                       "--baseline", str(slow), "--json"]) == 1
@@ -0,0 +1,52 @@
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+# ClassificationResult — columnar storage with the legacy per-line dict view
+import json
+
+import pytest
+
+import uvspeed_cli as cli
+
+SOURCE = "import os\r\n\n# note\ndef main():\n    print('hi')\n    x = 1\n"
+
+
+def test_classify_source_keeps_legacy_dicts():
+    expected = [
+        {**cli.classify_line(line), "line": i + 1, "text": line} for i, line in enumerate(SOURCE.splitlines())
+    ]
+    result = cli.classify_source(SOURCE)
+    assert len(result) == len(expected)
+    assert result.to_dicts() == expected
+    assert result[-1] == expected[-1]
+    assert result[1:3] == expected[1:3]
+
+
+def test_line_offsets_slice_the_original_buffer():
+    for sep in (None, "\n"):
+        starts, ends = cli.line_offsets(SOURCE, sep)
+        lines = SOURCE.splitlines() if sep is None else SOURCE.split(sep)
+        assert [SOURCE[a:b] for a, b in zip(starts, ends)] == lines
+
+
+def test_columnar_json_and_counts():
+    result = cli.classify_source(SOURCE)
+    columns = result.to_json(columnar=True)
+    assert "text" not in json.dumps(columns)
+    assert [columns["categories"][i] for i in columns["category_ids"]] == [r["category"] for r in result]
+    assert cli.prefix_stats(SOURCE)["prefix_counts"] == result.counts()
+    with pytest.raises(ValueError):
+        cli.ClassificationResult.from_ids("a\nb", cli.SYMBOLS, cli.SYMBOLS, [0])
+
+
+def test_tinygrad_classifier_returns_columnar_result(bridge):
+    pytest.importorskip("numpy")
+    layer = bridge.AIInferenceLayer()
+    prompt = "import os\n\ndef f():\n    return 1"
+    out = layer._infer_tinygrad(prompt)
+    result = out["classifications"]
+    assert isinstance(result, cli.ClassificationResult)
+    rows = json.loads(json.dumps(out, default=bridge._json_default))["classifications"]
+    assert [r["code"] for r in rows] == prompt.split("\n")
+    assert list(rows[0]) == ["line", "prefix", "category", "confidence", "code"]
+    assert out["text"].splitlines()[0] == f"{rows[0]['prefix']:>4s}  1  import os"
+    columns = bridge._columnar(dict(out), {"format": "columnar"})["classifications"]
+    assert columns["category_ids"] == result.category_ids.tolist()
@@ -0,0 +1,262 @@
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+# uvspeed_cli — subcommands and the 9-symbol Python classifier
+import io
+
+import uvspeed_cli as cli
+
+
+def test_prefix_stream_flag_writes_each_line(tmp_path, capsys):
+    path = tmp_path / "a.py"
+    path.write_text("import os\nreturn x\n")
+    cli.cmd_prefix([str(path), "--stream"])
+    assert capsys.readouterr().out == "  n import os\n +n return x\n"
+
+
+def test_dispatch_classifier_matches_scan(corpus_lines):
+    for line in corpus_lines + ["#include <x>", "elsewhere()", "tryhard = 1", "  \t"]:
+        assert cli.classify_line(line, engine="dispatch") == cli.classify_line(line, engine="scan"), line
+
+
+def _make_tree(root):
+    (root / "pkg").mkdir()
+    (root / "node_modules" / "dep").mkdir(parents=True)
+    (root / ".hidden").mkdir()
+    (root / "main.py").write_text("import os\n\ndef main():\n    print('hi')\n")
+    (root / "pkg" / "lib.rs").write_text("use std::io;\npub fn f() {\n    let x = 1;\n}\n")
+    (root / "pkg" / "notes.bin").write_bytes(b"\x00\x01")
+    (root / "node_modules" / "dep" / "index.js").write_text("module.exports = 1;\n")
+    (root / ".hidden" / "x.py").write_text("x = 1\n")
+    return [root / "main.py", root / "pkg" / "lib.rs"]
+
+
+def test_stats_directory_jsonl_streams_records_and_summary(tmp_path, capsys):
+    import json
+
+    files = _make_tree(tmp_path)
+    cli.cmd_stats([str(tmp_path), "--jsonl", "--jobs", "2"])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r["path"] for r in records[:-1]] == [str(p) for p in files]
+    for record, path in zip(records, files):
+        expected = cli.prefix_stats(path.read_text())
+        assert record["prefix_counts"] == expected["prefix_counts"]
+        assert record["total_lines"] == expected["total_lines"]
+    summary = records[-1]
+    assert summary["type"] == "summary" and summary["files"] == 2
+    assert summary["total_lines"] == sum(r["total_lines"] for r in records[:-1])
+
+
+def test_directory_mode_is_the_same_serial_and_parallel(tmp_path):
+    _make_tree(tmp_path)
+    serial = list(cli.iter_tree_records(str(tmp_path), jobs=1, with_lines=True))
+    parallel = list(cli.iter_tree_records(str(tmp_path), jobs=2, with_lines=True))
+    assert serial == parallel
+    columns = serial[0]["classifications"]
+    assert columns["categories"][columns["category_ids"][0]] == "import"
+
+
+def test_line_batches_match_splitlines_at_any_chunk_size(corpus_lines):
+    source = "\n".join(corpus_lines[:60]) + "\r\nx = 'é'\r\rlast tail\r\n\n"
+    data = source.encode()
+    for chunk_size in (1, 2, 3, 7, 64, len(data) + 1):
+        batches = list(cli.iter_line_batches(io.BytesIO(data), chunk_size=chunk_size))
+        assert [line for batch in batches for line in batch] == source.splitlines(), chunk_size
+
+
+def test_line_batches_hold_a_long_line_without_rescanning():
+    import sys
+
+    source = "a" * 4_000_000 + "\u2028b\x85\rc\r"
+    data = source.encode()
+    reads = []
+    scanned = 0  # characters handed to str.splitlines by iter_line_batches
+
+    class Stream(io.BytesIO):
+        def read1(self, size=-1):
+            reads.append(size)
+            return super().read1(size)
+
+    def profile(frame, event, arg):
+        nonlocal scanned
+        if event == "c_call" and frame.f_code is cli.iter_line_batches.__code__ and arg.__name__ == "splitlines":
+            scanned += len(arg.__self__)
+
+    previous = sys.getprofile()
+    sys.setprofile(profile)
+    try:
+        batches = list(cli.iter_line_batches(Stream(data), chunk_size=1024))
+    finally:
+        sys.setprofile(previous)
+    assert [line for batch in batches for line in batch] == source.splitlines()
+    assert len(reads) > len(data) // 1024
+    # Re-splitting the held-back line on each of ~3,900 reads scanned ~15 billion characters
+    assert scanned < 4 * len(source), scanned
+
+
+def test_stream_stats_match_prefix_stats(tmp_path, capsys):
+    import json
+
+    source = "import os\n\ndef main():\n    print('hi')\n    x = 1\n    return x\n"
+    path = tmp_path / "a.py"
+    path.write_text(source)
+    cli.cmd_stats([str(path), "--stream", "--json"])
+    assert json.loads(capsys.readouterr().out) == cli.prefix_stats(source)
+
+
+def test_classify_stream_json_emits_one_record_per_line(tmp_path, capsys):
+    import json
+
+    path = tmp_path / "a.py"
+    path.write_text("import os\nx = 1\n")
+    cli.cmd_classify([str(path), "--stream", "--json"])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(r["line"], r["symbol"], r["text"]) for r in records] == [(1, "n", "import os"), (2, "+0", "x = 1")]
+
+
+def test_bench_reports_cold_and_warm_rates(tmp_path, capsys):
+    import json
+
+    path = tmp_path / "a.py"
+    path.write_text("import os\nx = 1\n" * 50)
+    cli.cmd_bench([str(path), "--repeat", "1", "--json"])
+    report = json.loads(capsys.readouterr().out)
+    assert report["files"] == 1 and report["lines"] == 101
+    engines = {r["engine"]: r for r in report["results"]}
+    assert {"cli-scan", "cli-dispatch"} <= set(engines)
+    assert engines["cli-scan"]["warm_lines_per_sec"] > 0
+    assert engines["cli-scan"]["cold_mb_per_sec"] > 0
+    assert len(cli.bench_corpus(1000)[0][1].splitlines()) == 1000
+
+
+def test_startup_profile_reports_bridge_imports():
+    import pytest
+
+    pytest.importorskip("websockets")
+    profile = cli.startup_profile()
+    assert profile["bridge_cumulative_ms"] > 0
+    assert profile["imports"] and all(e["cumulative_ms"] >= 0 for e in profile["imports"])
+    # Optional stacks are probed, not imported, while the bridge module loads
+    assert all(cap["state"] in ("available", "missing") for cap in profile["capabilities"].values())
+
+
+def test_tree_watcher_incremental_aggregates_match_a_fresh_scan(tmp_path):
+    import os
+
+    _make_tree(tmp_path)
+    watcher = cli.TreeWatcher(str(tmp_path))
+    first = watcher.poll()
+    assert {c["status"] for c in first["changed"]} == {"added"} and first["summary"]["files"] == 2
+    assert watcher.poll()["changed"] == []
+
+    (tmp_path / "pkg" / "lib.rs").write_text("// only a comment now\n")
+    os.utime(tmp_path / "pkg" / "lib.rs", ns=(1, 1))
+    (tmp_path / "pkg" / "deep").mkdir()
+    (tmp_path / "pkg" / "deep" / "new.go").write_text("package main\nfunc main() {}\n")
+    (tmp_path / "main.py").unlink()
+    delta = watcher.poll()
+    statuses = {os.path.relpath(c["path"], tmp_path): c["status"] for c in delta["changed"]}
+    assert statuses == {"main.py": "removed", "pkg/lib.rs": "modified", "pkg/deep/new.go": "added"}
+    assert str(tmp_path / "pkg") in delta["directories"]
+
+    fresh = cli.TreeWatcher(str(tmp_path))
+    fresh.poll()
+    assert watcher.snapshot()["directories"] == fresh.snapshot()["directories"]
+    assert watcher.summary() == fresh.summary()
+
+
+def test_scan_markers_reports_missing_labels(tmp_path):
+    page = tmp_path / "app.html"
+    page.write_text("<!doctype html>\n<script src='quantum-prefixes.js'></script>\n" + "<p>x</p>\n" * 1000)
+    assert cli.scan_markers(str(page)) == ["</html>", "sw.js"]
+    page.write_text("<!DOCTYPE html>\n<script src='quantum-prefixes.js'></script><script>sw.js</script>\n</html>\n")
+    assert cli.scan_markers(str(page)) == []
+
+
+def test_pre_checks_run_in_request_order_with_timings(tmp_path):
+    (tmp_path / "web").mkdir()
+    (tmp_path / "web" / "good.html").write_text("<!DOCTYPE html>\nquantum-prefixes.js sw.js\n</html>\n")
+    (tmp_path / "web" / "bad.html").write_text("<html></html>\n")
+    (tmp_path / "README.md").write_text("v4.0 Gold Standard\n")
+
+    results = cli.run_pre_checks(str(tmp_path), ["readme", "bogus", "inspect", "gold"])
+    assert [r["check"] for r in results] == ["readme", "inspect", "gold"]
+    assert all(r["ms"] >= 0 for r in results)
+    readme, inspect, gold = results
+    assert readme["errors"] == 1 and "  ✗ Architecture (crates)" in readme["lines"]
+    assert inspect["errors"] == 3 and inspect["lines"][-1] == "  · 2 apps checked"
+    assert gold["errors"] == len(cli.GOLD_FILES)
+
+    (narrowed,) = cli.run_pre_checks(str(tmp_path), ["inspect", "good"])
+    assert narrowed["errors"] == 0 and narrowed["lines"] == ["  ✓ good.html", "  · 1 apps checked"]
+
+
+def test_parse_mix_and_server_timing():
+    import pytest
+
+    assert cli.parse_mix("prefix=3, ws-ping") == {"prefix": 3.0, "ws-ping": 1.0}
+    with pytest.raises(ValueError):
+        cli.parse_mix("prefix,nope=2")
+    assert cli.parse_server_timing("route;dur=1.5, encode;desc=json;dur=0.25, cache") == {
+        "route": 1.5,
+        "encode": 0.25,
+    }
+
+
+def test_loadtest_against_a_live_bridge(bridge_server):
+    report = cli.run_loadtest(
+        f"http://127.0.0.1:{bridge_server['http']}",
+        f"ws://127.0.0.1:{bridge_server['ws']}",
+        cli.parse_mix("prefix=2,scan,ws-ping,ws-prefix"),
+        concurrency=2,
+        duration=0.5,
+    )
+
+    by_name = {s["scenario"]: s for s in report["scenarios"]}
+    assert report["errors"] == 0 and report["requests"] > 0
+    assert set(by_name) == {"prefix", "scan", "ws-ping", "ws-prefix"}
+    assert all(s["requests"] > 0 and s["latency_ms"]["p99"] >= s["latency_ms"]["p50"] for s in by_name.values())
+    assert set(by_name["prefix"]["server_ms"]) == {"route", "encode"}
+    assert set(by_name["ws-ping"]["server_ms"]) == {"handle"}
+
+
+def test_bench_engines_without_core_sources(tmp_path, monkeypatch):
+    import sys
+
+    monkeypatch.setattr(cli, "CORE_DIR", str(tmp_path))
+    monkeypatch.delitem(sys.modules, "quantum_bridge_server", raising=False)
+    engines = cli.bench_engines()
+    assert "cli-scan" in engines and not any(name.startswith("bridge-") for name in engines)
+
+
+def test_bench_bridge_engines_classify_without_the_memo(bridge, monkeypatch):
+    built = []
+    engine_class = bridge.QuantumPrefixEngine
+
+    def record(**options):
+        built.append(options)
+        return engine_class(**options)
+
+    monkeypatch.setattr(bridge, "QuantumPrefixEngine", record)
+    engines = cli.bench_engines()
+    for name in ("bridge-regex", "bridge-dispatch", "bridge-dispatch+memo"):
+        engines[name]()
+    assert built == [
+        {"engine": "regex", "cache_size": 0},
+        {"engine": "dispatch", "cache_size": 0},
+        {"engine": "dispatch"},
+    ]
+
+
+def test_malformed_numeric_options_are_usage_errors(tmp_path, capsys):
+    import pytest
+
+    calls = [
+        (cli.cmd_stats, [str(tmp_path), "--jobs", "four"], "--jobs expects an integer, got 'four'"),
+        (cli.cmd_bench, ["--lines", "1e3"], "--lines expects an integer"),
+        (cli.cmd_watch, [str(tmp_path), "--interval", "soon"], "--interval expects a number"),
+        (cli.cmd_loadtest, ["--max-error-rate", "5%"], "--max-error-rate expects a number"),
+    ]
+    for command, args, message in calls:
+        with pytest.raises(SystemExit) as exit_info:
+            command(args)
+        assert exit_info.value.code == 2
+        assert message in capsys.readouterr().err
@@ -0,0 +1,284 @@
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+# MCP server — pooled bridge client
+
+import pytest
+
+
+def test_bridge_client_reuses_one_keep_alive_connection(mcp, bridge_server):
+    import asyncio
+
+    client = mcp.BridgeClient(f"http://127.0.0.1:{bridge_server['http']}", use_aiohttp=False)
+
+    async def run():
+        results = [await client.call("POST", "/api/prefix", {"code": f"x = {i}"}) for i in range(20)]
+        results.append(await client.call("GET", "/api/languages"))
+        await client.close()
+        return results
+
+    results = asyncio.run(run())
+    assert all("error" not in r for r in results)
+    assert results[3]["prefixed"].endswith("x = 3")
+    assert client.requests == 21 and client.connections_opened == 1
+
+
+def test_aiohttp_client_reuses_its_session_and_closes_it_on_loop_change(mcp, bridge_server):
+    import asyncio
+
+    pytest.importorskip("aiohttp")
+    client = mcp.BridgeClient(f"http://127.0.0.1:{bridge_server['http']}", use_aiohttp=True)
+
+    async def run(calls):
+        return [await client.call("POST", "/api/prefix", {"code": f"x = {i}"}) for i in range(calls)]
+
+    results = asyncio.run(run(20))
+    first_session = client._session
+    assert all("prefixed" in r for r in results)
+    assert client.connections_opened == 1 and not first_session.closed
+
+    # A new event loop gets a new session; the old one is closed, not leaked
+    assert "prefixed" in asyncio.run(run(1))[0]
+    assert first_session.closed and client._session is not first_session
+    assert client.connections_opened == 2
+    asyncio.run(client.close())
+    assert client._session is None
+
+
+def test_bridge_client_caps_concurrent_connections(mcp, bridge_server):
+    import asyncio
+
+    client = mcp.BridgeClient(f"http://127.0.0.1:{bridge_server['http']}", pool_size=2, use_aiohttp=False)
+
+    async def run():
+        results = await asyncio.gather(*(client.call("POST", "/api/prefix", {"code": "y = 1"}) for _ in range(12)))
+        await client.close()
+        return results
+
+    assert all("prefixed" in r for r in asyncio.run(run()))
+    assert client.connections_opened <= 2
+
+
+def test_bridge_client_reports_connection_errors(mcp):
+    import asyncio
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    client = mcp.BridgeClient(f"http://127.0.0.1:{port}", use_aiohttp=False)
+    assert asyncio.run(client.call("GET", "/api/status"))["error"].startswith("Bridge connection failed")
+
+
+def test_dispatcher_answers_fast_calls_while_a_slow_call_runs(mcp, monkeypatch):
+    import asyncio
+    import json
+
+    release = asyncio.Event()
+
+    async def fake_tool(name, arguments):
+        if name == "slow":
+            await release.wait()
+        return name
+
+    monkeypatch.setattr(mcp, "handle_tool", fake_tool)
+    lines = []
+
+    async def run():
+        dispatcher = mcp.RequestDispatcher(lines.append, max_concurrency=4)
+        await dispatcher.dispatch({"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "slow"}})
+        await dispatcher.dispatch({"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": "fast"}})
+        await dispatcher.dispatch({"jsonrpc": "2.0", "id": 3, "method": "ping"})
+        for _ in range(5):
+            await asyncio.sleep(0)
+        done_before_release = [json.loads(line)["id"] for line in lines]
+        release.set()
+        await dispatcher.drain()
+        return done_before_release
+
+    assert asyncio.run(run()) == [3, 2]
+    assert [json.loads(line)["id"] for line in lines] == [3, 2, 1]
+    assert all(line.endswith("\n") and line.count("\n") == 1 for line in lines)
+
+
+def test_dispatcher_cancels_in_flight_calls_and_caps_concurrency(mcp, monkeypatch):
+    import asyncio
+    import json
+
+    running = []
+    peak = []
+
+    async def fake_tool(name, arguments):
+        running.append(name)
+        peak.append(len(running))
+        try:
+            await asyncio.sleep(0.05 if name != "hang" else 60)
+        finally:
+            running.remove(name)
+        return name
+
+    monkeypatch.setattr(mcp, "handle_tool", fake_tool)
+    lines = []
+
+    async def run():
+        dispatcher = mcp.RequestDispatcher(lines.append, max_concurrency=2)
+        await dispatcher.dispatch({"id": "h", "method": "tools/call", "params": {"name": "hang"}})
+        for i in range(4):
+            await dispatcher.dispatch({"id": i, "method": "tools/call", "params": {"name": f"t{i}"}})
+        await asyncio.sleep(0)
+        await dispatcher.dispatch({"method": "notifications/cancelled", "params": {"requestId": "h"}})
+        await dispatcher.drain()
+        return dispatcher.in_flight
+
+    assert asyncio.run(run()) == {}
+    assert sorted(json.loads(line)["id"] for line in lines) == [0, 1, 2, 3]
+    assert max(peak) <= 2
+
+
+def test_line_framer_matches_split_at_any_chunk_size(mcp):
+    stream = b'{"id": 1}\n\n{"id": 2, "x": "' + b"a" * 300 + b'"}\r\n{"id": 3}\n{"partial"'
+    expected = stream.split(b"\n")[:-1]
+    for size in (1, 2, 7, 64, len(stream)):
+        framer = mcp.LineFramer(max_size=1024)
+        out = []
+        for i in range(0, len(stream), size):
+            out.extend(framer.feed(stream[i : i + size]))
+        assert out == expected
+        assert framer.pending == len(b'{"partial"')
+
+
+def test_line_framer_drops_oversized_messages_without_buffering_them(mcp):
+    framer = mcp.LineFramer(max_size=100)
+    out = framer.feed(b'{"id": 1}\n' + b"x" * 90)
+    out += framer.feed(b"x" * 90)
+    assert framer.pending == 0
+    out += framer.feed(b"x" * 20 + b'\n{"id": 2}\n')
+    assert out[0] == b'{"id": 1}'
+    assert isinstance(out[1], mcp.OversizedMessage) and out[1].size == 200
+    assert out[2] == b'{"id": 2}'
+    (too_big,) = framer.feed(b"y" * 101 + b"\n")
+    assert too_big.size == 101
+
+
+def test_in_process_tools_match_the_bridge(mcp, bridge_server, monkeypatch):
+    import asyncio
+    import json
+
+    monkeypatch.setattr(mcp, "bridge", mcp.BridgeClient(f"http://127.0.0.1:{bridge_server['http']}", use_aiohttp=False))
+    code = "import os\npassword = 'hunter2'\n\ndef run(x):\n    return eval(x)\n"
+    calls = [
+        ("uvspeed_prefix", {"code": code, "language": "python"}),
+        ("uvspeed_diff", {"original": code, "modified": code.replace("eval", "int"), "language": "python"}),
+        ("uvspeed_security_scan", {"code": code, "language": "python"}),
+        ("uvspeed_security_scan", {"code": "", "language": "python"}),
+        ("uvspeed_languages", {}),
+    ]
+
+    async def run(in_process):
+        return [
+            json.loads(await mcp.handle_tool(name, {**args, "no_cache": True}, in_process=in_process))
+            for name, args in calls
+        ]
+
+    local, remote = asyncio.run(run(True)), asyncio.run(run(False))
+    assert mcp.engines.error is None
+    assert local == remote
+    assert local[3] == {"error": "Provide code, path, or directory to scan"}
+    # The diff arrives as original/modified; the bridge used to read only old/new and diff two empty strings
+    assert "return int(x)" in local[1]["diff"] and "return eval(x)" in local[1]["diff"]
+
+
+def test_stateful_tools_always_use_the_bridge(mcp, monkeypatch):
+    import asyncio
+    import json
+
+    seen = []
+
+    async def fake_bridge_call(method, path, data=None):
+        seen.append(path)
+        return {"ok": True}
+
+    monkeypatch.setattr(mcp, "bridge_call", fake_bridge_call)
+    result = asyncio.run(mcp.handle_tool("uvspeed_execute", {"code": "1 + 1"}, in_process=True))
+    assert json.loads(result) == {"ok": True} and seen == ["/api/execute"]
+
+
+def test_tool_cache_serves_pure_tools_by_content_and_honours_bypass(mcp, monkeypatch):
+    import asyncio
+    import json
+
+    calls = []
+
+    async def fake_bridge_tool(name, arguments):
+        calls.append((name, arguments))
+        if arguments.get("code") == "boom":
+            return {"error": "bridge down"}
+        return {"n": len(calls)}
+
+    monkeypatch.setattr(mcp, "bridge_tool", fake_bridge_tool)
+    monkeypatch.setattr(mcp, "tool_cache", mcp.ToolCache({"uvspeed_prefix": ("lru", 2)}))
+
+    def call(name, **arguments):
+        return json.loads(asyncio.run(mcp.handle_tool(name, arguments, in_process=False)))
+
+    assert call("uvspeed_prefix", code="a", language="python") == {"n": 1}
+    assert call("uvspeed_prefix", language="python", code="a") == {"n": 1}  # argument order does not matter
+    assert call("uvspeed_prefix", code="a", language="python", no_cache=True) == {"n": 2}
+    assert calls[-1] == ("uvspeed_prefix", {"code": "a", "language": "python"})  # no_cache is not forwarded
+    assert call("uvspeed_prefix", code="a", language="python") == {"n": 2}  # bypass refreshed the entry
+    call("uvspeed_prefix", code="b", language="python")
+    call("uvspeed_prefix", code="c", language="python")  # evicts "a"
+    assert call("uvspeed_prefix", code="a", language="python") == {"n": 5}
+    call("uvspeed_prefix", code="boom")
+    call("uvspeed_prefix", code="boom")  # errors are not cached
+    assert len(calls) == 7
+    assert call("uvspeed_execute", code="1") == {"n": 8} and call("uvspeed_execute", code="1") == {"n": 9}
+
+    stats = call("uvspeed_cache_stats", clear=True)
+    prefix = stats["tools"]["uvspeed_prefix"]
+    assert (prefix["hits"], prefix["bypassed"], prefix["evictions"]) == (2, 1, 2)
+    assert prefix["entries"] == 2 and stats["cleared"] is True
+    assert call("uvspeed_cache_stats")["tools"]["uvspeed_prefix"]["entries"] == 0
+
+
+def test_tool_cache_expires_ttl_entries(mcp, monkeypatch):
+    import itertools
+
+    clock = itertools.count(100.0, 5.0)
+    monkeypatch.setattr(mcp.time, "monotonic", lambda: next(clock))
+    cache = mcp.ToolCache({"uvspeed_status": ("ttl", 7.0)})
+    key = cache.key("uvspeed_status", {})
+    cache.put("uvspeed_status", key, "{}")  # t=100, expires at 107
+    assert cache.get("uvspeed_status", key) == "{}"  # t=105
+    assert cache.get("uvspeed_status", key) is None  # t=110
+    assert cache.stats()["tools"]["uvspeed_status"]["expired"] == 1
+    assert cache.key("uvspeed_sessions", {}) is None
+
+
+def test_slow_in_process_call_does_not_hold_up_ping(mcp, monkeypatch):
+    import asyncio
+    import json
+    import threading
+
+    release = threading.Event()
+
+    def slow_call(name, arguments):
+        release.wait(5)
+        return {"prefixed": "", "language": "python"}
+
+    monkeypatch.setattr(mcp.engines, "call", slow_call)
+    monkeypatch.setattr(mcp, "tool_cache", mcp.ToolCache({}))
+    lines = []
+
+    async def run():
+        dispatcher = mcp.RequestDispatcher(lines.append)
+        call = {"name": "uvspeed_prefix", "arguments": {"code": "x = 1"}}
+        monkeypatch.setattr(mcp, "MCP_IN_PROCESS", True)
+        await dispatcher.dispatch({"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": call})
+        await asyncio.sleep(0.05)  # the call is now blocked inside its worker thread
+        await dispatcher.dispatch({"jsonrpc": "2.0", "id": 2, "method": "ping"})
+        answered_first = [json.loads(line)["id"] for line in lines]
+        release.set()
+        await dispatcher.drain()
+        return answered_first
+
+    assert asyncio.run(run()) == [2]
+    assert [json.loads(line)["id"] for line in lines] == [2, 1]
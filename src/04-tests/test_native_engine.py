@@ -0,0 +1,82 @@
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+# prefix-engine cdylib (ctypes) and its pure-Python port — parity checks
+import pytest
+
+import uvspeed_cli as cli
+
+native = pytest.mark.skipif(
+    cli.load_native_engine() is None,
+    reason="prefix-engine cdylib not built (cargo build --release in crates/prefix-engine, or set UVSPEED_PREFIX_LIB)",
+)
+
+
+def test_python_port_follows_crate_unit_tests():
+    expected = {
+        "": 4,
+        "// hello": 5,
+        "-- sql comment": 5,
+        "#include <stdio.h>": 7,
+        "from pathlib import Path": 7,
+        "require('express')": 7,
+        "struct Point { x: f32, y: f32 }": 0,
+        "let x = 5;": 0,
+        "match result {": 1,
+        "} else {": 1,
+        "break": 6,
+        "fs.readFile('data.txt')": 2,
+        "name := 'test'": 3,
+        "a == b": 8,
+        "x =": 8,
+        "};": 4,
+        "\x1c": 8,
+    }
+    for line, code in expected.items():
+        assert cli.rust_classify_line(line) == code, line
+
+
+def test_rust_line_split():
+    source = "a\r\n\nb\rc\n"
+    starts, ends = cli.rust_line_offsets(source)
+    assert [source[a:b] for a, b in zip(starts, ends)] == ["a", "", "b\rc"]
+    assert cli.rust_line_offsets("") == (cli.array("Q"), cli.array("Q"))
+    source = "import os\n\ndef main():\n    print('hello')\n    x = 42\n    return x\n"
+    assert cli.classify_buffer(source, native=False) == bytes([7, 4, 0, 2, 3, 6])
+
+
+def test_native_classify_source_shape():
+    result = cli.classify_source("import os\r\nx = 1\n", engine="native")
+    assert result.to_dicts() == [
+        {"symbol": "n", "category": "import", "line": 1, "text": "import os"},
+        {"symbol": "+0", "category": "assignment", "line": 2, "text": "x = 1"},
+    ]
+    assert [cli.classify_line(r["text"], engine="native") for r in result] == [
+        {"symbol": r["symbol"], "category": r["category"]} for r in result
+    ]
+
+
+@native
+def test_native_and_python_backends_agree(corpus_lines):
+    extra = [" let x", "x　=　y", "café = 1", "\ud800 = 1", "a =="]
+    source = "\n".join(corpus_lines + extra)
+    assert cli.classify_buffer(source, native=True) == cli.classify_buffer(source, native=False)
+    for line in corpus_lines[:500] + extra:
+        assert cli.classify_buffer(line, native=True) == cli.classify_buffer(line, native=False), line
+    assert cli.classify_buffer(b"x = 1\n\xff\xfe\n", native=True) == bytes([3, 8])
+
+
+def test_native_required_but_missing(monkeypatch):
+    monkeypatch.setattr(cli, "_native_checked", True)
+    monkeypatch.setattr(cli, "_native_lib", None)
+    with pytest.raises(RuntimeError):
+        cli.classify_buffer("x", native=True)
+
+
+def test_bridge_packed_native_backend(bridge, tmp_path):
+    path = tmp_path / "m.rs"
+    path.write_bytes(b"use std::io;\r\n\nfn main() {\n")
+    packed = bridge.QuantumPrefixEngine().classify_file_packed(str(path), backend="native")
+    assert packed.backend == "native"
+    assert list(packed.codes()) == [7, 4, 0, 4]
+    assert list(packed.offsets) == [0, 14, 15, 27]
+    with pytest.raises(ValueError):
+        bridge.QuantumPrefixEngine().classify_file_packed(str(path), backend="gpu")
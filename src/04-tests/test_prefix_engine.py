@@ -0,0 +1,614 @@
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+# QuantumPrefixEngine — classifier behaviour and parity checks
+import os
+import re
+
+
+def _legacy_classify(engine, line, language):
+    """The original pattern-by-pattern classifier, kept as the parity reference."""
+    patterns = engine.PATTERNS.get(language, engine.PATTERNS["python"])
+    for category, pattern in patterns.items():
+        if re.match(pattern, line):
+            return engine.PREFIXES.get(category, engine.PREFIXES["default"])
+    return engine.PREFIXES["default"]
+
+
+def test_compiled_classifier_matches_legacy_for_every_language(bridge, corpus_lines):
+    engine = bridge.QuantumPrefixEngine()
+    for language in engine.supported_languages():
+        for line in corpus_lines:
+            assert engine.classify_line(line, language) == _legacy_classify(engine, line, language), (language, line)
+
+
+def test_dispatch_engine_matches_regex_engine(bridge, corpus_lines):
+    regex = bridge.QuantumPrefixEngine(cache_size=0)
+    dispatch = bridge.QuantumPrefixEngine(cache_size=0, engine="dispatch")
+    extra = ["\u00a0if x:", "  #!/usr/bin/env python", "pub async fn f()", "panic!x", "else_x", "for\tx", "if"]
+    for language in regex.supported_languages() + ["cobol"]:
+        for line in corpus_lines + extra:
+            assert dispatch.classify_line(line, language) == regex.classify_line(line, language), (language, line)
+
+
+def test_dispatch_engine_without_the_regex_parser(bridge, corpus_lines, monkeypatch):
+    regex = bridge.QuantumPrefixEngine(cache_size=0)
+    monkeypatch.setattr(bridge, "sre_parse", None)
+    dispatch = bridge.QuantumPrefixEngine(cache_size=0, engine="dispatch")
+    for language in ("python", "rust", "javascript"):
+        for line in corpus_lines:
+            assert dispatch.classify_line(line, language) == regex.classify_line(line, language), (language, line)
+
+
+def test_unknown_engine_is_rejected(bridge):
+    import pytest
+
+    with pytest.raises(ValueError):
+        bridge.QuantumPrefixEngine(engine="simd")
+
+
+def test_unknown_language_falls_back_to_python(bridge):
+    engine = bridge.QuantumPrefixEngine()
+    assert engine.classify_line("def f():", "cobol") == engine.PREFIXES["function"]
+    assert engine.classify_line("import os", "cobol") == engine.PREFIXES["import"]
+
+
+def test_prefix_code_output_is_unchanged(bridge, corpus_lines):
+    engine = bridge.QuantumPrefixEngine()
+    content = "\n".join(corpus_lines[:400])
+    expected = "\n".join(
+        f"{_legacy_classify(engine, line, 'python'):>4s}{i:>3d}  {line}"
+        for i, line in enumerate(content.split("\n"), 1)
+    )
+    assert engine.prefix_code(content, "python") == expected
+
+
+def test_line_cache_counts_hits_and_misses(bridge):
+    engine = bridge.QuantumPrefixEngine(cache_size=16)
+    engine.prefix_code("pass\npass\n\n\npass", "python")
+    stats = engine.cache_stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 3
+    assert stats["size"] == 2
+    assert stats["maxsize"] == 16
+
+
+def test_line_cache_is_bounded_and_can_be_disabled(bridge):
+    engine = bridge.QuantumPrefixEngine(cache_size=4)
+    for i in range(20):
+        engine.classify_line(f"x{i} = {i}", "python")
+    assert engine.cache_stats()["size"] == 4
+
+    off = bridge.QuantumPrefixEngine(cache_size=0)
+    assert off.classify_line("import os", "python") == off.PREFIXES["import"]
+    assert off.cache_stats()["size"] == 0
+
+
+def test_long_lines_bypass_the_cache(bridge):
+    engine = bridge.QuantumPrefixEngine()
+    line = "x = [" + "1, " * engine.CACHE_MAX_LINE + "]"
+    engine.classify_line(line, "python")
+    assert engine.cache_stats()["misses"] == 0
+
+
+def _legacy_prefix_file(engine, path):
+    lang = engine.detect_language(str(path))
+    content = path.read_text()
+    counts = {}
+    for line in content.split("\n"):
+        pfx = _legacy_classify(engine, line, lang)
+        counts[pfx] = counts.get(pfx, 0) + 1
+    line_count = content.count("\n") + 1
+    return {
+        "language": lang,
+        "lines": line_count,
+        "coverage": round((1 - counts.get("   ", 0) / max(line_count, 1)) * 100, 1),
+        "prefixed": "\n".join(
+            f"{_legacy_classify(engine, line, lang):>4s}{i:>3d}  {line}"
+            for i, line in enumerate(content.split("\n"), 1)
+        ),
+        "prefix_distribution": counts,
+    }
+
+
+def test_prefix_file_matches_two_pass_result(bridge, tmp_path):
+    engine = bridge.QuantumPrefixEngine()
+    path = tmp_path / "sample.rs"
+    path.write_text('use std::io;\n\nfn main() {\n    println!("hi");\n}\n')
+    assert engine.prefix_file(str(path)) == _legacy_prefix_file(engine, path)
+
+
+def test_prefix_file_reuses_result_until_file_changes(bridge, tmp_path):
+    engine = bridge.QuantumPrefixEngine()
+    path = tmp_path / "mod.py"
+    path.write_text("import os\n")
+    first = engine.prefix_file(str(path))
+    first["prefixed"] = "mutated by caller"
+    second = engine.prefix_file(str(path))
+    assert second["prefixed"].startswith(" -n:")
+    assert engine.cache_stats()["files"] == {"hits": 1, "misses": 1, "size": 1, "maxsize": engine.FILE_CACHE_ENTRIES}
+
+    path.write_text("import os\nimport sys\n")
+    third = engine.prefix_file(str(path))
+    assert third["lines"] == 3
+    assert engine.cache_stats()["files"]["misses"] == 2
+
+
+def test_iter_prefix_lines_matches_prefix_code(bridge, tmp_path):
+    import io
+
+    engine = bridge.QuantumPrefixEngine()
+    for content in ("", "\n", "import os", "import os\n", "def f():\n    return 1\n\n# done"):
+        streamed = list(engine.iter_prefix_lines(io.StringIO(content), "python"))
+        assert streamed == engine.prefix_code(content, "python").split("\n"), repr(content)
+
+    path = tmp_path / "crlf.py"
+    path.write_bytes(b"import os\r\nprint(1)\r\n")
+    with open(path, encoding="utf-8") as fh:
+        streamed = "\n".join(engine.iter_prefix_lines(fh, "python"))
+    assert streamed == engine.prefix_file(str(path))["prefixed"]
+
+
+def test_prefix_file_stream_mode_sends_chunked_body(bridge, tmp_path):
+    import asyncio
+    import json
+
+    path = tmp_path / "big.py"
+    path.write_text("x = 1\n" * 20000)
+
+    async def fetch():
+        server = await asyncio.start_server(bridge.handle_http, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps({"path": str(path), "stream": True}).encode()
+            writer.write(
+                b"POST /api/prefix/file HTTP/1.1\r\nHost: x\r\nConnection: close\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+            raw = await reader.read()
+            writer.close()
+            return raw
+
+    raw = asyncio.run(fetch())
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    assert b"Transfer-Encoding: chunked" in head
+    text, chunks = b"", 0
+    while True:
+        size_line, _, payload = payload.partition(b"\r\n")
+        size = int(size_line, 16)
+        if size == 0:
+            break
+        text += payload[:size]
+        payload = payload[size + 2 :]
+        chunks += 1
+    assert chunks > 1
+    assert text.decode() == bridge.prefix_engine.prefix_file(str(path))["prefixed"]
+
+
+def test_streaming_runs_off_the_loop_and_aborts_on_a_mid_stream_error(bridge, monkeypatch):
+    import asyncio
+    import threading
+
+    threads = []
+
+    def chunks():
+        threads.append(threading.get_ident())
+        yield b"first"
+        raise OSError("disk went away")
+
+    async def route(method, path, body, headers):
+        return bridge.StreamingResponse(chunks=chunks())
+
+    monkeypatch.setattr(bridge, "route_request", route)
+
+    async def fetch():
+        server = await asyncio.start_server(bridge.handle_http, "127.0.0.1", 0)
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+            writer.write(b"GET /stream HTTP/1.1\r\nHost: x\r\n\r\n")
+            await writer.drain()
+            raw = b""
+            try:
+                while chunk := await reader.read(65536):
+                    raw += chunk
+            except ConnectionResetError:
+                pass
+            writer.close()
+            return raw, threading.get_ident()
+
+    raw, loop_thread = asyncio.run(fetch())
+    assert raw.count(b"HTTP/1.1 ") == 1 and raw.startswith(b"HTTP/1.1 200 OK")
+    assert b"5\r\nfirst\r\n" in raw and not raw.endswith(b"0\r\n\r\n")
+    assert threads and threads[0] != loop_thread
+
+
+def test_oversized_request_line_gets_an_error_response(bridge_server):
+    import socket
+
+    with socket.create_connection(("127.0.0.1", bridge_server["http"]), timeout=5) as sock:
+        sock.sendall(b"GET /" + b"a" * 100_000 + b" HTTP/1.1\r\n\r\n")
+        raw = b""
+        while chunk := sock.recv(65536):
+            raw += chunk
+    assert raw.startswith(b"HTTP/1.1 414 ") and b"Request line too long" in raw
+
+
+def _expected_code(engine, line, language):
+    m = engine._compiled[language].match(line)
+    if m is None:
+        return 4 if not line.strip() else 8
+    return engine.SYMBOL_BITS[m.lastgroup]
+
+
+def test_packed_classification_matches_str_classifier(bridge, corpus_lines, tmp_path):
+    engine = bridge.QuantumPrefixEngine()
+    lines = [line for line in corpus_lines if line.isascii()]
+    path = tmp_path / "corpus.txt"
+    path.write_bytes("\n".join(lines).encode())
+    for language in ("python", "rust", "javascript", "go", "shell"):
+        packed = engine.classify_file_packed(str(path), language)
+        assert packed.line_count == len(lines)
+        assert list(packed.codes()) == [_expected_code(engine, line, language) for line in lines], language
+
+
+def test_packed_layout_offsets_and_crlf(bridge, tmp_path):
+    engine = bridge.QuantumPrefixEngine()
+    path = tmp_path / "mod.py"
+    path.write_bytes(b"import os\r\n\r\ndef f():\r\n    return 1")
+    packed = engine.classify_file_packed(str(path))
+    assert packed.language == "python"
+    assert list(packed.codes()) == [7, 4, 0, 6]
+    assert packed.packed == bytes([0x74, 0x06])
+    assert list(packed.offsets) == [0, 11, 13, 23]
+    assert packed.code(2) == 0
+    assert packed.histogram() == {"+1": 1, "0": 1, "+n": 1, "n": 1}
+
+
+def test_packed_empty_file(bridge, tmp_path):
+    path = tmp_path / "empty.py"
+    path.write_bytes(b"")
+    packed = bridge.QuantumPrefixEngine().classify_file_packed(str(path))
+    assert packed.line_count == 1 and list(packed.codes()) == [4]
+
+
+def _tree(tmp_path):
+    tmp_path = tmp_path / "repo"
+    (tmp_path / "pkg").mkdir(parents=True)
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.js").write_text("eval(x)\n")
+    (tmp_path / "pkg" / "a.py").write_text("import os\nos.system('ls')\n" * 50)
+    (tmp_path / "pkg" / "b.py").write_text("password = 'hunter2'\n")
+    (tmp_path / "c.js").write_text("el.innerHTML = x;\n// TODO\n")
+    (tmp_path / "notes.txt").write_text("eval(x)\n")
+    return tmp_path
+
+
+def test_parallel_file_engine_matches_serial(bridge, tmp_path):
+    repo = _tree(tmp_path)
+    root = str(repo)
+    engine = bridge.QuantumPrefixEngine()
+    serial = bridge.ParallelFileEngine(engine, workers=1)
+    pooled = bridge.ParallelFileEngine(engine, workers=2)
+    pooled.SERIAL_MAX_BYTES = 0
+    pooled.BATCH_MAX_FILES = 1
+    try:
+        for files in (serial, pooled):
+            assert [os.path.relpath(p, root) for p, _, _ in files.list_files(root, {"node_modules"})] == [
+                "c.js",
+                os.path.join("pkg", "a.py"),
+                os.path.join("pkg", "b.py"),
+            ]
+        plans = [bridge.ConversionRoadmap(engine, f).scan_directory(root) for f in (serial, pooled)]
+        assert plans[0] == plans[1] and plans[0]["total_lines"] == 103
+        scans = [bridge.SecurityScanner(engine, f).scan_directory(root) for f in (serial, pooled)]
+        assert scans[0] == scans[1] and scans[0]["files_scanned"] == 3
+        out = [
+            bridge.ConversionRoadmap(engine, f).convert_directory(root, str(tmp_path / d))
+            for f, d in ((serial, "q1"), (pooled, "q2"))
+        ]
+        assert out[0]["files"] == out[1]["files"] and out[0]["converted"] == 3
+        assert (tmp_path / "q2" / "pkg" / "b.py").read_text() == engine.prefix_file(str(repo / "pkg" / "b.py"))[
+            "prefixed"
+        ]
+    finally:
+        pooled.shutdown()
+
+
+def _splice(gutter, result):
+    for change in result["changes"]:
+        gutter[change["start"] : change["start"] + change["deleted"]] = change["prefixes"]
+    return gutter
+
+
+def test_prefix_delta_edits_match_full_reclassification(bridge, corpus_lines):
+    import random
+
+    rng = random.Random(7)
+    engine = bridge.QuantumPrefixEngine()
+    store = bridge.PrefixDocumentStore(engine)
+    text = "\n".join(corpus_lines[:60])
+    gutter = _splice([], store.open("tab-1", "a.py", text, "python", 1))
+    snippets = ["", "x", "import sys", "\n", "def g():\n    return 2\n", "# note\n\n", "print(1)"]
+    for version in range(2, 300):
+        lines = text.split("\n")
+        a = rng.randrange(len(lines))
+        b = rng.randrange(a, min(a + 3, len(lines)))
+        ca = rng.randrange(len(lines[a]) + 1)
+        cb = rng.randrange(len(lines[b]) + 1) if b > a else rng.randrange(ca, len(lines[a]) + 1)
+        new_text = rng.choice(snippets)
+        edit = {"range": {"start": {"line": a, "character": ca}, "end": {"line": b, "character": cb}}, "text": new_text}
+        offsets = [0]
+        for line in lines:
+            offsets.append(offsets[-1] + len(line) + 1)
+        text = text[: offsets[a] + ca] + new_text + text[offsets[b] + cb :]
+        result = store.apply("tab-1", "a.py", [edit], version)
+        gutter = _splice(gutter, result)
+        assert store.text("tab-1", "a.py") == text
+        assert gutter == [engine.classify_line(line, "python") for line in text.split("\n")]
+        assert result["line_count"] == len(gutter)
+
+
+def test_prefix_delta_ws_message_returns_only_changed_entries(bridge):
+    import asyncio
+
+    async def run():
+        opened = await bridge.handle_ws_message(
+            {"type": "prefix-delta", "instance_id": "i1", "uri": "m.py", "text": "x = 1\npass", "version": 1}
+        )
+        assert opened["full"] and opened["changes"][0]["prefixes"] == [
+            bridge.prefix_engine.classify_line(line, "python") for line in ("x = 1", "pass")
+        ]
+        edit = {
+            "range": {"start": {"line": 1, "character": 0}, "end": {"line": 1, "character": 4}},
+            "text": "import os",
+        }
+        delta = await bridge.handle_ws_message(
+            {"type": "prefix-delta", "instance_id": "i1", "uri": "m.py", "edits": [edit], "version": 2}
+        )
+        assert delta["changes"] == [{"start": 1, "deleted": 1, "prefixes": [bridge.prefix_engine.PREFIXES["import"]]}]
+        same = {"range": {"start": {"line": 0, "character": 4}, "end": {"line": 0, "character": 5}}, "text": "2"}
+        delta = await bridge.handle_ws_message(
+            {"type": "prefix-delta", "instance_id": "i1", "uri": "m.py", "edits": [same], "version": 3}
+        )
+        assert delta["changes"] == []
+        stale = await bridge.handle_ws_message(
+            {"type": "prefix-delta", "instance_id": "i1", "uri": "m.py", "edits": [same], "version": 3}
+        )
+        assert stale["resync"]
+        await bridge.route_request("DELETE", "/api/instances/i1", b"", {})
+        gone = await bridge.handle_ws_message(
+            {"type": "prefix-delta", "instance_id": "i1", "uri": "m.py", "edits": [same], "version": 4}
+        )
+        assert gone["resync"]
+
+    asyncio.run(run())
+
+
+def test_prefix_delta_clamps_offsets_and_rejects_malformed_edits(bridge):
+    import asyncio
+
+    engine = bridge.QuantumPrefixEngine()
+    store = bridge.PrefixDocumentStore(engine)
+    gutter = _splice([], store.open("i", "a.py", "abc\ndef", "python", 1))
+
+    def at(line, character):
+        return {"line": line, "character": character}
+
+    clamped = [
+        {"range": {"start": at(0, -2), "end": at(0, -1)}, "text": "X"},
+        {"range": {"start": at(1, 99), "end": at(1, 99)}, "text": "!"},
+        {"range": {"start": at(0, 3), "end": at(0, 1)}, "text": "Y"},
+    ]
+    store.apply("i", "a.py", clamped, 2)
+    assert store.text("i", "a.py") == "XabYc\ndef!"
+
+    for bad in ({"range": {"start": at(0, 0)}}, {"range": {"start": at(0, "1"), "end": at(0, 1)}}, "x", {"text": 5}):
+        result = store.apply("i", "a.py", [{"text": "lost"}, bad], 3)
+        assert result["resync"] and result["reason"].startswith("invalid edit 1")
+    assert store.text("i", "a.py") == "XabYc\ndef!"
+    assert store.apply("i", "a.py", [], "3")["resync"]
+
+    # A full-text edit no longer ends the batch
+    batch = [{"text": "x = 1\nimport os"}, {"range": {"start": at(0, 0), "end": at(0, 0)}, "text": "# "}]
+    gutter = _splice(gutter, store.apply("i", "a.py", batch, 3))
+    assert store.text("i", "a.py") == "# x = 1\nimport os"
+    assert gutter == [engine.classify_line(line, "python") for line in ("# x = 1", "import os")]
+
+    async def ws(**msg):
+        return await bridge.handle_ws_message({"type": "prefix-delta", "instance_id": "w", "uri": "b.py", **msg})
+
+    async def run():
+        await ws(text="pass", version=1)
+        return [
+            await ws(edits=[{"range": {"start": at(0, 0)}}], version=2),
+            await ws(edits=[], version="two"),
+            await ws(text=["pass"], version=3),
+        ]
+
+    missing_end, bad_version, bad_text = asyncio.run(run())
+    assert missing_end["resync"] and bad_version["resync"] and "error" in bad_text
+
+
+def test_prefix_document_store_is_bounded(bridge):
+    store = bridge.PrefixDocumentStore(bridge.QuantumPrefixEngine(), max_documents=2)
+    for uri in ("a", "b", "c"):
+        store.open("i", uri, "pass", "python")
+    assert store.text("i", "a") is None and store.text("i", "c") == "pass"
+
+
+def test_prefix_batch_matches_single_calls(bridge, corpus_lines):
+    import asyncio
+    import json
+
+    items = []
+    for i, language in enumerate(("python", "rust", "javascript", "python", "go", "nope")):
+        code = "\n".join(corpus_lines[i * 7 : i * 7 + 7])
+        items.append({"id": f"s{i}", "language": language, "code": code})
+
+    async def run():
+        batch = await bridge.route_request("POST", "/api/prefix/batch", json.dumps({"items": items}).encode(), {})
+        singles = [await bridge.route_request("POST", "/api/prefix", json.dumps(item).encode(), {}) for item in items]
+        ws = await bridge.handle_ws_message({"type": "prefix-batch", "items": items, "symbols": True})
+        return batch, singles, ws
+
+    batch, singles, ws = asyncio.run(run())
+    assert batch["count"] == len(items)
+    assert [r["id"] for r in batch["results"]] == [item["id"] for item in items]
+    assert [r["prefixed"] for r in batch["results"]] == [s["prefixed"] for s in singles]
+    assert ws["type"] == "prefix-batch-result"
+    for result, single in zip(ws["results"], singles):
+        assert [f"{s:>4s}" for s in result["symbols"]] == [line[:4] for line in single["prefixed"].split("\n")]
+
+
+def test_prefix_batch_rejects_bad_payloads(bridge):
+    assert "error" in bridge._prefix_batch({"items": "nope"})
+    assert "error" in bridge._prefix_batch({"items": [{"code": "x"}] * (bridge.prefix_engine.BATCH_MAX_ITEMS + 1)})
+
+    items = [
+        {"id": "a", "code": "import os"},
+        {"id": "b", "code": "x = 1", "language": ["python"]},
+        {"code": 42},
+        {"code": "return x", "language": "rust"},
+    ]
+    mixed = bridge._prefix_batch({"items": items})
+    assert [r.get("error") is None for r in mixed["results"]] == [True, False, False, True]
+    assert [r["id"] for r in mixed["results"]] == ["a", "b", 2, 3]
+    assert mixed["results"][0]["prefixed"] == bridge.prefix_engine.prefix_code("import os", "python")
+    assert mixed["results"][3]["language"] == "rust"
+
+
+def test_capabilities_import_on_first_use(bridge, tmp_path, monkeypatch):
+    import asyncio
+    import sys
+
+    (tmp_path / "uvspeed_broken_cap.py").write_text("raise RuntimeError('boom')\n")
+    (tmp_path / "uvspeed_lazy_cap.py").write_text("__version__ = '1.2'\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    lazy = bridge.Capability("uvspeed_lazy_cap", "uvspeed_lazy_cap")
+    assert lazy.state == "available" and "uvspeed_lazy_cap" not in sys.modules
+    assert lazy.load().__version__ == "1.2"
+    assert lazy.status()["state"] == "loaded" and lazy.status()["version"] == "1.2"
+
+    broken = bridge.Capability("uvspeed_broken_cap", "uvspeed_broken_cap")
+    assert broken.load() is None and broken.state == "failed" and "boom" in broken.error
+    missing = bridge.Capability("uvspeed_missing_cap", "uvspeed_missing_cap")
+    assert missing.load() is None and missing.status()["install"] == "pip install uvspeed_missing_cap"
+
+    status = asyncio.run(bridge.route_request("GET", "/api/math/status", b"", {}))
+    assert set(status["capabilities"]) == set(bridge.CAPABILITIES)
+    assert status["numpy"] == (status["capabilities"]["numpy"]["state"] != "missing")
+
+
+def test_watch_pushes_deltas_to_ws_subscribers(bridge, tmp_path):
+    import asyncio
+    import json
+
+    (tmp_path / "a.py").write_text("import os\n")
+
+    class FakeSocket:
+        def __init__(self):
+            self.sent = []
+
+        async def send(self, payload):
+            self.sent.append(json.loads(payload))
+
+    async def run():
+        client = FakeSocket()
+        msg = {"type": "watch-subscribe", "directory": str(tmp_path), "interval": 0.05}
+        snapshot = await bridge.handle_ws_message(msg, client)
+        assert snapshot["type"] == "watch-snapshot" and snapshot["summary"]["files"] == 1
+        (tmp_path / "b.py").write_text("x = 1\ny = 2\n")
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if client.sent:
+                break
+        listed = await bridge.route_request("GET", "/api/watch", b"", {})
+        bridge.watch_manager.drop_client(client)
+        return snapshot, client.sent, listed
+
+    snapshot, sent, listed = asyncio.run(run())
+    delta = sent[0]
+    assert delta["type"] == "watch-delta" and delta["watch_id"] == snapshot["watch_id"]
+    # bridge line counts include the empty line after a trailing newline
+    assert [(c["status"], c["total_lines"]) for c in delta["changed"]] == [("added", 3)]
+    assert delta["summary"]["files"] == 2 and delta["summary"]["total_lines"] == 5
+    assert [w["watch_id"] for w in listed["watches"]] == [snapshot["watch_id"]]
+    assert snapshot["watch_id"] not in bridge.watch_manager.watches
+
+
+def test_concurrent_watch_starts_share_one_poller(bridge, tmp_path, monkeypatch):
+    import asyncio
+
+    (tmp_path / "a.py").write_text("import os\n")
+    other = tmp_path / "other"
+    other.mkdir()
+    manager = bridge.watch_manager
+    monkeypatch.setattr(manager, "MAX_WATCHES", 1)
+
+    async def run():
+        results = await asyncio.gather(
+            manager.start(str(tmp_path), 0.05),
+            manager.start(str(tmp_path), 0.05),
+            manager.start(str(other), 0.05),
+        )
+        watches = dict(manager.watches)
+        for watch_id in watches:
+            manager.stop(watch_id)
+        return results, watches
+
+    (first, second, third), watches = asyncio.run(run())
+    assert first["watch_id"] == second["watch_id"] and list(watches) == [first["watch_id"]]
+    assert second["summary"]["files"] == 1
+    assert "Too many watches" in third["error"]
+
+
+def test_watch_stops_when_its_ws_client_goes_away(bridge, tmp_path, monkeypatch):
+    import asyncio
+    import time
+
+    (tmp_path / "a.py").write_text("import os\n")
+    manager = bridge.watch_manager
+    classify = manager._classify
+
+    def slow_classify(path):
+        time.sleep(0.2)
+        return classify(path)
+
+    class DeadSocket:
+        async def send(self, payload):
+            raise ConnectionError("gone")
+
+    async def disconnect_during_first_poll():
+        client = DeadSocket()
+        monkeypatch.setattr(manager, "_classify", slow_classify)
+        start = asyncio.create_task(manager.start(str(tmp_path), 0.05, owner="ws", subscriber=client))
+        await asyncio.sleep(0.05)
+        manager.drop_client(client)
+        result = await start
+        monkeypatch.setattr(manager, "_classify", classify)
+        return result
+
+    async def disconnect_before_a_delta():
+        snapshot = await manager.start(str(tmp_path), 0.05, owner="ws", subscriber=DeadSocket())
+        (tmp_path / "b.py").write_text("x = 1\n")
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if snapshot["watch_id"] not in manager.watches:
+                break
+        return snapshot
+
+    assert "stopped before its first scan" in asyncio.run(disconnect_during_first_poll())["error"]
+    assert not manager.watches
+    assert asyncio.run(disconnect_before_a_delta())["watch_id"] not in manager.watches
+
+
+def test_prefix_counts_match_prefix_file(bridge, tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_text("import os\n\n# note\ndef f():\n    return 1\n")
+    engine = bridge.QuantumPrefixEngine()
+    cold = engine.prefix_counts(str(path))
+    full = engine.prefix_file(str(path))
+    assert cold == {"lines": full["lines"], "prefix_distribution": full["prefix_distribution"]}
+    assert engine.prefix_counts(str(path)) == cold
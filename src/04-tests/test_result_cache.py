@@ -0,0 +1,173 @@
+# beyondBINARY quantum-prefixed | uvspeed | {+1, 1, -1, +0, 0, -0, +n, n, -n}
+# ResultCache — content-addressed on-disk results shared by the CLI and bridge
+import os
+import threading
+import time
+
+import uvspeed_cli as cli
+
+
+def test_round_trip_is_keyed_by_content_language_and_version(tmp_path):
+    cache = cli.ResultCache(str(tmp_path))
+    key = cache.key(b"x = 1\n", "python", "v1")
+    assert cache.get("stats", key) is None
+    assert cache.put("stats", key, {"lines": 1})
+    assert cache.get("stats", key) == {"lines": 1}
+    assert key != cache.key(b"x = 1\n", "python", "v2")
+    assert key != cache.key(b"x = 1\n", "rust", "v1")
+    assert (cache.hits, cache.misses, cache.writes) == (1, 1, 1)
+    assert not [n for _, n, _ in cache._entries() if n.startswith(".tmp-")]
+
+
+def test_disabled_cache_never_touches_disk(tmp_path):
+    cache = cli.ResultCache(str(tmp_path / "c"), enabled=False)
+    assert not cache.put("stats", "ab" * 32, {"x": 1})
+    assert cache.get("stats", "ab" * 32) is None
+    assert not (tmp_path / "c").exists()
+
+
+def test_prune_evicts_oldest_entries_first(tmp_path):
+    cache = cli.ResultCache(str(tmp_path), max_bytes=10**9)
+    keys = [cache.key(str(i).encode(), "python", "v") for i in range(10)]
+    now = time.time()
+    for age, key in enumerate(keys):
+        cache.put("stats", key, {"pad": "x" * 100})
+        stamp = now - 1000 + age
+        os.utime(cache._path("stats", key), (stamp, stamp))
+    entry_size = os.path.getsize(cache._path("stats", keys[0]))
+    result = cache.prune(max_bytes=entry_size * 5)
+    assert result["removed"] == 6 and result["bytes"] <= entry_size * 5 * 0.9
+    assert [cache.get("stats", k) is not None for k in keys] == [False] * 6 + [True] * 4
+
+
+def test_concurrent_writers_never_expose_partial_entries(tmp_path):
+    cache = cli.ResultCache(str(tmp_path))
+    key = cache.key(b"shared", "python", "v")
+    payloads = [{"writer": i, "pad": str(i) * 20_000} for i in range(6)]
+    seen = []
+
+    def work(payload):
+        for _ in range(20):
+            cache.put("stats", key, payload)
+            value = cache.get("stats", key)
+            if value is not None:
+                seen.append(value)
+
+    threads = [threading.Thread(target=work, args=(p,)) for p in payloads]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert seen and all(v in payloads for v in seen)
+
+
+def test_cli_directory_records_come_from_cache_on_second_run(tmp_path):
+    src = tmp_path / "a.py"
+    src.write_bytes(b"import os\r\n\r\ndef main():\r\n    return 1\r\n")
+    first = cli.classify_path(str(src), with_lines=True)
+    hits = cli.RESULT_CACHE.hits
+    second = cli.classify_path(str(src), with_lines=True)
+    assert cli.RESULT_CACHE.hits == hits + 1
+    assert first == second
+    src.write_text("x = 2\n")
+    assert cli.classify_path(str(src))["total_lines"] == 1
+
+
+def test_bridge_scan_and_prefix_results_survive_a_new_engine(bridge, tmp_path):
+    src = tmp_path / "app.py"
+    src.write_text("import os\npassword = 'hunter2'\nos.system(cmd)\n")
+
+    first_engine = bridge.QuantumPrefixEngine()
+    scanner = bridge.SecurityScanner(first_engine)
+    fresh_scan = scanner.scan_file(str(src))
+    fresh_prefix = first_engine.prefix_file(str(src))
+
+    hits = bridge.RESULT_CACHE.hits
+    second_engine = bridge.QuantumPrefixEngine()
+    assert bridge.SecurityScanner(second_engine).scan_file(str(src)) == fresh_scan
+    assert second_engine.prefix_file(str(src)) == fresh_prefix
+    assert bridge.RESULT_CACHE.hits == hits + 2
+
+
+def test_stat_index_skips_reading_unchanged_files(tmp_path):
+    src = tmp_path / "a.py"
+    src.write_text("x = 1\n")
+    os.utime(src, ns=(1_000_000_000, 1_000_000_000))
+    cache = cli.ResultCache(str(tmp_path / "cache"))
+    key, data = cache.file_key(str(src), "python", "v1")
+    assert data == b"x = 1\n" and key == cache.key(data, "python", "v1")
+    assert cache.file_key(str(src), "python", "v1") == (key, None)
+
+    # A new process reads the index back from disk
+    fresh = cli.ResultCache(str(tmp_path / "cache"))
+    assert fresh.file_key(str(src), "python", "v1") == (key, None) and fresh.index_hits == 1
+    assert fresh.file_key(str(src), "python", "v2")[1] is not None  # other version: read again
+
+    src.write_text("x = 22\n")
+    os.utime(src, ns=(2_000_000_000, 2_000_000_000))
+    new_key, data = fresh.file_key(str(src), "python", "v1")
+    assert data == b"x = 22\n" and new_key != key
+
+
+def test_recently_modified_files_are_not_indexed(tmp_path):
+    src = tmp_path / "a.py"
+    src.write_text("x = 1\n")
+    cache = cli.ResultCache(str(tmp_path / "cache"))
+    cache.file_key(str(src), "python", "v1")
+    assert cache.file_key(str(src), "python", "v1")[1] is not None
+
+
+def test_stat_index_log_is_compacted(tmp_path):
+    src = tmp_path / "a.py"
+    src.write_text("x = 1\n")
+    cache = cli.ResultCache(str(tmp_path / "cache"))
+    for i in range(1100):
+        os.utime(src, ns=(i * 10**9 + 1, i * 10**9 + 1))
+        cache.file_key(str(src), "python", "v1")
+    fresh = cli.ResultCache(str(tmp_path / "cache"))
+    assert fresh.file_key(str(src), "python", "v1")[1] is None
+    with open(fresh._index_file()) as f:
+        assert len(f.readlines()) == 1
+
+
+def test_prune_and_usage_leave_the_stat_index_to_its_own_cap(tmp_path):
+    files = []
+    for i in range(40):
+        src = tmp_path / f"f{i}.py"
+        src.write_text(f"x = {i}\n")
+        os.utime(src, ns=(10**9 * (i + 1), 10**9 * (i + 1)))
+        files.append(str(src))
+    cache = cli.ResultCache(str(tmp_path / "cache"), max_bytes=10**9)
+    keys = [cache.file_key(path, "python", "v1")[0] for path in files]
+    for key in keys[:10]:
+        cache.put("stats", key, {"pad": "x" * 20_000})
+    assert set(cache.usage()) == {"stats"} and cache.index_usage()["entries"] == 40
+
+    # Entry eviction never touches the index while it is under its share
+    limit = 160_000
+    assert cache.index_usage()["bytes"] < limit // cache.INDEX_SHARE
+    result = cache.prune(max_bytes=limit)
+    assert result["removed"] == 3 and result["index_removed"] == 0
+    assert cli.ResultCache(str(tmp_path / "cache")).file_key(files[0], "python", "v1") == (keys[0], None)
+
+    # Over its own cap the index keeps the newest mappings
+    line_bytes = cache.index_usage()["bytes"] // 40
+    result = cache.prune(max_bytes=line_bytes * 10 * cache.INDEX_SHARE)
+    assert 0 < result["index_removed"] < 40
+    fresh = cli.ResultCache(str(tmp_path / "cache"))
+    assert fresh.file_key(files[-1], "python", "v1") == (keys[-1], None)
+    assert fresh.file_key(files[0], "python", "v1")[1] is not None
+
+
+def test_rules_version_tracks_classifier_code_and_version():
+    def a(line):
+        return line.strip()
+
+    def b(line):
+        return line.lstrip()
+
+    assert cli.code_fingerprint(a) != cli.code_fingerprint(b)
+    assert cli.classifier_version("scan").endswith(cli.RULES_VERSION)
+    assert cli.RULES_VERSION != cli.rules_fingerprint(
+        cli.SYMBOLS, cli.PREFIX_RULES, cli.IO_PATTERNS, cli.ASSIGNMENT_OPS
+    )
@@ -7,15 +7,24 @@ Subcommands:
   serve     Start the quantum bridge server
   classify  Classify a file or stdin with quantum prefixes
   prefix    Add prefix gutter to source code
-  stats     Show prefix statistics for a file
+  stats     Show prefix statistics for a file or directory tree
+  bench     Time the available classifiers on a path or synthetic corpus
+  watch     Keep prefix stats for a directory tree up to date
   health    Check bridge server status
+  loadtest  Drive a mix of bridge endpoints and report throughput and latency
   version   Show version info
 """
 
+import codecs
+import contextlib
+import ctypes
+import hashlib
 import importlib.util
 import json
 import os
 import sys
+import time
+from array import array
 
 CORE_DIR = os.path.join(os.path.dirname(__file__), "src", "01-core")
 VERSION = "4.2.0"
@@ -37,87 +46,268 @@ SYMBOLS = {
 }
 
 
-def classify_line(line: str) -> dict:
+# Prefix checks in priority order; the first category whose keyword starts
+# the trimmed line wins. I/O and assignment are substring checks and run last.
+PREFIX_RULES = (
+    ("comment", ("#", "//", "/*", "--", '"""', "'''")),
+    ("import", ("import ", "from ", "use ", "require", "#include", "package ")),
+    (
+        "declaration",
+        (
+            "fn ",
+            "function ",
+            "def ",
+            "class ",
+            "struct ",
+            "enum ",
+            "const ",
+            "let ",
+            "var ",
+            "type ",
+            "interface ",
+            "trait ",
+            "pub fn ",
+            "async def ",
+            "export ",
+        ),
+    ),
+    (
+        "logic",
+        ("if ", "else", "elif ", "for ", "while ", "match ", "switch ", "case ", "try", "catch", "except", "finally"),
+    ),
+    ("modifier", ("return ", "yield ", "break", "continue", "raise ", "throw ")),
+)
+IO_PATTERNS = ("print", "console.", "log(", "write(", "read(", "fetch(", "println!", "fmt.", "echo ")
+ASSIGNMENT_OPS = (" = ", " := ", " += ", " -= ", " *= ", " /= ")
+
+# First-character table for the dispatch engine (same idea as first_byte_table
+# in crates/prefix-engine/src/simd.rs): each entry keeps only the categories
+# and keywords that can start with that character.
+FIRST_CHAR_RULES = {
+    ch: tuple(
+        (category, tuple(kw for kw in keywords if kw[0] == ch))
+        for category, keywords in PREFIX_RULES
+        if any(kw[0] == ch for kw in keywords)
+    )
+    for ch in {kw[0] for _, keywords in PREFIX_RULES for kw in keywords}
+}
+
+# "scan" walks PREFIX_RULES in order; "dispatch" jumps straight to the
+# candidates for the line's first character. Both give identical results.
+# "native" applies the prefix-engine crate's rules instead (classify_buffer).
+CLASSIFIER_ENGINE = os.environ.get("UVSPEED_CLASSIFIER", "scan")
+
+
+def classify_line(line: str, engine: str = None) -> dict:
     """Classify a single line of code into one of 9 quantum prefixes."""
+    engine = engine or CLASSIFIER_ENGINE
+    if engine == "native":
+        category = BIT_CATEGORIES[rust_classify_line(line)]
+        return {"symbol": SYMBOLS[category], "category": category}
+
     trimmed = line.strip()
 
     if not trimmed:
         return {"symbol": "0", "category": "neutral"}
 
-    # Comments
-    if trimmed.startswith(("#", "//", "/*", "--", '"""', "'''")):
-        return {"symbol": "-0", "category": "comment"}
-
-    # Imports
-    for kw in ("import ", "from ", "use ", "require", "#include", "package "):
-        if trimmed.startswith(kw):
-            return {"symbol": "n", "category": "import"}
-
-    # Declarations
-    for kw in (
-        "fn ",
-        "function ",
-        "def ",
-        "class ",
-        "struct ",
-        "enum ",
-        "const ",
-        "let ",
-        "var ",
-        "type ",
-        "interface ",
-        "trait ",
-        "pub fn ",
-        "async def ",
-        "export ",
-    ):
-        if trimmed.startswith(kw):
-            return {"symbol": "+1", "category": "declaration"}
-
-    # Logic/control flow
-    for kw in (
-        "if ",
-        "else",
-        "elif ",
-        "for ",
-        "while ",
-        "match ",
-        "switch ",
-        "case ",
-        "try",
-        "catch",
-        "except",
-        "finally",
-    ):
-        if trimmed.startswith(kw):
-            return {"symbol": "1", "category": "logic"}
-
-    # Modifiers
-    for kw in ("return ", "yield ", "break", "continue", "raise ", "throw "):
-        if trimmed.startswith(kw):
-            return {"symbol": "+n", "category": "modifier"}
+    if engine == "dispatch":
+        for category, keywords in FIRST_CHAR_RULES.get(trimmed[0], ()):
+            if trimmed.startswith(keywords):
+                return {"symbol": SYMBOLS[category], "category": category}
+    else:
+        for category, keywords in PREFIX_RULES:
+            if trimmed.startswith(keywords):
+                return {"symbol": SYMBOLS[category], "category": category}
 
     # I/O
-    io_patterns = ("print", "console.", "log(", "write(", "read(", "fetch(", "println!", "fmt.", "echo ")
-    for pat in io_patterns:
+    for pat in IO_PATTERNS:
         if pat in trimmed:
             return {"symbol": "-1", "category": "io"}
 
     # Assignment
-    for op in (" = ", " := ", " += ", " -= ", " *= ", " /= "):
+    for op in ASSIGNMENT_OPS:
         if op in trimmed:
             return {"symbol": "+0", "category": "assignment"}
 
     return {"symbol": "-n", "category": "unknown"}
 
 
-def classify_source(source: str) -> list:
-    """Classify all lines in source code."""
-    return [{**classify_line(line), "line": i + 1, "text": line} for i, line in enumerate(source.splitlines())]
+class ClassificationResult:
+    """Per-line classifications held as parallel arrays instead of one dict per line.
+
+    ``category_ids`` index into ``categories``; ``starts``/``ends`` are offsets of
+    each line in ``source``, so line text is only sliced out when a legacy dict is
+    requested. ``confidences`` is an ``array('f')`` or None when the engine has no
+    scores. Iterating, indexing and ``to_dicts()`` build the legacy dict shape
+    described by ``fields`` — (output key, column) pairs, where a column is one of
+    line, symbol, category, confidence or text.
+    """
+
+    __slots__ = ("source", "categories", "symbols", "fields", "category_ids", "starts", "ends", "confidences")
+
+    FIELDS = (("symbol", "symbol"), ("category", "category"), ("line", "line"), ("text", "text"))
+
+    def __init__(self, source: str, categories, symbols: dict, fields=FIELDS):
+        self.source = source
+        self.categories = tuple(categories)
+        self.symbols = symbols
+        self.fields = tuple(fields)
+        self.category_ids = array("B")
+        self.starts = array("Q")
+        self.ends = array("Q")
+        self.confidences = None
+
+    @classmethod
+    def from_ids(
+        cls, source: str, categories, symbols: dict, ids, confidences=None, sep=None, fields=FIELDS, offsets=None
+    ):
+        """Build a result from per-line category ids for ``source.split(sep)``.
+
+        ``sep=None`` follows ``str.splitlines()``; pass ``offsets`` as a
+        (starts, ends) pair to use some other line split. ``ids`` and
+        ``confidences`` may be any iterable of numbers, including numpy arrays.
+        """
+        result = cls(source, categories, symbols, fields)
+        result.category_ids = array("B", ids)
+        result.starts, result.ends = offsets if offsets is not None else line_offsets(source, sep)
+        if len(result.starts) != len(result.category_ids):
+            raise ValueError(f"{len(result.category_ids)} category ids for {len(result.starts)} lines")
+        if confidences is not None:
+            result.confidences = array("f", confidences)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.category_ids)
+
+    def __iter__(self):
+        for i in range(len(self.category_ids)):
+            yield self.row(i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self.row(index)
+
+    def category(self, index: int) -> str:
+        return self.categories[self.category_ids[index]]
+
+    def symbol(self, index: int) -> str:
+        return self.symbols[self.categories[self.category_ids[index]]]
+
+    def text(self, index: int) -> str:
+        return self.source[self.starts[index] : self.ends[index]]
+
+    def row(self, index: int) -> dict:
+        """Legacy dict for one line."""
+        values = {
+            "line": index + 1,
+            "symbol": self.symbol(index),
+            "category": self.category(index),
+            "confidence": round(self.confidences[index], 3) if self.confidences is not None else None,
+            "text": self.text(index),
+        }
+        return {key: values[column] for key, column in self.fields}
+
+    def to_dicts(self) -> list:
+        """Materialize the legacy list-of-dicts shape."""
+        return list(self)
+
+    def to_columns(self) -> dict:
+        """Compact JSON-friendly form: one list per column, no line text."""
+        return {
+            "categories": list(self.categories),
+            "symbols": [self.symbols[c] for c in self.categories],
+            "category_ids": self.category_ids.tolist(),
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "confidences": [round(c, 3) for c in self.confidences] if self.confidences is not None else None,
+        }
+
+    def to_json(self, columnar: bool = False):
+        """Value for json.dumps(default=...) — legacy dicts unless columnar is asked for."""
+        return self.to_columns() if columnar else self.to_dicts()
+
+    def counts(self) -> dict:
+        """Line count per category, in first-seen order."""
+        tally = [0] * len(self.categories)
+        seen = []
+        for cid in self.category_ids:
+            if not tally[cid]:
+                seen.append(cid)
+            tally[cid] += 1
+        return {self.categories[cid]: tally[cid] for cid in seen}
+
+
+def line_offsets(source: str, sep=None):
+    """Start/end offsets of each line of ``source.split(sep)`` (or splitlines() when sep is None)."""
+    starts = array("Q")
+    ends = array("Q")
+    pos = 0
+    if sep is None:
+        for raw in source.splitlines(keepends=True):
+            starts.append(pos)
+            ends.append(pos + len(raw.splitlines()[0]))
+            pos += len(raw)
+    else:
+        step = len(sep)
+        while True:
+            nxt = source.find(sep, pos)
+            starts.append(pos)
+            if nxt < 0:
+                ends.append(len(source))
+                break
+            ends.append(nxt)
+            pos = nxt + step
+    return starts, ends
+
+
+def rust_line_offsets(source: str):
+    """Start/end offsets of each line as split by Rust's ``str::lines()``.
+
+    Splits on LF, drops one CR before it, and yields no empty final line.
+    """
+    starts = array("Q")
+    ends = array("Q")
+    pos = 0
+    size = len(source)
+    while pos < size:
+        nxt = source.find("\n", pos)
+        if nxt < 0:
+            starts.append(pos)
+            ends.append(size)
+            break
+        starts.append(pos)
+        ends.append(nxt - 1 if nxt > pos and source[nxt - 1] == "\r" else nxt)
+        pos = nxt + 1
+    return starts, ends
+
+
+_CATEGORY_IDS = {cat: i for i, cat in enumerate(SYMBOLS)}
+
+
+def classify_source(source: str, engine: str = None) -> ClassificationResult:
+    """Classify all lines in source code.
+
+    Returns a ClassificationResult; iterate it (or call to_dicts()) for the
+    {symbol, category, line, text} dicts. ``engine="native"`` classifies the
+    whole buffer with the prefix-engine crate rules (see classify_buffer).
+    """
+    if (engine or CLASSIFIER_ENGINE) == "native":
+        # SYMBOLS is in PrefixSymbol::to_bits order, so codes double as category ids
+        return ClassificationResult.from_ids(
+            source, SYMBOLS, SYMBOLS, classify_buffer(source), offsets=rust_line_offsets(source)
+        )
+    ids = [_CATEGORY_IDS[classify_line(line, engine)["category"]] for line in source.splitlines()]
+    return ClassificationResult.from_ids(source, SYMBOLS, SYMBOLS, ids)
 
 
 def prefix_content(source: str) -> str:
     """Add prefix gutter to every line."""
+    if CLASSIFIER_ENGINE == "native":
+        results = classify_source(source)
+        return "\n".join(f"{results.symbol(i):>3} {results.text(i)}" for i in range(len(results)))
     lines = source.splitlines()
     result = []
     for line in lines:
@@ -130,10 +320,7 @@ def prefix_stats(source: str) -> dict:
     """Calculate prefix distribution statistics."""
     results = classify_source(source)
     total = len(results)
-    counts = {}
-    for r in results:
-        cat = r["category"]
-        counts[cat] = counts.get(cat, 0) + 1
+    counts = results.counts()
 
     classified = sum(v for k, v in counts.items() if k not in ("neutral", "unknown"))
     return {
@@ -144,36 +331,1468 @@ def prefix_stats(source: str) -> dict:
     }
 
 
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Streaming (constant memory, output as input arrives)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+STREAM_CHUNK = 64 * 1024
+
+
+def iter_line_batches(stream, chunk_size: int = STREAM_CHUNK):
+    """Yield lists of complete lines from a binary stream as data arrives.
+
+    Uses read1(), which returns whatever the pipe has instead of waiting for
+    a full chunk, so `tail -f | ...` sees each line promptly while big pipes
+    still move in 64 KB reads. A line split across reads (including a \\r\\n
+    pair) is held back as a list of pieces and joined once it is complete;
+    only newly decoded text is searched for line breaks, so one very long
+    line costs O(length), not O(length^2). Concatenated, the batches equal
+    source.splitlines(); invalid UTF-8 is replaced, not fatal.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    read = getattr(stream, "read1", stream.read)
+    pending = []  # pieces of the held-back line, none containing a line break
+    held_cr = False  # pending ends in a complete line's \r that a leading \n would extend to \r\n
+    while True:
+        chunk = read(chunk_size)
+        text = decoder.decode(chunk, final=not chunk)
+        lines = []
+        if held_cr:
+            lines.append("".join(pending)[:-1])
+            pending, held_cr = [], False
+            if text.startswith("\n"):
+                text = text[1:]
+        if not chunk:
+            pending.append(text)
+            lines.extend("".join(pending).splitlines())
+            if lines:
+                yield lines
+            return
+        pieces = text.splitlines(True)
+        tail = None
+        if pieces and (pieces[-1].endswith("\r") or pieces[-1] == pieces[-1].splitlines()[0]):
+            tail = pieces.pop()
+        if pieces:
+            pieces[0] = "".join(pending) + pieces[0]
+            pending = []
+            lines.extend("".join(pieces).splitlines())
+        if tail is not None:
+            pending.append(tail)
+            held_cr = tail.endswith("\r")
+        if lines:
+            yield lines
+
+
+class StreamStats:
+    """Running prefix_stats counters; memory stays O(categories) for any input size."""
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+
+    def add(self, category: str):
+        self.total += 1
+        self.counts[category] = self.counts.get(category, 0) + 1
+
+    def result(self) -> dict:
+        classified = sum(v for k, v in self.counts.items() if k not in ("neutral", "unknown"))
+        return {
+            "total_lines": self.total,
+            "classified_lines": classified,
+            "coverage": round(classified / self.total * 100, 1) if self.total > 0 else 0,
+            "prefix_counts": dict(self.counts),
+        }
+
+
+def _binary_input(args: list):
+    """Binary stream for the first positional argument, or stdin when it is '-' or missing.
+
+    Use as a context manager; stdin is left open on exit.
+    """
+    paths = [a for a in args if a == "-" or not a.startswith("-")]
+    if paths and paths[0] != "-":
+        return open(paths[0], "rb")
+    return contextlib.nullcontext(sys.stdin.buffer)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Persistent result cache (content-addressed, shared by CLI and bridge)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+CACHE_DIR_ENV = "UVSPEED_CACHE_DIR"
+CACHE_MAX_BYTES = int(os.environ.get("UVSPEED_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def default_cache_dir() -> str:
+    """$UVSPEED_CACHE_DIR, else $XDG_CACHE_HOME/uvspeed, else ~/.cache/uvspeed."""
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "uvspeed")
+
+
+def rules_fingerprint(*tables) -> str:
+    """Short stable hash of rule tables; goes into cache keys so rule edits invalidate old entries."""
+    return hashlib.sha1(json.dumps(tables, sort_keys=True, default=repr).encode()).hexdigest()[:12]
+
+
+class ResultCache:
+    """On-disk JSON results keyed by sha256(language, version, content).
+
+    Layout is <root>/v1/<kind>/<key[:2]>/<key[2:]>.json. Entries are written to
+    a temp file in the same directory and moved into place with os.replace,
+    so concurrent CLI runs, bridge workers and readers only ever see complete
+    files. Once max_bytes/16 has been written by this process the tree is
+    pruned, oldest mtime first, to 90% of max_bytes; hits older than a day
+    get their mtime refreshed so hot entries survive. UVSPEED_CACHE=0
+    disables reads and writes.
+    """
+
+    FORMAT = 1
+    TOUCH_AFTER = 24 * 3600
+    # Files modified this recently may change again within the same mtime tick, so they are not indexed
+    INDEX_RACY_NS = 2_000_000_000
+    # The stat index lives in <root>/index/, outside entry eviction, capped at this share of max_bytes
+    INDEX_DIR = "index"
+    INDEX_SHARE = 16
+
+    def __init__(self, root: str = None, max_bytes: int = CACHE_MAX_BYTES, enabled: bool = None):
+        self.root = os.path.join(root or default_cache_dir(), f"v{self.FORMAT}")
+        self.max_bytes = max_bytes
+        self.enabled = os.environ.get("UVSPEED_CACHE", "1") != "0" if enabled is None else enabled
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.index_hits = 0
+        self._written = 0
+        self._index = None  # (abspath, tag) -> (mtime_ns, size, key), loaded on first file_key()
+
+    @staticmethod
+    def key(content: bytes, language: str, version: str) -> str:
+        digest = hashlib.sha256(f"{language}\0{version}\0".encode())
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.root, kind, key[:2], key[2:] + ".json")
+
+    def file_key(self, path: str, language: str, version: str) -> tuple:
+        """(content key, bytes) for a file on disk.
+
+        A stat index maps (path, mtime_ns, size) to the content key computed
+        last time, so an unchanged file is neither read nor hashed and bytes
+        comes back as None. The index is an append-only log under the cache
+        root (one line per file, last line wins), so concurrent CLI workers
+        and the bridge can all add to it; it is compacted when it has grown
+        to twice its live size. Raises OSError if the file cannot be read.
+        """
+        path = os.path.abspath(path)
+        tag = f"{language}:{version}"
+        if self.enabled:
+            st = os.stat(path)
+            entry = self._load_index().get((path, tag))
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self.index_hits += 1
+                return entry[2], None
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+        key = self.key(data, language, version)
+        if self.enabled and time.time_ns() - st.st_mtime_ns > self.INDEX_RACY_NS and not {"\t", "\n"} & set(path + tag):
+            index = self._load_index()
+            index.pop((path, tag), None)
+            index[(path, tag)] = (st.st_mtime_ns, st.st_size, key)
+            self._append_index(f"{tag}\t{st.st_mtime_ns}\t{st.st_size}\t{key}\t{path}\n")
+        return key, data
+
+    def _index_file(self) -> str:
+        return os.path.join(self.root, self.INDEX_DIR, "files.log")
+
+    def _load_index(self) -> dict:
+        if self._index is None:
+            index, lines = {}, 0
+            try:
+                with open(self._index_file(), encoding="utf-8", errors="surrogateescape") as f:
+                    for line in f:
+                        lines += 1
+                        parts = line.rstrip("\n").split("\t", 4)
+                        if len(parts) == 5 and parts[1].isdigit() and parts[2].isdigit():
+                            tag, mtime_ns, size, key, path = parts
+                            index.pop((path, tag), None)  # keep dict order = most recent last
+                            index[(path, tag)] = (int(mtime_ns), int(size), key)
+            except OSError:
+                pass
+            if lines > 2 * len(index) + 1024:
+                self._write_index(index)
+            self._index = index
+        return self._index
+
+    def _append_index(self, line: str):
+        try:
+            os.makedirs(os.path.dirname(self._index_file()), exist_ok=True)
+            fd = os.open(self._index_file(), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8", "surrogateescape"))  # one O_APPEND write per line
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+    def _write_index(self, index: dict):
+        import tempfile
+
+        lines = "".join(f"{tag}\t{m}\t{n}\t{key}\t{path}\n" for (path, tag), (m, n, key) in index.items())
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self._index_file()), prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(lines.encode("utf-8", "surrogateescape"))
+            os.replace(tmp, self._index_file())
+        except OSError:
+            pass
+
+    def get(self, kind: str, key: str):
+        """Cached value, or None on a miss (or a damaged entry)."""
+        if not self.enabled:
+            return None
+        path = self._path(kind, key)
+        try:
+            with open(path, "rb") as f:
+                value = json.loads(f.read())
+                mtime = os.fstat(f.fileno()).st_mtime
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        now = time.time()
+        if now - mtime > self.TOUCH_AFTER:
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        return value
+
+    def put(self, kind: str, key: str, value) -> bool:
+        """Store value atomically; False when disabled or the write failed."""
+        if not self.enabled:
+            return False
+        import tempfile
+
+        path = self._path(kind, key)
+        data = json.dumps(value, separators=(",", ":")).encode()
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+            return False
+        self.writes += 1
+        self._written += len(data)
+        if self._written >= self.max_bytes // 16:
+            self._written = 0
+            self.prune()
+        return True
+
+    def _entries(self, include_index: bool = False):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            if dirpath == self.root and not include_index and self.INDEX_DIR in dirnames:
+                dirnames.remove(self.INDEX_DIR)  # pruned and reported separately
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, name, st
+
+    def prune(self, max_bytes: int = None) -> dict:
+        """Evict oldest entries until the cache fits in 90% of max_bytes; drop stale temp files.
+
+        The stat index is not an entry: it is trimmed on its own to
+        max_bytes/INDEX_SHARE, keeping the most recently added mappings.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        now = time.time()
+        entries = []
+        total = removed = 0
+        index_dir = os.path.dirname(self._index_file())
+        for path, name, st in self._entries(include_index=True):
+            if name.startswith(".tmp-"):
+                if now - st.st_mtime > 3600:  # left behind by a killed writer
+                    self._unlink(path)
+                continue
+            if os.path.dirname(path) == index_dir:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total > limit:
+            target = int(limit * 0.9)
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                if self._unlink(path):
+                    total -= size
+                    removed += 1
+        return {
+            "entries": len(entries) - removed,
+            "bytes": total,
+            "removed": removed,
+            "index_removed": self._prune_index(limit // self.INDEX_SHARE),
+        }
+
+    def _prune_index(self, limit: int) -> int:
+        """Trim the stat index to 90% of limit bytes, newest mappings kept; returns mappings dropped."""
+        try:
+            if os.path.getsize(self._index_file()) <= limit:
+                return 0
+        except OSError:
+            return 0
+        self._index = None  # re-read: other processes may have appended
+        index = self._load_index()
+        kept, size = [], 0
+        for (path, tag), (m, n, key) in reversed(index.items()):
+            size += len(f"{tag}\t{m}\t{n}\t{key}\t{path}\n".encode("utf-8", "surrogateescape"))
+            if size > limit * 0.9:
+                break
+            kept.append(((path, tag), (m, n, key)))
+        self._index = dict(reversed(kept))
+        self._write_index(self._index)
+        return len(index) - len(kept)
+
+    @staticmethod
+    def _unlink(path: str) -> bool:
+        try:
+            os.unlink(path)
+            return True
+        except OSError:
+            return False
+
+    def usage(self) -> dict:
+        """Entry count and bytes per kind (the stat index is in index_usage)."""
+        kinds = {}
+        for path, name, st in self._entries():
+            if name.startswith(".tmp-"):
+                continue
+            kind = os.path.relpath(path, self.root).split(os.sep)[0]
+            entry = kinds.setdefault(kind, {"entries": 0, "bytes": 0})
+            entry["entries"] += 1
+            entry["bytes"] += st.st_size
+        return kinds
+
+    def index_usage(self) -> dict:
+        """Mappings and bytes in the stat index."""
+        try:
+            size = os.path.getsize(self._index_file())
+        except OSError:
+            size = 0
+        return {"entries": len(self._load_index()) if size else 0, "bytes": size}
+
+    def clear(self) -> int:
+        """Delete every entry (and the stat index); returns how many files were removed."""
+        self._index = None
+        return sum(self._unlink(path) for path, _, _ in list(self._entries(include_index=True)))
+
+    def stats(self) -> dict:
+        return {
+            "root": self.root,
+            "enabled": self.enabled,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "index_hits": self.index_hits,
+        }
+
+
+def code_fingerprint(*objects) -> str:
+    """Short hash of the logic of functions and classes (bytecode, names, constants).
+
+    Line numbers are left out, so only a change to the code itself (not an
+    edit elsewhere in the file) gives a new fingerprint. Goes into cache keys
+    next to rules_fingerprint.
+    """
+    import types
+
+    digest = hashlib.sha1()
+
+    def feed(code):
+        digest.update(code.co_code)
+        digest.update(repr(code.co_names).encode())
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                feed(const)
+            else:
+                digest.update(repr(const).encode())
+
+    for obj in objects:
+        members = [obj] if not isinstance(obj, type) else [v for _, v in sorted(vars(obj).items())]
+        for member in members:
+            func = getattr(member, "__func__", member)  # staticmethod / classmethod
+            func = getattr(func, "fget", func)  # property
+            if hasattr(func, "__code__"):
+                feed(func.__code__)
+    return digest.hexdigest()[:12]
+
+
+RESULT_CACHE = ResultCache()
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Directory mode (classify/stats over a tree)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+SKIP_DIRS = frozenset(
+    ".git .hg .svn node_modules __pycache__ .venv venv target dist build"
+    " .mypy_cache .pytest_cache .ruff_cache .tox".split()
+)
+SOURCE_EXTENSIONS = frozenset(
+    ".py .pyi .js .jsx .mjs .ts .tsx .rs .go .c .h .cpp .hpp .cc .java .kt .swift .rb .sh .bash .zsh .nu .zig"
+    " .sql .html .css .toml .yml .yaml .lua .php .cs .r .jl .ex .exs .hs .ml .scala".split()
+)
+
+
+def walk_source_entries(root: str, skip_dirs=SKIP_DIRS, extensions=SOURCE_EXTENSIONS):
+    """Yield os.DirEntry for source files under root in sorted order.
+
+    Prunes skip_dirs and hidden directories while walking. The entries
+    carry scandir's cached type info, so callers that need a stat get it
+    from entry.stat() without another path lookup on platforms that fill
+    it in.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in skip_dirs and not entry.name.startswith("."):
+                    subdirs.append(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in extensions:
+                yield entry
+        stack.extend(reversed(subdirs))
+
+
+def walk_sources(root: str):
+    """Yield source file paths under root in sorted order, pruning SKIP_DIRS and hidden directories."""
+    for entry in walk_source_entries(root):
+        yield entry.path
+
+
+def classify_path(path: str, with_lines: bool = False) -> dict:
+    """One NDJSON record for a file: stats, plus columnar classifications when with_lines is set.
+
+    Records are cached in RESULT_CACHE by file content; the cache's stat
+    index lets unchanged files skip the read and the hash on later runs.
+    """
+    engine = CLASSIFIER_ENGINE
+    kind = "cli-classify" if with_lines else "cli-stats"
+    try:
+        key, data = RESULT_CACHE.file_key(path, "", classifier_version(engine))
+        cached = RESULT_CACHE.get(kind, key)
+        if cached is not None:
+            return {"type": "file", "path": path, **cached}
+        if data is None:  # indexed, but the entry itself was pruned
+            with open(path, "rb") as f:
+                data = f.read()
+    except OSError as e:
+        return {"type": "error", "path": path, "error": str(e)}
+
+    # Same text open(..., errors="replace") gave: universal newlines
+    source = data.decode("utf-8", "replace").replace("\r\n", "\n").replace("\r", "\n")
+    results = classify_source(source, engine)
+    counts = results.counts()
+    total = len(results)
+    classified = sum(v for k, v in counts.items() if k not in ("neutral", "unknown"))
+    record = {
+        "total_lines": total,
+        "classified_lines": classified,
+        "coverage": round(classified / total * 100, 1) if total > 0 else 0,
+        "prefix_counts": counts,
+    }
+    if with_lines:
+        record["classifications"] = results.to_columns()
+    RESULT_CACHE.put(kind, key, record)
+    return {"type": "file", "path": path, **record}
+
+
+def _classify_path_lines(path: str) -> dict:
+    return classify_path(path, with_lines=True)
+
+
+def iter_tree_records(root: str, jobs: int = None, with_lines: bool = False):
+    """Classify every source file under root across `jobs` worker processes.
+
+    Records are yielded in walk order as soon as they are ready; jobs=1 (or a
+    single file) stays in-process so there is no pool start-up cost.
+    """
+    worker = _classify_path_lines if with_lines else classify_path
+    paths = list(walk_sources(root))
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    if jobs == 1 or len(paths) < 2:
+        yield from map(worker, paths)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        chunksize = max(1, min(64, len(paths) // (jobs * 4)))
+        yield from pool.map(worker, paths, chunksize=chunksize)
+
+
+def aggregate_records(records) -> dict:
+    """Fold file records into one prefix_stats-shaped summary (O(categories) memory)."""
+    counts = {}
+    files = errors = total = classified = 0
+    for record in records:
+        if record["type"] != "file":
+            errors += 1
+            continue
+        files += 1
+        total += record["total_lines"]
+        classified += record["classified_lines"]
+        for cat, n in record["prefix_counts"].items():
+            counts[cat] = counts.get(cat, 0) + n
+    return {
+        "type": "summary",
+        "files": files,
+        "errors": errors,
+        "total_lines": total,
+        "classified_lines": classified,
+        "coverage": round(classified / total * 100, 1) if total > 0 else 0,
+        "prefix_counts": counts,
+    }
+
+
+def _emit_tree(root: str, args: list, with_lines: bool) -> dict:
+    """Stream NDJSON file records to stdout when --jsonl is given; return the summary."""
+    jsonl = "--jsonl" in args
+    jobs = _number_option(args, "--jobs", "-j") or None
+
+    def tap(records):
+        for record in records:
+            if jsonl:
+                sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
+            yield record
+
+    summary = aggregate_records(tap(iter_tree_records(root, jobs, with_lines)))
+    if jsonl:
+        sys.stdout.write(json.dumps(summary, separators=(",", ":")) + "\n")
+    return summary
+
+
+def _option(args: list, *names):
+    """Value following the first of names in args (``--jobs 4``), or None."""
+    for i, arg in enumerate(args):
+        if arg in names and i + 1 < len(args):
+            return args[i + 1]
+    return None
+
+
+def _number_option(args: list, *names, kind=int, default=None):
+    """_option parsed as kind (int or float), or default; a malformed value is a usage error (exit 2)."""
+    value = _option(args, *names)
+    if value is None:
+        return default
+    try:
+        return kind(value)
+    except ValueError:
+        expected = "an integer" if kind is int else "a number"
+        print(f"Error: {names[0]} expects {expected}, got {value!r}", file=sys.stderr)
+        sys.exit(2)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Watch mode (incremental tree stats)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+
+def _summarize(agg: dict) -> dict:
+    total = agg["total_lines"]
+    coverage = round(agg["classified_lines"] / total * 100, 1) if total > 0 else 0
+    return {**agg, "prefix_counts": dict(agg["prefix_counts"]), "coverage": coverage}
+
+
+class TreeWatcher:
+    """Keeps prefix coverage and distribution for a tree current by polling.
+
+    Each poll() walks the tree with scandir and compares (mtime_ns, size)
+    against the last snapshot; only added or modified files are passed to
+    classify(path), which returns a record with total_lines, classified_lines
+    and prefix_counts (classify_path by default). Aggregates are kept for
+    every directory, covering its whole subtree. A file change applies its
+    difference to the file's ancestors only, so nothing is recomputed
+    from scratch.
+    """
+
+    def __init__(self, root: str, classify=None, skip_dirs=SKIP_DIRS, extensions=SOURCE_EXTENSIONS):
+        self.root = os.path.abspath(root)
+        self.classify = classify or classify_path
+        self.skip_dirs = skip_dirs
+        self.extensions = extensions
+        self.files = {}  # path -> (mtime_ns, size, record)
+        self.dirs = {}  # directory -> aggregate over its subtree
+        self.polls = 0
+
+    def _ancestors(self, path: str):
+        directory = os.path.dirname(path)
+        while True:
+            yield directory
+            if directory == self.root or len(directory) <= len(self.root):
+                return
+            directory = os.path.dirname(directory)
+
+    def _apply(self, path: str, record: dict, sign: int, touched: set):
+        for directory in self._ancestors(path):
+            agg = self.dirs.get(directory)
+            if agg is None:
+                agg = self.dirs[directory] = {"files": 0, "total_lines": 0, "classified_lines": 0, "prefix_counts": {}}
+            agg["files"] += sign
+            agg["total_lines"] += sign * record["total_lines"]
+            agg["classified_lines"] += sign * record["classified_lines"]
+            counts = agg["prefix_counts"]
+            for cat, n in record["prefix_counts"].items():
+                value = counts.get(cat, 0) + sign * n
+                if value:
+                    counts[cat] = value
+                else:
+                    counts.pop(cat, None)
+            touched.add(directory)
+
+    def stat_tree(self) -> dict:
+        """path -> (mtime_ns, size) for every watched file, one scandir pass."""
+        found = {}
+        for entry in walk_source_entries(self.root, self.skip_dirs, self.extensions):
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            found[entry.path] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def poll(self) -> dict:
+        """Reclassify what changed since the last poll and return the delta.
+
+        The first poll classifies everything. 'changed' is empty when nothing moved.
+        """
+        self.polls += 1
+        current = self.stat_tree()
+        changed = []
+        touched = set()
+        for path in self.files.keys() - current.keys():
+            _, _, old = self.files.pop(path)
+            self._apply(path, old, -1, touched)
+            changed.append({"path": path, "status": "removed"})
+        for path, stamp in current.items():
+            previous = self.files.get(path)
+            if previous is not None and previous[:2] == stamp:
+                continue
+            record = self.classify(path)
+            if record.get("type") == "error":
+                continue
+            record = {k: record[k] for k in ("total_lines", "classified_lines", "prefix_counts")}
+            if previous is not None:
+                self._apply(path, previous[2], -1, touched)
+            self._apply(path, record, 1, touched)
+            self.files[path] = (stamp[0], stamp[1], record)
+            changed.append({"path": path, "status": "modified" if previous else "added", **_summarize(record)})
+        for directory in [d for d in touched if self.dirs.get(d, {}).get("files") == 0]:
+            del self.dirs[directory]
+        changed.sort(key=lambda c: c["path"])
+        return {
+            "root": self.root,
+            "poll": self.polls,
+            "changed": changed,
+            "directories": {d: _summarize(self.dirs[d]) for d in sorted(touched) if d in self.dirs},
+            "summary": self.summary(),
+        }
+
+    def summary(self) -> dict:
+        agg = self.dirs.get(self.root) or {"files": 0, "total_lines": 0, "classified_lines": 0, "prefix_counts": {}}
+        return _summarize(agg)
+
+    def snapshot(self) -> dict:
+        """Current aggregates for every directory, as the first poll would report them."""
+        return {
+            "root": self.root,
+            "poll": self.polls,
+            "summary": self.summary(),
+            "directories": {d: _summarize(agg) for d, agg in sorted(self.dirs.items())},
+        }
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Native prefix engine (crates/prefix-engine cdylib via ctypes)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+# Category for each PrefixSymbol::to_bits code (0-8)
+BIT_CATEGORIES = tuple(SYMBOLS)
+
+NATIVE_LIB_ENV = "UVSPEED_PREFIX_LIB"
+NATIVE_LIB_NAME = {"win32": "uvspeed_prefix_engine.dll", "darwin": "libuvspeed_prefix_engine.dylib"}.get(
+    sys.platform, "libuvspeed_prefix_engine.so"
+)
+CRATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crates", "prefix-engine")
+
+_native_lib = None
+_native_path = None
+_native_checked = False
+
+
+def native_library_candidates() -> list:
+    """Paths tried for the cdylib: $UVSPEED_PREFIX_LIB, then the crate's release and debug builds."""
+    paths = []
+    if os.environ.get(NATIVE_LIB_ENV):
+        paths.append(os.environ[NATIVE_LIB_ENV])
+    for profile in ("release", "debug"):
+        paths.append(os.path.join(CRATE_DIR, "target", profile, NATIVE_LIB_NAME))
+    return paths
+
+
+def load_native_engine():
+    """Load the prefix-engine cdylib once; returns the ctypes library or None."""
+    global _native_lib, _native_path, _native_checked
+    if _native_checked:
+        return _native_lib
+    _native_checked = True
+    for path in native_library_candidates():
+        if not os.path.isfile(path):
+            continue
+        try:
+            lib = ctypes.CDLL(path)
+            fn = lib.uvspeed_classify_buffer
+        except (OSError, AttributeError):
+            # Unloadable, or an older build without the buffer entry point
+            continue
+        fn.argtypes = [ctypes.c_char_p, ctypes.c_size_t, ctypes.c_void_p, ctypes.c_size_t]
+        fn.restype = ctypes.c_size_t
+        _native_lib, _native_path = lib, path
+        break
+    return _native_lib
+
+
+def native_engine_path():
+    """Path of the loaded cdylib, or None when running on the Python port."""
+    load_native_engine()
+    return _native_path
+
+
+_RUST_WHITESPACE = (
+    "\t\n\x0b\x0c\r \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006"
+    "\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"
+)
+_RUST_BOUNDARY = frozenset(" ({:<[\t!.")
+_RUST_COMMENT_PREFIXES = ("#", "//", "/*", "--", "'''", '"""', ";;", "<!-", "REM ")
+# (code, keywords that must end at a boundary, plain prefixes) in classify() order
+_RUST_RULES = (
+    (7, ("import", "from", "use", "require", "using", "extern", "mod", "package"), ("#include", "@import")),
+    (
+        0,
+        (
+            "fn",
+            "function",
+            "def",
+            "class",
+            "struct",
+            "enum",
+            "trait",
+            "interface",
+            "type",
+            "const",
+            "let",
+            "var",
+            "val",
+            "static",
+            "pub fn",
+            "pub struct",
+            "pub enum",
+            "pub trait",
+            "export",
+            "async fn",
+            "impl",
+            "protocol",
+            "typedef",
+            "macro_rules!",
+        ),
+        (),
+    ),
+    (
+        1,
+        (
+            "if",
+            "else",
+            "elif",
+            "for",
+            "while",
+            "loop",
+            "match",
+            "switch",
+            "case",
+            "when",
+            "guard",
+            "try",
+            "catch",
+            "except",
+            "finally",
+            "do",
+        ),
+        ("} else",),
+    ),
+    (
+        6,
+        ("return", "yield", "break", "continue", "throw", "raise", "panic!", "assert", "defer", "await"),
+        (),
+    ),
+)
+_RUST_IO = (
+    "print",
+    "println",
+    "console.",
+    ".log(",
+    ".warn(",
+    ".error(",
+    "write(",
+    "writeln!",
+    "read(",
+    "readline",
+    "fetch(",
+    "XMLHttpRequest",
+    "stdin",
+    "stdout",
+    "stderr",
+    "fs.read",
+    "fs.write",
+    "open(",
+    "socket",
+    "http.",
+)
+_RUST_CLOSERS = frozenset(("}", "};", ")", "]", "end", "fi", "done", "})"))
+
+
+def _rust_contains_assignment(trimmed: str) -> bool:
+    # A '=' that is not part of '=='; the last character is never checked (as in lib.rs)
+    last = len(trimmed) - 1
+    i = trimmed.find("=")
+    while 0 <= i < last:
+        if (i == 0 or trimmed[i - 1] != "=") and trimmed[i + 1] != "=":
+            return True
+        i = trimmed.find("=", i + 1)
+    return False
+
+
+def rust_classify_line(line: str) -> int:
+    """Pure-Python port of PrefixClassifier::classify; returns the 4-bit symbol code."""
+    trimmed = line.strip(_RUST_WHITESPACE)
+    if not trimmed:
+        return 4
+    if trimmed.startswith(("#include", "#import")):
+        return 7
+    if trimmed.startswith(_RUST_COMMENT_PREFIXES):
+        return 5
+    for code, keywords, prefixes in _RUST_RULES:
+        for kw in keywords:
+            if trimmed.startswith(kw) and (len(trimmed) == len(kw) or trimmed[len(kw)] in _RUST_BOUNDARY):
+                return code
+        if prefixes and trimmed.startswith(prefixes):
+            return code
+    if any(pat in trimmed for pat in _RUST_IO):
+        return 2
+    if _rust_contains_assignment(trimmed):
+        return 3
+    if trimmed in _RUST_CLOSERS:
+        return 4
+    return 8
+
+
+def classify_buffer(source, native: bool = None) -> bytes:
+    """One PrefixSymbol::to_bits code per line of ``source`` (str or UTF-8 bytes).
+
+    Lines split like Rust's ``str::lines()``. Uses the prefix-engine cdylib in a
+    single FFI call when it can be loaded (``native=True`` requires it,
+    ``native=False`` forces the pure-Python port); both give identical codes.
+    """
+    lib = load_native_engine() if native is not False else None
+    if native and lib is None:
+        raise RuntimeError(f"prefix-engine library not found (tried: {', '.join(native_library_candidates())})")
+    if lib is not None:
+        data = source if isinstance(source, bytes) else source.encode("utf-8", "surrogatepass")
+        cap = data.count(b"\n") + 1
+        out = ctypes.create_string_buffer(cap)
+        count = lib.uvspeed_classify_buffer(data, len(data), out, cap)
+        if count <= cap:
+            return out.raw[:count]
+        # usize::MAX: not valid UTF-8, so classify the replaced text in Python
+        text = data.decode("utf-8", "replace")
+    else:
+        text = source.decode("utf-8", "replace") if isinstance(source, bytes) else source
+    starts, ends = rust_line_offsets(text)
+    return bytes(rust_classify_line(text[a:b]) for a, b in zip(starts, ends))
+
+
+# Python and Rust-port classifier tables and code, plus the CLI version; part of every CLI cache key
+RULES_VERSION = rules_fingerprint(
+    VERSION,
+    SYMBOLS,
+    PREFIX_RULES,
+    IO_PATTERNS,
+    ASSIGNMENT_OPS,
+    _RUST_RULES,
+    _RUST_IO,
+    sorted(_RUST_CLOSERS),
+    sorted(_RUST_BOUNDARY),
+    _RUST_COMMENT_PREFIXES,
+    _RUST_WHITESPACE,
+    code_fingerprint(
+        classify_line,
+        classify_source,
+        rust_classify_line,
+        _rust_contains_assignment,
+        classify_buffer,
+        rust_line_offsets,
+    ),
+)
+
+
+def classifier_version(engine: str) -> str:
+    """Cache version tag for an engine; 'native' also pins the loaded library file (path, size, mtime)."""
+    if engine != "native":
+        return f"{engine}:{RULES_VERSION}"
+    path = native_engine_path()
+    try:
+        st = os.stat(path) if path else None
+    except OSError:
+        st = None
+    lib = f"{path}:{st.st_size}:{st.st_mtime_ns}" if st else "python-port"
+    return f"native:{RULES_VERSION}:{hashlib.sha1(lib.encode()).hexdigest()[:12]}"
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # Module loader
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 
-def _load_module(name: str, filename: str):
-    """Load a module from src/01-core/ by filename."""
-    spec = importlib.util.spec_from_file_location(name, os.path.join(CORE_DIR, filename))
+def _load_module(name: str, filename: str, directory=None):
+    """Load a module by filename from src/01-core/ (or another source directory).
+
+    The module is registered in sys.modules and its directory goes on sys.path
+    so process-pool workers can unpickle functions defined in it. The bench
+    tools and the test fixtures load the core modules through this too.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    directory = os.fspath(directory or CORE_DIR)
+    if directory not in sys.path:
+        sys.path.append(directory)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(directory, filename))
     mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
+    sys.modules[name] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        del sys.modules[name]
+        raise
     return mod
 
 
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# In-process benchmark (uvspeed-bridge bench)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+BENCH_LINES = (
+    "import os",
+    "from pathlib import Path",
+    "",
+    "class Engine(Base):",
+    "    def run(self, item):",
+    "        # walk the queue",
+    "        if item is None:",
+    "            return self.value",
+    "        for key in item.keys():",
+    "            total = total + len(key)",
+    "        print(f'{total} keys')",
+    "        while pending:",
+    "            pending.pop()",
+    "    @property",
+    "    try:",
+    "    except ValueError:",
+    "let mut count = 0;",
+    "pub fn handle(req: Request) -> Response {",
+    "    match req.method() {",
+    "}",
+    "const data = await fetch(url);",
+    "console.log(data);",
+    "func (s *Server) Start() error {",
+    "#include <stdio.h>",
+)
+
+
+def bench_corpus(lines: int = 100_000) -> list:
+    """Deterministic synthetic source as [(name, text)], cycling BENCH_LINES with varying identifiers."""
+    out = []
+    for i in range(lines):
+        line = BENCH_LINES[(i * 7) % len(BENCH_LINES)]
+        out.append(line.replace("item", f"item{i}") if i % 3 else line)
+    return [("synthetic.py", "\n".join(out))]
+
+
+def bench_documents(path: str) -> list:
+    """[(path, text)] for a file or every source file under a directory."""
+    paths = list(walk_sources(path)) if os.path.isdir(path) else [path]
+    docs = []
+    for p in paths:
+        with open(p, encoding="utf-8", errors="replace") as f:
+            docs.append((p, f.read()))
+    return docs
+
+
+def bench_engines() -> dict:
+    """name -> factory; each factory builds a fresh engine and returns run(docs).
+
+    Calling the factory inside the cold timing charges table compilation,
+    library loading and empty caches to the cold number. The bridge engines
+    run with the line memo off so they classify every line like the CLI
+    ones; bridge-dispatch+memo is the same engine with the default memo.
+    """
+
+    def cli_engine(mode):
+        def factory():
+            def run(docs):
+                for _, text in docs:
+                    for line in text.splitlines():
+                        classify_line(line, mode)
+
+            return run
+
+        return factory
+
+    engines = {"cli-scan": cli_engine("scan"), "cli-dispatch": cli_engine("dispatch")}
+    try:
+        bridge = _load_module("quantum_bridge_server", "quantum_bridge_server.py")
+    except (ImportError, OSError):
+        # Missing deps, or a standalone uvspeed_cli (wheel install) with no src/01-core beside it
+        bridge = None
+    if bridge is not None:
+
+        def bridge_engine(mode, **options):
+            def factory():
+                engine = bridge.QuantumPrefixEngine(engine=mode, **options)
+
+                def run(docs):
+                    for name, text in docs:
+                        language = engine.detect_language(name)
+                        classify = engine.classify_line
+                        for line in text.split("\n"):
+                            classify(line, language)
+
+                return run
+
+            return factory
+
+        engines["bridge-regex"] = bridge_engine("regex", cache_size=0)
+        engines["bridge-dispatch"] = bridge_engine("dispatch", cache_size=0)
+        # Warm passes of the memo row mostly measure LRU hits, not classification
+        engines["bridge-dispatch+memo"] = bridge_engine("dispatch")
+    if load_native_engine() is not None:
+
+        def native_factory():
+            def run(docs):
+                for _, text in docs:
+                    classify_buffer(text, native=True)
+
+            return run
+
+        engines["native"] = native_factory
+    return engines
+
+
+def run_bench(docs: list, repeat: int = 3, engines: dict = None) -> dict:
+    """Cold (fresh engine, first pass) and warm (best of `repeat` later passes) rates per engine."""
+
+    lines = sum(text.count("\n") + 1 for _, text in docs)
+    size = sum(len(text.encode("utf-8", "surrogatepass")) for _, text in docs)
+    results = []
+    for name, factory in (engines or bench_engines()).items():
+        t0 = time.perf_counter()
+        run = factory()
+        run(docs)
+        cold = time.perf_counter() - t0
+        warm = float("inf")
+        for _ in range(max(repeat, 1)):
+            t0 = time.perf_counter()
+            run(docs)
+            warm = min(warm, time.perf_counter() - t0)
+        results.append(
+            {
+                "engine": name,
+                "cold_seconds": round(cold, 6),
+                "warm_seconds": round(warm, 6),
+                "cold_lines_per_sec": round(lines / cold) if cold else None,
+                "warm_lines_per_sec": round(lines / warm) if warm else None,
+                "cold_mb_per_sec": round(size / cold / 1e6, 2) if cold else None,
+                "warm_mb_per_sec": round(size / warm / 1e6, 2) if warm else None,
+            }
+        )
+    return {
+        "files": len(docs),
+        "lines": lines,
+        "bytes": size,
+        "repeat": repeat,
+        "python": sys.version.split()[0],
+        "native_library": native_engine_path(),
+        "results": results,
+    }
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Load generator (uvspeed-bridge loadtest)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+LOADTEST_SOURCE = "\n".join(BENCH_LINES[:16])
+
+# name -> (transport, HTTP path or WS message type, payload, expected WS reply type)
+LOADTEST_SCENARIOS = {
+    "prefix": ("http", "/api/prefix", {"code": LOADTEST_SOURCE, "language": "python"}, None),
+    "execute": ("http", "/api/execute", {"code": "total = sum(range(100))", "cell_id": "loadtest"}, None),
+    "scan": ("http", "/api/security/scan", {"code": LOADTEST_SOURCE, "language": "python"}, None),
+    "ws-ping": ("ws", "ping", {}, "pong"),
+    "ws-prefix": ("ws", "prefix", {"code": LOADTEST_SOURCE, "language": "python"}, "prefix-result"),
+}
+LOADTEST_MIX = "prefix=4,scan=2,execute=1,ws-ping=1,ws-prefix=2"
+
+
+def parse_mix(spec: str) -> dict:
+    """``"prefix=4,ws-ping"`` -> ``{"prefix": 4.0, "ws-ping": 1.0}``; a bare name weighs 1."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in LOADTEST_SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name} (choose from {', '.join(LOADTEST_SCENARIOS)})")
+        mix[name] = float(weight or 1)
+        if mix[name] < 0:
+            raise ValueError(f"Negative weight for {name}")
+    if not any(mix.values()):
+        raise ValueError("Empty scenario mix")
+    return mix
+
+
+def parse_server_timing(header: str) -> dict:
+    """``"route;dur=1.2, encode;dur=0.1"`` -> ``{"route": 1.2, "encode": 0.1}`` (milliseconds)."""
+    timings = {}
+    for metric in filter(None, (m.strip() for m in (header or "").split(","))):
+        name, *params = (p.strip() for p in metric.split(";"))
+        for param in params:
+            key, _, value = param.partition("=")
+            if key == "dur":
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+def _percentile(ordered: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def _latency_summary(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "p50": round(_percentile(ordered, 50), 3),
+        "p95": round(_percentile(ordered, 95), 3),
+        "p99": round(_percentile(ordered, 99), 3),
+        "max": round(ordered[-1], 3) if ordered else 0.0,
+        "mean": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+    }
+
+
+class _LoadClient:
+    """One virtual user: a persistent HTTP connection and a lazily opened WebSocket."""
+
+    def __init__(self, url: str, ws_url: str, timeout: float):
+        import http.client
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.http = conn_cls(parts.hostname, parts.port, timeout=timeout)
+        self.ws_url = ws_url
+        self.ws = None
+        self._ws_stack = contextlib.ExitStack()
+        self.timeout = timeout
+
+    def call(self, transport: str, target: str, payload: dict, expect: str) -> dict:
+        """Run one request; returns server-side timings in ms. Raises on transport or application errors."""
+        if transport == "http":
+            try:
+                self.http.request("POST", target, json.dumps(payload), {"Content-Type": "application/json"})
+                resp = self.http.getresponse()
+                body = resp.read()
+            except Exception:
+                self.http.close()  # reconnect on the next request
+                raise
+            if resp.status != 200:
+                raise RuntimeError(f"HTTP {resp.status}")
+            error = json.loads(body).get("error")
+            if error:
+                raise RuntimeError(str(error))
+            return parse_server_timing(resp.getheader("Server-Timing"))
+
+        if self.ws is None:
+            from websockets.sync.client import connect
+
+            self.ws = self._ws_stack.enter_context(connect(self.ws_url, open_timeout=self.timeout))
+            self.ws.recv(timeout=self.timeout)  # the bridge greets with an 'init' message
+        try:
+            self.ws.send(json.dumps({"type": target, "server_timing": True, **payload}))
+            # Broadcasts (position changes, watch deltas) may interleave; skip to the reply
+            while True:
+                reply = json.loads(self.ws.recv(timeout=self.timeout))
+                if reply.get("type") in (expect, "error"):
+                    break
+        except Exception:
+            self.close_ws()
+            raise
+        if reply.get("type") == "error":
+            raise RuntimeError(reply.get("message", "error"))
+        return reply.get("server_timing") or {}
+
+    def close_ws(self):
+        if self.ws is not None:
+            with contextlib.suppress(Exception):
+                self._ws_stack.close()
+            self.ws = None
+
+    def close(self):
+        self.http.close()
+        self.close_ws()
+
+
+def run_loadtest(
+    url: str = "http://127.0.0.1:8085",
+    ws_url: str = "ws://127.0.0.1:8086",
+    mix: dict = None,
+    concurrency: int = 8,
+    duration: float = 10.0,
+    timeout: float = 10.0,
+    seed: int = 0,
+) -> dict:
+    """Drive a weighted mix of bridge endpoints from `concurrency` closed-loop clients for `duration` seconds.
+
+    Each client picks its next scenario at random by weight, sends it, and
+    waits for the reply. Client-side latency, errors and the server's own
+    timings (Server-Timing header over HTTP, ``server_timing`` over WS) are
+    reported per scenario and overall.
+    """
+    import random
+    import threading
+
+    mix = dict(mix or parse_mix(LOADTEST_MIX))
+    skipped = []
+    if any(LOADTEST_SCENARIOS[name][0] == "ws" for name in mix) and importlib.util.find_spec("websockets") is None:
+        skipped = [name for name in mix if LOADTEST_SCENARIOS[name][0] == "ws"]
+        mix = {name: w for name, w in mix.items() if name not in skipped}
+    names = [name for name, weight in mix.items() if weight > 0]
+    if not names:
+        raise ValueError("No runnable scenarios (WS scenarios need the websockets package)")
+    weights = [mix[name] for name in names]
+
+    per_client = []
+    deadline = time.perf_counter() + duration
+
+    def worker(index: int):
+        rng = random.Random(seed + index)
+        client = _LoadClient(url, ws_url, timeout)
+        record = {name: {"latency": [], "errors": 0, "last_error": None, "server": {}} for name in names}
+        per_client.append(record)
+        try:
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                entry = record[name]
+                t0 = time.perf_counter()
+                try:
+                    server = client.call(*LOADTEST_SCENARIOS[name])
+                except Exception as e:
+                    entry["errors"] += 1
+                    entry["last_error"] = f"{type(e).__name__}: {e}"
+                    continue
+                entry["latency"].append((time.perf_counter() - t0) * 1000)
+                for metric, ms in server.items():
+                    entry["server"].setdefault(metric, []).append(ms)
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(max(1, concurrency))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    scenarios, all_latency, total_errors = [], [], 0
+    for name in names:
+        latency = [ms for record in per_client for ms in record[name]["latency"]]
+        errors = sum(record[name]["errors"] for record in per_client)
+        server = {}
+        for record in per_client:
+            for metric, values in record[name]["server"].items():
+                server.setdefault(metric, []).extend(values)
+        last_error = next((r[name]["last_error"] for r in per_client if r[name]["last_error"]), None)
+        requests = len(latency) + errors
+        scenarios.append(
+            {
+                "scenario": name,
+                "weight": mix[name],
+                "requests": requests,
+                "errors": errors,
+                "error_rate": round(errors / requests, 4) if requests else 0.0,
+                "throughput_rps": round(len(latency) / elapsed, 1),
+                "latency_ms": _latency_summary(latency),
+                "server_ms": {metric: _latency_summary(values) for metric, values in server.items()},
+                "last_error": last_error,
+            }
+        )
+        all_latency.extend(latency)
+        total_errors += errors
+
+    requests = len(all_latency) + total_errors
+    return {
+        "url": url,
+        "ws_url": ws_url,
+        "concurrency": max(1, concurrency),
+        "duration_s": round(elapsed, 3),
+        "requests": requests,
+        "errors": total_errors,
+        "error_rate": round(total_errors / requests, 4) if requests else 0.0,
+        "throughput_rps": round(len(all_latency) / elapsed, 1),
+        "latency_ms": _latency_summary(all_latency),
+        "skipped": skipped,
+        "scenarios": scenarios,
+    }
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # CLI Commands
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 
+def startup_profile(top: int = 12) -> dict:
+    """Import-time breakdown of the bridge module, from a fresh interpreter run with -X importtime.
+
+    Also returns the bridge's capability states as seen right after import, so
+    optional stacks show up as 'available' (installed, not loaded) rather than
+    as import time.
+    """
+    import subprocess
+
+    code = (
+        f"import json, sys; sys.path.insert(0, {CORE_DIR!r}); "
+        "import quantum_bridge_server as b; print(json.dumps(b.capability_status()))"
+    )
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - t0) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "bridge import failed")
+
+    bridge = None
+    imports = []
+    for raw in proc.stderr.splitlines():
+        if not raw.startswith("import time:"):
+            continue
+        parts = raw[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2][1:]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entry = {"module": name.strip(), "self_ms": int(parts[0]) / 1000, "cumulative_ms": int(parts[1]) / 1000}
+        if entry["module"] == "quantum_bridge_server":
+            bridge = entry
+        elif depth == 1:
+            imports.append(entry)
+    imports.sort(key=lambda e: -e["cumulative_ms"])
+    return {
+        "wall_ms": round(wall_ms, 1),
+        "bridge_cumulative_ms": bridge["cumulative_ms"] if bridge else None,
+        "bridge_self_ms": bridge["self_ms"] if bridge else None,
+        "imports": imports[:top],
+        "capabilities": json.loads(proc.stdout.strip().splitlines()[-1]) if proc.stdout.strip() else {},
+    }
+
+
 def cmd_serve(args: list):
     """Start the quantum bridge server."""
+    if "--startup-profile" in args:
+        profile = startup_profile()
+        if "--json" in args:
+            print(json.dumps(profile, indent=2))
+            return
+        print("⚛ Bridge start-up profile (python -X importtime, fresh interpreter)")
+        print(f"  Interpreter + import: {profile['wall_ms']:>8.1f} ms")
+        print(f"  Bridge import total:  {profile['bridge_cumulative_ms'] or 0:>8.1f} ms")
+        print(f"  Bridge module body:   {profile['bridge_self_ms'] or 0:>8.1f} ms")
+        print("  Slowest imports:")
+        for entry in profile["imports"]:
+            print(f"    {entry['module']:<28} {entry['cumulative_ms']:>8.1f} ms")
+        print("  Optional capabilities (imported on first use):")
+        for name, cap in profile["capabilities"].items():
+            detail = cap.get("version") or cap.get("install") or cap.get("error") or ""
+            print(f"    {name:<12} {cap['state']:<10} {detail}")
+        return
+
+    import asyncio
+
     bridge = _load_module("quantum_bridge_server", "quantum_bridge_server.py")
     if hasattr(bridge, "main"):
-        bridge.main()
+        try:
+            asyncio.run(bridge.main())
+        except KeyboardInterrupt:
+            print("Server shutting down")
     else:
         print("Bridge server module loaded but no main() found.")
         print(f"Core modules at: {CORE_DIR}")
 
 
 def cmd_classify(args: list):
-    """Classify a file or stdin with quantum prefixes."""
+    """Classify a file, a directory tree (NDJSON) or stdin with quantum prefixes."""
+    if args and os.path.isdir(args[0]):
+        # One record per file as NDJSON, then the aggregated summary
+        _emit_tree(args[0], args + ["--jsonl"], with_lines=True)
+        return
+    if "--stream" in args:
+        # Line by line; with --json each line is one NDJSON object
+        as_json = "--json" in args
+        out = sys.stdout
+        n = 0
+        with _binary_input(args) as src:
+            for lines in iter_line_batches(src):
+                buf = []
+                for line in lines:
+                    n += 1
+                    cl = classify_line(line)
+                    if as_json:
+                        record = {"line": n, "symbol": cl["symbol"], "category": cl["category"], "text": line}
+                        buf.append(json.dumps(record) + "\n")
+                    else:
+                        buf.append(f"{cl['symbol']:>3} {line}\n")
+                out.write("".join(buf))
+                out.flush()
+        return
     if args and args[0] != "-":
         filepath = args[0]
         if not os.path.isfile(filepath):
@@ -188,15 +1807,26 @@ def cmd_classify(args: list):
     results = classify_source(source)
 
     if fmt == "json":
-        print(json.dumps(results, indent=2))
+        print(json.dumps(results.to_json(columnar="--columnar" in args), indent=2))
     else:
-        for r in results:
-            sym = r["symbol"].rjust(3)
-            print(f"{sym} {r['text']}")
+        for i in range(len(results)):
+            print(f"{results.symbol(i):>3} {results.text(i)}")
 
 
 def cmd_prefix(args: list):
     """Add prefix gutter to source code (stdout)."""
+    stream = "--stream" in args
+    args = [a for a in args if a != "--stream"]
+
+    if stream:
+        # Constant memory: classify each batch as it is read, flush before the next read
+        out = sys.stdout
+        with _binary_input(args) as src:
+            for lines in iter_line_batches(src):
+                out.write("".join(f"{classify_line(line)['symbol']:>3} {line}\n" for line in lines))
+                out.flush()
+        return
+
     if args and args[0] != "-":
         with open(args[0]) as f:
             source = f.read()
@@ -207,20 +1837,32 @@ def cmd_prefix(args: list):
 
 
 def cmd_stats(args: list):
-    """Show prefix statistics for a file."""
-    if args and args[0] != "-":
+    """Show prefix statistics for a file, a directory tree or stdin."""
+    if args and os.path.isdir(args[0]):
+        stats = _emit_tree(args[0], args, with_lines=False)
+        if "--jsonl" in args:
+            return
+    elif "--stream" in args:
+        counter = StreamStats()
+        with _binary_input(args) as src:
+            for lines in iter_line_batches(src):
+                for line in lines:
+                    counter.add(classify_line(line)["category"])
+        stats = counter.result()
+    elif args and args[0] != "-":
         with open(args[0]) as f:
-            source = f.read()
+            stats = prefix_stats(f.read())
     else:
-        source = sys.stdin.read()
+        stats = prefix_stats(sys.stdin.read())
 
-    stats = prefix_stats(source)
     fmt = "json" if "--json" in args else "text"
 
     if fmt == "json":
         print(json.dumps(stats, indent=2))
     else:
         print("⚛ Quantum Prefix Stats")
+        if "files" in stats:
+            print(f"  Files:      {stats['files']}")
         print(f"  Lines:      {stats['total_lines']}")
         print(f"  Classified: {stats['classified_lines']}")
         print(f"  Coverage:   {stats['coverage']}%")
@@ -231,6 +1873,116 @@ def cmd_stats(args: list):
             print(f"    {sym:>3} {cat:<12} {count:>4}  {bar}")
 
 
+def cmd_bench(args: list):
+    """Time the available classifiers in-process on a path or a synthetic corpus."""
+    lines = _number_option(args, "--lines", default=100_000)
+    repeat = _number_option(args, "--repeat", default=3)
+    values = {_option(args, "--lines"), _option(args, "--repeat")}
+    paths = [a for a in args if not a.startswith("-") and a not in values]
+    if paths and not os.path.exists(paths[0]):
+        print(f"Error: Path not found: {paths[0]}", file=sys.stderr)
+        sys.exit(1)
+    docs = bench_documents(paths[0]) if paths else bench_corpus(lines)
+    report = run_bench(docs, repeat)
+
+    if "--json" in args:
+        print(json.dumps(report, indent=2))
+        return
+    source = paths[0] if paths else "synthetic corpus"
+    print(
+        f"⚛ Classifier bench — {source}: {report['files']} file(s), {report['lines']:,} lines, "
+        f"{report['bytes'] / 1e6:.1f} MB"
+    )
+    print(
+        f"  Native library: {report['native_library'] or 'not built (cargo build --release in crates/prefix-engine)'}"
+    )
+    print(f"  {'engine':<22} {'cold lines/s':>13} {'warm lines/s':>13} {'cold MB/s':>10} {'warm MB/s':>10}")
+    for r in report["results"]:
+        print(
+            f"  {r['engine']:<22} {r['cold_lines_per_sec'] or 0:>13,} {r['warm_lines_per_sec'] or 0:>13,} "
+            f"{r['cold_mb_per_sec'] or 0:>10.2f} {r['warm_mb_per_sec'] or 0:>10.2f}"
+        )
+
+
+def cmd_cache(args: list):
+    """Inspect or trim the on-disk result cache (stats | prune | clear)."""
+    action = next((a for a in args if not a.startswith("-")), "stats")
+    cache = RESULT_CACHE
+    if action == "clear":
+        result = {"removed": cache.clear()}
+    elif action == "prune":
+        result = cache.prune()
+    elif action == "stats":
+        usage = cache.usage()
+        result = {
+            "root": cache.root,
+            "enabled": cache.enabled,
+            "max_bytes": cache.max_bytes,
+            "entries": sum(k["entries"] for k in usage.values()),
+            "bytes": sum(k["bytes"] for k in usage.values()),
+            "kinds": usage,
+            "index": cache.index_usage(),
+        }
+    else:
+        print(f"Unknown cache action: {action} (expected stats, prune or clear)", file=sys.stderr)
+        sys.exit(1)
+
+    if "--json" in args:
+        print(json.dumps(result, indent=2))
+    elif action == "stats":
+        print(f"⚛ Result cache — {result['root']}{'' if result['enabled'] else ' (disabled)'}")
+        mib = 1024 * 1024
+        print(
+            f"  Entries: {result['entries']:,}  Size: {result['bytes'] / mib:.1f} / {result['max_bytes'] / mib:.0f} MiB"
+        )
+        for kind, entry in sorted(result["kinds"].items()):
+            print(f"    {kind:<16} {entry['entries']:>8,} {entry['bytes'] / mib:>9.1f} MiB")
+        index = result["index"]
+        print(f"  Stat index: {index['entries']:,} files, {index['bytes'] / mib:.1f} MiB")
+    else:
+        print(f"⚛ Result cache {action}: {result}")
+
+
+def cmd_watch(args: list):
+    """Keep prefix stats for a tree current, printing a line (or NDJSON delta) per change."""
+    paths = [a for a in args if not a.startswith("-") and a != _option(args, "--interval")]
+    root = paths[0] if paths else "."
+    if not os.path.isdir(root):
+        print(f"Error: Not a directory: {root}", file=sys.stderr)
+        sys.exit(1)
+    interval = _number_option(args, "--interval", kind=float, default=1.0)
+    jsonl = "--jsonl" in args
+    watcher = TreeWatcher(root)
+
+    def emit(delta, first=False):
+        if jsonl:
+            sys.stdout.write(json.dumps(delta, separators=(",", ":")) + "\n")
+        else:
+            s = delta["summary"]
+            what = "scanned" if first else f"{len(delta['changed'])} changed"
+            print(
+                f"⚛ {time.strftime('%H:%M:%S')} {what} · {s['files']:,} files · {s['total_lines']:,} lines · "
+                f"coverage {s['coverage']}%"
+            )
+            if not first:
+                for change in delta["changed"][:20]:
+                    detail = f" {change['coverage']}%" if "coverage" in change else ""
+                    print(f"    {change['status']:<8} {os.path.relpath(change['path'], watcher.root)}{detail}")
+        sys.stdout.flush()
+
+    emit(watcher.poll(), first=True)
+    if "--once" in args:
+        return
+    try:
+        while True:
+            time.sleep(interval)
+            delta = watcher.poll()
+            if delta["changed"]:
+                emit(delta)
+    except KeyboardInterrupt:
+        pass
+
+
 def cmd_health(args: list):
     """Check bridge server status."""
     import socket
@@ -245,6 +1997,51 @@ def cmd_health(args: list):
         sys.exit(1)
 
 
+def cmd_loadtest(args: list):
+    """Drive a mix of bridge endpoints at fixed concurrency and report throughput and latency."""
+    url = _option(args, "--url") or "http://127.0.0.1:8085"
+    ws_url = _option(args, "--ws-url") or "ws://127.0.0.1:8086"
+    concurrency = _number_option(args, "--concurrency", "-c", default=8)
+    duration = _number_option(args, "--duration", "-d", kind=float, default=10.0)
+    timeout = _number_option(args, "--timeout", kind=float, default=10.0)
+    max_error_rate = _number_option(args, "--max-error-rate", kind=float)
+    try:
+        mix = parse_mix(_option(args, "--mix") or LOADTEST_MIX)
+        report = run_loadtest(url, ws_url, mix, concurrency=concurrency, duration=duration, timeout=timeout)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    failed = max_error_rate is not None and report["error_rate"] > max_error_rate
+
+    if "--json" in args:
+        print(json.dumps(report, indent=2))
+        sys.exit(1 if failed else 0)
+    lat = report["latency_ms"]
+    print(
+        f"⚛ Load test — {url} + {ws_url}: {report['concurrency']} clients, {report['duration_s']:.1f}s, "
+        f"{report['requests']:,} requests"
+    )
+    print(
+        f"  {report['throughput_rps']:,.1f} req/s · p50 {lat['p50']:.2f} ms · p95 {lat['p95']:.2f} ms · "
+        f"p99 {lat['p99']:.2f} ms · errors {report['error_rate']:.2%}"
+    )
+    if report["skipped"]:
+        print(f"  · Skipped (websockets not installed): {', '.join(report['skipped'])}")
+    print(f"  {'scenario':<10} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}  server p50 ms")
+    for s in report["scenarios"]:
+        lat = s["latency_ms"]
+        server = ", ".join(f"{m} {v['p50']:.2f}" for m, v in s["server_ms"].items()) or "—"
+        print(
+            f"  {s['scenario']:<10} {s['throughput_rps']:>9,.1f} {lat['p50']:>8.2f} {lat['p95']:>8.2f} "
+            f"{lat['p99']:>8.2f} {s['error_rate']:>7.1%}  {server}"
+        )
+        if s["last_error"]:
+            print(f"    ✗ {s['last_error']}")
+    if failed:
+        print(f"✗ Error rate {report['error_rate']:.2%} exceeds {float(max_error_rate):.2%}")
+        sys.exit(1)
+
+
 def cmd_version(args: list):
     """Show version info."""
     print(f"⚛ uvspeed-quantum v{VERSION}")
@@ -254,142 +2051,179 @@ def cmd_version(args: list):
     print(f"  Core:    {CORE_DIR}")
 
 
-def cmd_pre(args: list):
-    """Run pre-push checklist (folder, inspect, gold, readme)."""
-    import glob
+PRE_CHECKS = ("folder", "inspect", "gold", "readme")
+
+GOLD_FILES = (
+    "web/quantum-prefixes.d.ts",
+    "web/wasm-loader.ts",
+    "tsconfig.json",
+    "web/quantum-theme.css",
+    "src-tauri/src/prefix_engine.rs",
+    "src/bridge/main.go",
+    "src/shaders/prefix-classify.wgsl",
+    "scripts/build.nu",
+    "scripts/test.nu",
+    "scripts/audit.nu",
+    "scripts/build-wasm.sh",
+    "scripts/version-sync.sh",
+    "scripts/pre.sh",
+    ".github/workflows/ci.yml",
+    ".github/workflows/health.yml",
+    ".pre-commit-config.yaml",
+)
+
+# label -> alternatives; an app passes when one alternative of every label occurs in the file
+HTML_MARKERS = {
+    "DOCTYPE": ("<!DOCTYPE html>", "<!doctype html>"),
+    "</html>": ("</html>",),
+    "quantum-prefixes.js": ("quantum-prefixes.js",),
+    "sw.js": ("sw.js",),
+}
+
+
+def scan_markers(path: str, markers: dict = HTML_MARKERS) -> list:
+    """Return the marker labels missing from a file.
+
+    Reads line by line and stops as soon as every marker has been seen, so
+    large apps are not loaded whole just to find a few substrings.
+    """
+    pending = dict(markers)
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            for label in [label for label, alts in pending.items() if any(a in line for a in alts)]:
+                del pending[label]
+            if not pending:
+                break
+    return list(pending)
+
+
+def _pre_folder(root: str) -> tuple:
     import subprocess
 
-    root = os.path.dirname(os.path.abspath(__file__))
+    # One porcelain call covers both tracked changes against HEAD and untracked files
+    status = subprocess.run(
+        ["git", "status", "--porcelain", "--untracked-files=all"], capture_output=True, text=True, cwd=root
+    ).stdout.splitlines()
+    untracked = sum(1 for entry in status if entry.startswith("??"))
+    lines = [f"  · Modified:  {len(status) - untracked} files", f"  · Untracked: {untracked} files"]
+    if os.path.exists(os.path.join(root, "web", "quantum-prefix.js")):
+        return 1, lines + ["  ✗ Stale file: web/quantum-prefix.js"]
+    return 0, lines + ["  ✓ No stale files"]
 
-    subcmds = args if args else ["folder", "inspect", "gold"]
-    errors = 0
 
-    for sub in subcmds:
-        if sub == "folder":
-            print("\n⚛ Folder Check")
-            modified = (
-                subprocess.run(["git", "diff", "--name-only", "HEAD"], capture_output=True, text=True, cwd=root)
-                .stdout.strip()
-                .splitlines()
-            )
-            untracked = (
-                subprocess.run(
-                    ["git", "ls-files", "--others", "--exclude-standard"], capture_output=True, text=True, cwd=root
-                )
-                .stdout.strip()
-                .splitlines()
+def _pre_inspect(root: str, app_target: str = None) -> tuple:
+    import glob
+
+    html_dir = os.path.join(root, "web")
+    if app_target:
+        html_files = glob.glob(os.path.join(html_dir, f"*{app_target}*.html"))
+        if not html_files:
+            return 1, [f"  ✗ No app matching: {app_target}"]
+    else:
+        html_files = sorted(glob.glob(os.path.join(html_dir, "*.html")))
+
+    errors, lines = 0, []
+    for f in html_files:
+        name = os.path.basename(f)
+        issues = scan_markers(f)
+        if issues:
+            lines.append(f"  ✗ {name}: missing {', '.join(issues)}")
+            errors += len(issues)
+        else:
+            lines.append(f"  ✓ {name}")
+    lines.append(f"  · {len(html_files)} apps checked")
+    return errors, lines
+
+
+def _pre_gold(root: str) -> tuple:
+    missing = [gf for gf in GOLD_FILES if not os.path.exists(os.path.join(root, gf))]
+    lines = [f"  ✗ MISSING: {gf}" for gf in missing]
+    lines.append(f"  ✓ {len(GOLD_FILES) - len(missing)}/{len(GOLD_FILES)} gold standard files present")
+    if missing:
+        lines.append(f"  ✗ {len(missing)} files missing")
+    return len(missing), lines
+
+
+def _pre_readme(root: str) -> tuple:
+    readme = os.path.join(root, "README.md")
+    if not os.path.exists(readme):
+        return 1, ["  ✗ README.md not found"]
+    with open(readme) as fh:
+        content = fh.read()
+    checks = [
+        ("Version badge", "v4." in content),
+        ("Gold Standard section", "Gold Standard" in content),
+        ("Architecture (crates)", "crates/prefix-engine" in content),
+    ]
+    return sum(1 for _, passed in checks if not passed), [f"  {'✓' if p else '✗'} {label}" for label, p in checks]
+
+
+_PRE_TITLES = {
+    "folder": ("Folder Check", _pre_folder),
+    "inspect": ("Inspect Apps", _pre_inspect),
+    "gold": ("Gold Standard Check", _pre_gold),
+    "readme": ("README Check", _pre_readme),
+}
+
+
+def _timed_check(fn, *fn_args) -> tuple:
+    t0 = time.perf_counter()
+    errors, lines = fn(*fn_args)
+    return errors, lines, (time.perf_counter() - t0) * 1000
+
+
+def run_pre_checks(root: str, subcmds: list) -> list:
+    """Run the requested pre-push checks concurrently.
+
+    The checks are independent (git, HTML scans, stat calls, README read), so
+    they go on a thread pool. Results come back in request order as
+    ``{"check", "title", "errors", "lines", "ms"}`` dicts.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    jobs = []
+    for i, sub in enumerate(subcmds):
+        if sub not in _PRE_TITLES:
+            continue
+        fn_args = [root]
+        # `inspect <app>` narrows the scan to matching apps
+        if sub == "inspect" and i + 1 < len(subcmds) and subcmds[i + 1] not in (*PRE_CHECKS, "push", "pre"):
+            fn_args.append(subcmds[i + 1])
+        jobs.append((sub, fn_args))
+
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+        futures = [(sub, pool.submit(_timed_check, _PRE_TITLES[sub][1], *fn_args)) for sub, fn_args in jobs]
+        results = []
+        for sub, future in futures:
+            errors, lines, ms = future.result()
+            results.append(
+                {"check": sub, "title": _PRE_TITLES[sub][0], "errors": errors, "lines": lines, "ms": round(ms, 2)}
             )
-            print(f"  · Modified:  {len(modified)} files")
-            print(f"  · Untracked: {len(untracked)} files")
-            stale = os.path.join(root, "web", "quantum-prefix.js")
-            if os.path.exists(stale):
-                print("  ✗ Stale file: web/quantum-prefix.js")
-                errors += 1
-            else:
-                print("  ✓ No stale files")
-
-        elif sub == "inspect":
-            print("\n⚛ Inspect Apps")
-            app_target = None
-            # Check if there's an app name following inspect
-            idx = subcmds.index(sub)
-            if idx + 1 < len(subcmds) and subcmds[idx + 1] not in (
-                "folder",
-                "inspect",
-                "gold",
-                "readme",
-                "push",
-                "pre",
-            ):
-                app_target = subcmds[idx + 1]
-
-            html_dir = os.path.join(root, "web")
-            if app_target:
-                candidates = glob.glob(os.path.join(html_dir, f"*{app_target}*.html"))
-                if not candidates:
-                    print(f"  ✗ No app matching: {app_target}")
-                    errors += 1
-                    continue
-                html_files = candidates
-            else:
-                html_files = sorted(glob.glob(os.path.join(html_dir, "*.html")))
-
-            for f in html_files:
-                name = os.path.basename(f)
-                with open(f) as fh:
-                    content = fh.read()
-                issues = []
-                if "<!DOCTYPE html>" not in content and "<!doctype html>" not in content:
-                    issues.append("DOCTYPE")
-                if "</html>" not in content:
-                    issues.append("</html>")
-                if "quantum-prefixes.js" not in content:
-                    issues.append("quantum-prefixes.js")
-                if "sw.js" not in content:
-                    issues.append("sw.js")
-                if issues:
-                    print(f"  ✗ {name}: missing {', '.join(issues)}")
-                    errors += len(issues)
-                else:
-                    print(f"  ✓ {name}")
-            print(f"  · {len(html_files)} apps checked")
-
-        elif sub == "gold":
-            print("\n⚛ Gold Standard Check")
-            gold_files = [
-                "web/quantum-prefixes.d.ts",
-                "web/wasm-loader.ts",
-                "tsconfig.json",
-                "web/quantum-theme.css",
-                "src-tauri/src/prefix_engine.rs",
-                "src/bridge/main.go",
-                "src/shaders/prefix-classify.wgsl",
-                "scripts/build.nu",
-                "scripts/test.nu",
-                "scripts/audit.nu",
-                "scripts/build-wasm.sh",
-                "scripts/version-sync.sh",
-                "scripts/pre.sh",
-                ".github/workflows/ci.yml",
-                ".github/workflows/health.yml",
-                ".pre-commit-config.yaml",
-            ]
-            found = missing = 0
-            for gf in gold_files:
-                full = os.path.join(root, gf)
-                if os.path.exists(full):
-                    found += 1
-                else:
-                    print(f"  ✗ MISSING: {gf}")
-                    missing += 1
-                    errors += 1
-            print(f"  ✓ {found}/{len(gold_files)} gold standard files present")
-            if missing:
-                print(f"  ✗ {missing} files missing")
-
-        elif sub == "readme":
-            print("\n⚛ README Check")
-            readme = os.path.join(root, "README.md")
-            if not os.path.exists(readme):
-                print("  ✗ README.md not found")
-                errors += 1
-                continue
-            with open(readme) as fh:
-                content = fh.read()
-            checks = [
-                ("Version badge", "v4." in content),
-                ("Gold Standard section", "Gold Standard" in content),
-                ("Architecture (crates)", "crates/prefix-engine" in content),
-            ]
-            for label, passed in checks:
-                if passed:
-                    print(f"  ✓ {label}")
-                else:
-                    print(f"  ✗ {label}")
-                    errors += 1
+    return results
+
+
+def cmd_pre(args: list):
+    """Run pre-push checklist (folder, inspect, gold, readme)."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    as_json = "--json" in args
+    subcmds = [a for a in args if a != "--json"] or ["folder", "inspect", "gold"]
+
+    t0 = time.perf_counter()
+    results = run_pre_checks(root, subcmds)
+    wall_ms = (time.perf_counter() - t0) * 1000
+    errors = sum(r["errors"] for r in results)
+
+    if as_json:
+        print(json.dumps({"checks": results, "errors": errors, "wall_ms": round(wall_ms, 2)}, indent=2))
+        sys.exit(1 if errors else 0)
+
+    for r in results:
+        print(f"\n⚛ {r['title']}  ({r['ms']:.1f} ms)")
+        print("\n".join(r["lines"]))
 
     # Summary
     print()
+    print(f"  · {len(results)} checks in {wall_ms:.1f} ms wall")
     if errors > 0:
         print(f"✗ {errors} issues found — fix before pushing")
         sys.exit(1)
@@ -405,24 +2239,48 @@ def cmd_help(args: list):
     print()
     print("Commands:")
     print("  serve              Start the quantum bridge server")
+    print("  serve --startup-profile  Print the bridge import-time breakdown and exit")
     print("  classify <file>    Classify a file (or stdin) with prefixes")
+    print("  classify <dir>     Classify every source file under dir (NDJSON + summary)")
     print("  prefix <file>      Add prefix gutter to source (stdout)")
-    print("  stats <file>       Show prefix distribution statistics")
-    print("  pre [checks...]    Pre-push checklist (folder, inspect, gold, readme)")
+    print("  stats <file|dir>   Show prefix distribution statistics")
+    print("  pre [checks...]    Pre-push checklist (folder, inspect, gold, readme), run concurrently; --json")
+    print("  bench [path]       Time the classifiers in-process (cold/warm lines/s, MB/s)")
+    print("  cache [action]     Result cache: stats (default), prune, clear")
+    print("  watch <dir>        Keep coverage/distribution for a tree current, report changes")
     print("  health             Check bridge server status")
+    print("  loadtest           Load the bridge: --mix prefix=4,ws-ping=1 -c 8 -d 10 [--json]")
     print("  version            Show version info")
     print()
     print("Options:")
     print("  --json             Output in JSON format (classify, stats)")
+    print("  --columnar         With --json, emit one array per column instead of per-line objects")
+    print("  --stream           Read input incrementally in constant memory, flushing as it arrives")
+    print("                     (prefix, classify — NDJSON with --json, stats — running counters)")
+    print("  --jsonl            Stream one JSON record per file, then a summary (stats <dir>)")
+    print("  --jobs N, -j N     Worker processes for directory mode (default: CPU count)")
+    print("  --lines N          Synthetic corpus size for bench without a path (default: 100000)")
+    print("  --repeat N         Warm passes per engine for bench, best one reported (default: 3)")
+    print("  --interval S       Seconds between polls for watch (default: 1)")
     print("  -                  Read from stdin")
     print()
+    print("Environment:")
+    print("  UVSPEED_CLASSIFIER=scan|dispatch|native   Line classifier (native = prefix-engine crate rules)")
+    print("  UVSPEED_PREFIX_LIB=<path>                 libuvspeed_prefix_engine to load for native")
+    print("  UVSPEED_CACHE_DIR=<dir>                   Result cache (default: $XDG_CACHE_HOME/uvspeed)")
+    print("  UVSPEED_CACHE_MAX_BYTES=<n>               Evict oldest entries past this size (default: 256 MB)")
+    print("  UVSPEED_CACHE=0                           Disable the result cache")
+    print()
     print("Examples:")
     print("  uvspeed-bridge serve")
     print("  uvspeed-bridge classify myfile.py")
     print("  uvspeed-bridge pre                    # full pre-push audit")
     print("  uvspeed-bridge pre folder inspect      # just folder + inspect")
     print("  cat main.rs | uvspeed-bridge prefix -")
+    print("  uvspeed-bridge prefix huge.log --stream")
+    print("  tail -f app.log | uvspeed-bridge prefix - --stream")
     print("  uvspeed-bridge stats src/ --json")
+    print("  uvspeed-bridge stats . --jobs 8 --jsonl > prefix-stats.ndjson")
 
 
 COMMANDS = {
@@ -431,7 +2289,11 @@ COMMANDS = {
     "prefix": cmd_prefix,
     "stats": cmd_stats,
     "pre": cmd_pre,
+    "bench": cmd_bench,
+    "cache": cmd_cache,
+    "watch": cmd_watch,
     "health": cmd_health,
+    "loadtest": cmd_loadtest,
     "version": cmd_version,
     "help": cmd_help,
     "--help": cmd_help,